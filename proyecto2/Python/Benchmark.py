@@ -0,0 +1,772 @@
+import argparse
+import asyncio
+import datetime
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import itertools
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from urllib.parse import quote
+
+import pymongo
+from bson.objectid import ObjectId
+from pymongo import MongoClient, monitoring, uri_parser
+
+# Importaciones de nuestros módulos
+from Conexion import MONGO_URL, obtener_cliente, crear_cliente_async
+from Logica import GestorUsuario, GestorCategoria, GestorEtiqueta, GestorArticulo, GestorComentario, TAMANO_PAGINA, MODO_PARCIAL
+from LogicaAsync import crear_gestores_async, cargar_mapas
+from Indices import asegurar_indices
+from Cache import CacheResultados
+from Generador import DB_BENCHMARK, PALABRAS, generar
+from IndiceNombres import IndiceNombres, normalizar
+from Instantanea import InstantaneaMapas
+from MapaCompacto import MapaCompacto
+
+# --- Configuración del Benchmark ---
+UMBRAL_REGRESION = 0.10 # Al comparar reportes, más de un 10% de aumento en la mediana se marca como regresión.
+OBJETIVO_BUSQUEDA_MS = 100 # De la tecla a la lista actualizada, en la búsqueda mientras se escribe.
+RETRASO_BUSQUEDA_MS = int(os.environ.get("BLOG_RETRASO_BUSQUEDA_MS", 60)) # La pausa del Menú antes de consultar.
+
+
+def pipeline_legado(termino_busqueda):
+    """Pipeline original de cargar_articulos: une las tres colecciones y DESPUÉS filtra."""
+    consulta_regex = {"$regex": termino_busqueda, "$options": "i"}
+    return [
+        { "$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "author_details"}},
+        { "$lookup": {"from": "categories", "localField": "categories", "foreignField": "_id", "as": "category_details"}},
+        { "$lookup": {"from": "tags", "localField": "tags", "foreignField": "_id", "as": "tag_details"}},
+        { "$unwind": {"path": "$author_details", "preserveNullAndEmptyArrays": True}},
+        { "$match": {
+            "$or": [
+                {"title": consulta_regex},
+                {"text": consulta_regex},
+                {"author_details.email": consulta_regex},
+                {"category_details.name": consulta_regex},
+                {"tag_details.name": consulta_regex}
+            ]
+        }}
+    ]
+
+
+class ContadorEscaneos(monitoring.CommandListener):
+    """
+    Cuenta los comandos 'find' enviados por colección (cada uno es una lectura de la colección). Las lecturas
+    por _id no cuentan: son puntuales sobre el índice (ej: la cascada lee el nombre de lo que va a eliminar).
+    """
+
+    def __init__(self):
+        self.escaneos = {}
+
+    def started(self, event):
+        if event.command_name == "find" and "_id" not in event.command.get("filter", {}):
+            coleccion = event.command.get("find")
+            self.escaneos[coleccion] = self.escaneos.get(coleccion, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def medir_estadisticas(funcion, repeticiones):
+    """Ejecuta la función varias veces y retorna la mediana, el p95, el mínimo y el máximo en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        "mediana_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(tiempos[round(0.95 * (len(tiempos) - 1))], 3),
+        "min_ms": round(tiempos[0], 3),
+        "max_ms": round(tiempos[-1], 3),
+        "repeticiones": repeticiones,
+    }
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta la función varias veces y retorna la mediana en milisegundos."""
+    return medir_estadisticas(funcion, repeticiones)["mediana_ms"]
+
+
+def crear_gestor_articulos(db, proyeccion=None, cache=None):
+    """
+    Crea un GestorArticulo (con mapas cargados) apuntando a la base de benchmark.
+    Sin 'cache', la caché de páginas queda desactivada para medir las consultas reales.
+    """
+    usuarios, categorias, etiquetas = GestorUsuario(db=db), GestorCategoria(db=db), GestorEtiqueta(db=db)
+    for gestor in (usuarios, categorias, etiquetas):
+        gestor.cargar_mapa()
+    return GestorArticulo(db=db, usuarios=usuarios, categorias=categorias, etiquetas=etiquetas, proyeccion=proyeccion,
+                          comentarios=GestorComentario(db=db, usuarios=usuarios),
+                          cache=cache or CacheResultados(max_entradas=0))
+
+
+def benchmark_busqueda(db, repeticiones):
+    """Compara el pipeline legado (JOIN y luego filtro) con el planificador de GestorArticulo."""
+    articulos = crear_gestor_articulos(db)
+    coleccion = articulos.obtener_coleccion()
+
+    # Términos que coinciden con título/texto, autor, categoría, tag y ninguno.
+    terminos = ["pastel", "usuario7@", "categoria 3", "tag 12", "no-existe"]
+    print(f"{'Término':<15}{'Legado (ms)':>14}{'Planificado (ms)':>18}{'Mejora':>10}")
+    for termino in terminos:
+        legado = medir(lambda: list(coleccion.aggregate(pipeline_legado(termino))), repeticiones)
+        planificado = medir(lambda: list(articulos.buscar_articulos(termino)), repeticiones)
+        print(f"{termino:<15}{legado:>14.1f}{planificado:>18.1f}{legado / max(planificado, 0.001):>9.1f}x")
+
+
+def benchmark_paginacion(db, repeticiones):
+    """Compara cargar el listado completo contra la primera página (tiempo hasta el primer pintado)."""
+    articulos = crear_gestor_articulos(db)
+    total = articulos.obtener_coleccion().estimated_document_count()
+    completo = medir(lambda: list(articulos.buscar_articulos("")), repeticiones)
+    primera = medir(lambda: articulos.obtener_pagina("", None, TAMANO_PAGINA), repeticiones)
+    pagina = articulos.obtener_pagina("", None, TAMANO_PAGINA)
+    siguiente = medir(lambda: articulos.obtener_pagina("", pagina["next_cursor"], TAMANO_PAGINA), repeticiones)
+    print(f"Listado completo ({total} artículos): {completo:.1f} ms")
+    print(f"Primera página ({TAMANO_PAGINA} artículos): {primera:.1f} ms | Página siguiente: {siguiente:.1f} ms")
+
+
+def benchmark_lista_virtual(db, repeticiones, bloque=100):
+    """Costo de los bloques de la lista virtual: saltar con la barra a distintas posiciones y seguir desde ahí."""
+    articulos = crear_gestor_articulos(db)
+    total = articulos.contar()
+    for fraccion in (0.0, 0.5, 0.99):
+        posicion = int(total * fraccion)
+        salto = medir(lambda: articulos.cursor_en_posicion("", posicion), repeticiones)
+        cursor = articulos.cursor_en_posicion("", posicion)
+        pagina = medir(lambda: articulos.obtener_pagina("", cursor, bloque), repeticiones)
+        print(f"Fila {posicion:>9,} de {total:,} | ubicar cursor: {salto:.1f} ms | bloque de {bloque}: {pagina:.1f} ms")
+
+
+def benchmark_modelo_lectura(db, repeticiones):
+    """Compara la primera página con los tres $lookup contra la proyección guardada en cada artículo."""
+    con_joins = crear_gestor_articulos(db, proyeccion=False)
+    sin_joins = crear_gestor_articulos(db, proyeccion=True)
+    inicio = time.perf_counter()
+    corregidos = sin_joins.reparar_proyeccion() # El generador ya escribe la proyección: debería corregir 0.
+    print(f"Reparación de la proyección: {corregidos} artículos en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    for termino in ("", "pastel"):
+        joins = medir(lambda: con_joins.obtener_pagina(termino, None, TAMANO_PAGINA), repeticiones)
+        proyeccion = medir(lambda: sin_joins.obtener_pagina(termino, None, TAMANO_PAGINA), repeticiones)
+        print(f"Página '{termino}' | con $lookup: {joins:.1f} ms | sin JOINs: {proyeccion:.1f} ms")
+
+
+def benchmark_busqueda_texto(db, repeticiones):
+    """Compara la primera página de búsqueda con $regex, índice de texto e índice invertido en memoria."""
+    asegurar_indices(db) # Crea el índice de texto 'busqueda_texto' (y los demás) en la base de benchmark.
+    articulos = crear_gestor_articulos(db)
+    motor = articulos.motor_busqueda
+
+    inicio = time.perf_counter()
+    motor.buscar_invertido("") # Fuerza la construcción del índice invertido.
+    print(f"Construcción del índice invertido: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    terminos = ["pastel", "pasteles chocolate", "vegano", "categoria 3"]
+    print(f"{'Término':<22}{'$regex (ms)':>13}{'$text (ms)':>12}{'Invertido (ms)':>16}")
+    for termino in terminos:
+        tiempos = []
+        for modo in ("regex", "texto", "invertido"):
+            motor.modo = modo
+            tiempos.append(medir(lambda: articulos.obtener_pagina(termino, None, TAMANO_PAGINA), repeticiones))
+        print(f"{termino:<22}{tiempos[0]:>13.1f}{tiempos[1]:>12.1f}{tiempos[2]:>16.1f}")
+    motor.modo = "auto"
+
+
+def benchmark_cache(db, repeticiones):
+    """Mide páginas servidas desde la caché contra la consulta real, y cuántas entradas invalida cada escritura."""
+    cache = CacheResultados()
+    articulos = crear_gestor_articulos(db, cache=cache)
+    terminos = ["", "pastel", "vegano", "categoria 3"]
+    for termino in terminos:
+        # Una consulta real por repetición (se vacía la caché) contra la misma página ya guardada.
+        fria = medir(lambda: (cache.limpiar(), articulos.obtener_pagina(termino, None, TAMANO_PAGINA)), repeticiones)
+        caliente = medir(lambda: articulos.obtener_pagina(termino, None, TAMANO_PAGINA), repeticiones)
+        print(f"Página '{termino}' | consulta: {fria:.2f} ms | caché: {caliente:.3f} ms | {fria / max(caliente, 0.001):.0f}x")
+
+    # Editar el artículo más antiguo invalida las búsquedas, pero no la primera página del listado.
+    primera = articulos.obtener_pagina("", None, TAMANO_PAGINA)
+    antiguo = db["articles"].find_one({}, {"title": 1}, sort=[("date", 1), ("_id", 1)])
+    antes = cache.estadisticas()["invalidadas"]
+    articulos.guardar_articulo(antiguo["_id"], {"title": antiguo["title"]}) # Mismo título: no altera los datos.
+    invalidadas = cache.estadisticas()["invalidadas"] - antes
+    sigue = articulos.obtener_pagina("", None, TAMANO_PAGINA)["articulos"] == primera["articulos"]
+    print(f"Editar el artículo más antiguo invalida {invalidadas} entradas (primera página conservada: {sigue})")
+    print(f"Estadísticas de la caché: {cache.estadisticas()}")
+
+
+def benchmark_busqueda_viva(db, bloque=100):
+    """
+    Latencia por tecla de la búsqueda mientras se escribe (un bloque de la lista virtual por término, en modo
+    parcial como el Menú): cada tecla consultando la base contra la caché, que refina en memoria el resultado
+    completo de un prefijo. "Tecla a lista" suma la pausa RETRASO_BUSQUEDA_MS del Menú y se compara con
+    OBJETIVO_BUSQUEDA_MS. Al final, la búsqueda por relevancia que reemplaza al listado al dejar de escribir.
+    """
+    terminos = ["tradicional picante", "usuario42@", "no-existe", "zanahoria"] # Comunes, de un autor y sin resultados.
+    modos = {"sin caché": crear_gestor_articulos(db), "refinando": crear_gestor_articulos(db, cache=CacheResultados())}
+    print(f"{'Término':<22}{'Modo':<12}{'Mediana (ms)':>14}{'p95 (ms)':>10}{'Tecla a lista p95':>19}{'Objetivo':>10}")
+    for termino in terminos:
+        for modo, articulos in modos.items():
+            articulos.cache.limpiar()
+            tiempos = []
+            for largo in range(1, len(termino) + 1): # Una consulta por tecla, como con RETRASO_BUSQUEDA_MS = 0.
+                inicio = time.perf_counter()
+                articulos.obtener_pagina(termino[:largo], None, bloque, modo=MODO_PARCIAL)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            p95 = sorted(tiempos)[round(0.95 * (len(tiempos) - 1))]
+            cumple = "cumple" if RETRASO_BUSQUEDA_MS + p95 <= OBJETIVO_BUSQUEDA_MS else "NO cumple"
+            print(f"{termino:<22}{modo:<12}{statistics.median(tiempos):>14.1f}{p95:>10.1f}"
+                  f"{RETRASO_BUSQUEDA_MS + p95:>19.1f}{cumple:>10}")
+        relevancia = medir(lambda: modos["sin caché"].obtener_pagina(termino, None, bloque), 3)
+        print(f"{'':<22}{'relevancia':<12}{relevancia:>14.1f} ({modos['sin caché'].motor_busqueda.modo_efectivo()}, al dejar de escribir)")
+
+
+def benchmark_lote(db, cantidad=5000):
+    """Compara crear y eliminar 'cantidad' tags uno por uno contra crear_muchos/eliminar_muchos."""
+    etiquetas = GestorEtiqueta(db=db)
+    etiquetas.cargar_mapa()
+
+    inicio = time.perf_counter()
+    ids = [etiquetas.crear_uno({"name": f"spam uno {i}"}) for i in range(cantidad)]
+    for id_etiqueta in ids:
+        etiquetas.eliminar_uno(id_etiqueta)
+    uno_por_uno = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    creados = etiquetas.crear_muchos([{"name": f"spam lote {i}"} for i in range(cantidad)])
+    eliminados = etiquetas.eliminar_muchos([id_etiqueta for id_etiqueta in creados["ids"] if id_etiqueta])
+    en_lote = time.perf_counter() - inicio
+
+    errores = len(creados["errores"]) + len(eliminados["errores"])
+    print(f"{cantidad} tags creados y eliminados | uno por uno: {uno_por_uno:.2f} s | en lote: {en_lote:.2f} s "
+          f"({uno_por_uno / max(en_lote, 1e-9):.0f}x, {errores} errores)")
+
+
+def benchmark_instantanea(db, repeticiones):
+    """Arranque del mapa de usuarios: lectura completa de la colección contra la instantánea local."""
+    instantanea = InstantaneaMapas(os.path.join(tempfile.gettempdir(), "benchmark_mapas.sqlite3"))
+    usuarios = GestorUsuario(db=db)
+    usuarios.instantanea = InstantaneaMapas("") # Sin guardar: se mide solo la lectura de la colección.
+    completa = medir(usuarios.cargar_mapa, repeticiones)
+    usuarios.instantanea = instantanea
+    guardar = medir(usuarios.guardar_instantanea, repeticiones)
+
+    def desde_instantanea():
+        gestor = GestorUsuario(db=db)
+        gestor.instantanea = instantanea
+        gestor.cargar_instantanea()
+    archivo = medir(desde_instantanea, repeticiones)
+    reconciliar = medir(usuarios.sondear_cambios, repeticiones) # Sin cambios: solo las consultas por marca.
+    print(f"Mapa de {len(usuarios.mapa_nombre_a_id):,} usuarios | colección completa: {completa:.0f} ms | "
+          f"instantánea: {archivo:.0f} ms ({os.path.getsize(instantanea.ruta) / 1e6:.1f} MB, guardarla: {guardar:.0f} ms) | "
+          f"reconciliar: {reconciliar:.1f} ms")
+    instantanea.borrar()
+
+
+def benchmark_mapa_compacto(cantidad=1_000_000, repeticiones=5):
+    """Memoria y tiempo de consulta de los mapas {email: _id} con diccionarios y con MapaCompacto (sin base de datos)."""
+    def medir_memoria(construir):
+        # Se mide lo que queda vivo: los emails y ObjectId "leídos de la base" más lo que guarde cada mapa.
+        tracemalloc.start()
+        nombres = [f"usuario{i}@correo.com" for i in range(cantidad)]
+        mapas = construir(nombres, [ObjectId() for _ in range(cantidad)])
+        del nombres
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return mapas, memoria / 1e6
+
+    def diccionarios(nombres, ids):
+        return dict(zip(nombres, ids)), dict(zip(ids, nombres))
+
+    def compacto(nombres, ids):
+        mapa = MapaCompacto(nombres, ids)
+        return mapa.por_nombre, mapa.por_id
+
+    aleatorio = random.Random(5)
+    consultas = [f"usuario{aleatorio.randrange(cantidad)}@correo.com" for _ in range(1000)]
+    print(f"{'Mapas de ' + format(cantidad, ',') + ' entradas':<30}{'Memoria (MB)':>14}{'MB por 1M':>12}"
+          f"{'nombre->id (us)':>17}{'id->nombre (us)':>17}")
+    for etiqueta, construir in (("diccionarios", diccionarios), ("MapaCompacto", compacto)):
+        (por_nombre, por_id), memoria = medir_memoria(construir)
+        ids = [por_nombre[nombre] for nombre in consultas]
+        a_id = medir(lambda: [por_nombre.get(nombre) for nombre in consultas], repeticiones)
+        a_nombre = medir(lambda: [por_id.get(id_objeto) for id_objeto in ids], repeticiones)
+        # 1000 consultas por medición: los ms de medir() son los microsegundos de cada consulta.
+        print(f"{etiqueta:<30}{memoria:>14.1f}{memoria * 1e6 / cantidad:>12.1f}{a_id:>17.2f}{a_nombre:>17.2f}")
+
+
+def benchmark_indice_nombres(cantidad=1_000_000, repeticiones=5):
+    """Micro-benchmark del IndiceNombres con 'cantidad' nombres sintéticos (no usa la base de datos)."""
+    aleatorio = random.Random(3)
+    palabras = PALABRAS + ["jalapeño", "limón", "azúcar", "crème", "Pâté", "Ñoquis"]
+    nombres = [f"{aleatorio.choice(palabras)} {aleatorio.choice(palabras)} {i}" for i in range(cantidad)]
+
+    inicio = time.perf_counter()
+    indice = IndiceNombres(nombres)
+    print(f"Índice de {len(indice):,} nombres construido en {time.perf_counter() - inicio:.2f} s")
+
+    # Lo que hacía cualquier consumidor antes: recorrer todo el mapa por cada búsqueda.
+    recorrido = medir(lambda: [n for n in nombres if normalizar(n).startswith("lim")][:20], 1)
+    operaciones = {
+        "buscar_prefijo('lim', 20)": lambda: indice.buscar_prefijo("lim", 20),
+        "buscar_prefijo('LIMON POLLO 9')": lambda: indice.buscar_prefijo("LIMON POLLO 9"),
+        "contar_prefijo('pa')": lambda: indice.contar_prefijo("pa"),
+        "sugerir('pastle chocolate', 5)": lambda: indice.sugerir("pastle chocolate", 5),
+        "agregar + quitar": lambda: (indice.agregar("receta nueva"), indice.quitar("receta nueva")),
+        "iterar 10.000 en orden": lambda: list(itertools.islice(indice.iterar(), 10_000)),
+    }
+    print(f"{'Operación':<35}{'Mediana (ms)':>14}")
+    print(f"{'recorrer el mapa (antes)':<35}{recorrido:>14.3f}")
+    for nombre, operacion in operaciones.items():
+        print(f"{nombre:<35}{medir(operacion, repeticiones):>14.3f}")
+    print(f"Sugerencias para 'pastle chocolate': {indice.sugerir('pastle chocolate', 5)}")
+
+
+def benchmark_escaneos_por_escritura(escrituras=100):
+    """
+    Verifica que crear/renombrar/eliminar no vuelve a leer la colección (0 escaneos por escritura).
+    Retorna la cantidad de escaneos; main termina con código 1 si hubo alguno (tests/test_escaneos.py
+    verifica lo mismo sin servidor).
+    """
+    contador = ContadorEscaneos()
+    db = MongoClient(MONGO_URL, event_listeners=[contador])[DB_BENCHMARK]
+    etiquetas = GestorEtiqueta(db=db)
+    etiquetas.cargar_mapa()
+    contador.escaneos.clear()
+
+    inicio = time.perf_counter()
+    for i in range(escrituras):
+        id_etiqueta = etiquetas.crear_uno({"name": f"etiqueta temporal {i}"})
+        etiquetas.actualizar_uno(id_etiqueta, {"name": f"etiqueta renombrada {i}"})
+        etiquetas.eliminar_uno(id_etiqueta)
+    duracion = (time.perf_counter() - inicio) * 1000
+
+    escaneos = contador.escaneos.get("tags", 0)
+    print(f"{escrituras * 3} escrituras en 'tags': {escaneos} escaneos de la colección "
+          f"({escaneos / (escrituras * 3):.2f} por escritura) en {duracion:.1f} ms")
+    return escaneos
+
+
+def benchmark_async(db, clientes=50, operaciones=20):
+    """
+    Rendimiento con 'clientes' concurrentes que hacen 'operaciones' veces lo que hace un usuario del blog
+    (primera página, autenticar y los comentarios del artículo más popular): un hilo por cliente sobre los
+    gestores síncronos contra una corrutina por cliente sobre LogicaAsync. Sin caché de páginas.
+    """
+    usuarios, categorias, etiquetas = GestorUsuario(db=db), GestorCategoria(db=db), GestorEtiqueta(db=db)
+    inicio = time.perf_counter()
+    for gestor in (usuarios, categorias, etiquetas):
+        gestor.cargar_mapa()
+    mapas_sync = time.perf_counter() - inicio
+    comentarios = GestorComentario(db=db, usuarios=usuarios)
+    articulos = GestorArticulo(db=db, usuarios=usuarios, categorias=categorias, etiquetas=etiquetas,
+                               comentarios=comentarios, cache=CacheResultados(max_entradas=0))
+    emails = usuarios.obtener_todos_los_nombres()
+    popular = db["articles"].find_one({}, {"_id": 1}, sort=[("comment_count", -1)])
+    if not emails or not popular:
+        print("benchmark_async: la base de benchmark no tiene usuarios o artículos.")
+        return
+
+    def cliente_sync(numero):
+        aleatorio = random.Random(numero)
+        for _ in range(operaciones):
+            articulos.obtener_pagina("", None, TAMANO_PAGINA)
+            usuarios.autenticar(aleatorio.choice(emails), "123")
+            comentarios.obtener_pagina_comentarios(popular["_id"])
+
+    hilos = [threading.Thread(target=cliente_sync, args=(numero,)) for numero in range(clientes)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    sincrono = time.perf_counter() - inicio
+
+    async def medir_async():
+        cliente = crear_cliente_async()
+        try:
+            gestores = crear_gestores_async(cliente[db.name])
+            usuarios_async, articulos_async = gestores["gestor_usuarios"], gestores["gestor_articulos"]
+            comentarios_async = gestores["gestor_comentarios"]
+            articulos_async.cache = CacheResultados(max_entradas=0)
+            inicio = time.perf_counter()
+            await cargar_mapas(usuarios_async, gestores["gestor_categorias"], gestores["gestor_etiquetas"])
+            mapas = time.perf_counter() - inicio
+
+            async def cliente_async(numero):
+                aleatorio = random.Random(numero)
+                for _ in range(operaciones):
+                    await articulos_async.obtener_pagina("", None, TAMANO_PAGINA)
+                    await usuarios_async.autenticar(aleatorio.choice(emails), "123")
+                    await comentarios_async.obtener_pagina_comentarios(popular["_id"])
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(cliente_async(numero) for numero in range(clientes)))
+            return mapas, time.perf_counter() - inicio
+        finally:
+            await cliente.close()
+    mapas_async, asincrono = asyncio.run(medir_async())
+
+    consultas = clientes * operaciones * 3
+    print(f"Mapas de usuarios, categorías y tags | uno tras otro: {mapas_sync * 1000:.0f} ms | "
+          f"con gather: {mapas_async * 1000:.0f} ms")
+    print(f"{clientes} clientes x {operaciones} x 3 consultas | hilos + síncrono: {consultas / sincrono:,.0f} consultas/s "
+          f"({sincrono:.2f} s) | corrutinas + async: {consultas / asincrono:,.0f} consultas/s ({asincrono:.2f} s) | "
+          f"{sincrono / max(asincrono, 1e-9):.2f}x")
+
+
+def benchmark_api(db, clientes=200, peticiones=50, limite_s=60):
+    """
+    Prueba de carga de ServidorAPI.py: lo lanza como otro proceso sobre la base de benchmark y abre 'clientes'
+    conexiones keep-alive que hacen 'peticiones' GET cada una (primera y segunda página de artículos, comentarios
+    del artículo más popular y búsqueda de emails por prefijo), reenviando el ETag de lo que ya recibieron.
+    """
+    popular = db["articles"].find_one({}, {"_id": 1}, sort=[("comment_count", -1)])
+    if not popular:
+        print("benchmark_api: la base de benchmark no tiene artículos.")
+        return
+    with socket.create_server(("127.0.0.1", 0)) as libre:
+        puerto = libre.getsockname()[1]
+    entorno = dict(os.environ, BLOG_DB_NAME=db.name, BLOG_API_PUERTO=str(puerto), BLOG_API_COLA=str(max(clientes, 256)))
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ServidorAPI.py")
+    proceso = subprocess.Popen([sys.executable, ruta], env=entorno, stdout=subprocess.DEVNULL)
+    try:
+        # Espera a que el servidor responda (carga los mapas antes de escuchar).
+        limite = time.monotonic() + limite_s
+        while True:
+            try:
+                conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=5)
+                conexion.request("GET", "/api/articulos")
+                siguiente = json.loads(conexion.getresponse().read())["next_cursor"]
+                conexion.close()
+                break
+            except OSError:
+                if proceso.poll() is not None or time.monotonic() > limite:
+                    print("benchmark_api: el servidor no respondió.")
+                    return
+                time.sleep(0.2)
+
+        rutas = [
+            (0.4, lambda aleatorio: "/api/articulos"),
+            (0.2, lambda aleatorio: f"/api/articulos?cursor={quote(siguiente or '')}"),
+            (0.2, lambda aleatorio: f"/api/articulos/{popular['_id']}/comentarios"),
+            (0.2, lambda aleatorio: f"/api/users/nombres?prefijo={aleatorio.choice('abcdefghijklmnopqrstuvwxyz')}"),
+        ]
+        pesos = [peso for peso, _ in rutas]
+        latencias, estados, candado = [], Counter(), threading.Lock()
+
+        def cliente(numero):
+            aleatorio = random.Random(numero)
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=60)
+            etags, propias, estados_propios = {}, [], Counter()
+            try:
+                for _ in range(peticiones):
+                    camino = aleatorio.choices(rutas, pesos)[0][1](aleatorio)
+                    cabeceras = {"If-None-Match": etags[camino]} if camino in etags else {}
+                    inicio = time.perf_counter()
+                    try:
+                        conexion.request("GET", camino, headers=cabeceras)
+                        respuesta = conexion.getresponse()
+                        respuesta.read()
+                    except (OSError, http.client.HTTPException):
+                        estados_propios["error"] += 1
+                        conexion.close() # http.client reconecta en la siguiente petición.
+                        continue
+                    propias.append((time.perf_counter() - inicio) * 1000)
+                    estados_propios[respuesta.status] += 1
+                    if respuesta.getheader("ETag"):
+                        etags[camino] = respuesta.getheader("ETag")
+            finally:
+                conexion.close()
+                with candado:
+                    latencias.extend(propias)
+                    estados.update(estados_propios)
+
+        hilos = [threading.Thread(target=cliente, args=(numero,)) for numero in range(clientes)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total = time.perf_counter() - inicio
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    if not latencias:
+        print(f"benchmark_api: ninguna petición respondió ({dict(estados)}).")
+        return
+    latencias.sort()
+    p99 = latencias[round(0.99 * (len(latencias) - 1))]
+    print(f"API con {clientes} clientes x {peticiones} GET: {len(latencias) / total:,.0f} req/s | "
+          f"p50 {statistics.median(latencias):.1f} ms | p99 {p99:.1f} ms | máx {latencias[-1]:.1f} ms | "
+          f"estados {dict(sorted(estados.items(), key=str))}")
+
+
+class ProxyLento:
+    """Proxy TCP local que reenvía al servidor de MongoDB agregando un retraso a cada paquete (red lenta)."""
+
+    def __init__(self, destino, retraso_ms):
+        self.destino = destino # (host, puerto) del servidor real.
+        self.retraso = retraso_ms / 1000
+        self.servidor = socket.create_server(("127.0.0.1", 0))
+        self.puerto = self.servidor.getsockname()[1]
+        threading.Thread(target=self._aceptar, daemon=True).start()
+
+    def _aceptar(self):
+        while True:
+            try:
+                cliente, _ = self.servidor.accept()
+                remoto = socket.create_connection(self.destino)
+            except OSError:
+                return # Proxy cerrado (o servidor real inaccesible).
+            for origen, fin in ((cliente, remoto), (remoto, cliente)):
+                threading.Thread(target=self._reenviar, args=(origen, fin), daemon=True).start()
+
+    def _reenviar(self, origen, fin):
+        try:
+            while datos := origen.recv(65536):
+                time.sleep(self.retraso)
+                fin.sendall(datos)
+        except OSError:
+            pass
+        finally:
+            origen.close()
+            fin.close()
+
+    def url(self):
+        return f"mongodb://127.0.0.1:{self.puerto}/?directConnection=true"
+
+    def cerrar(self):
+        self.servidor.close()
+
+
+def medir_arranque(script, entorno_extra, limite_s=60):
+    """Lanza el script y retorna los ms hasta que su ventana termina el primer pintado (None si no aparece)."""
+    entorno = dict(os.environ, BLOG_MEDIR_ARRANQUE="1", **entorno_extra)
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, ruta], env=entorno, stdout=subprocess.PIPE, text=True)
+    temporizador = threading.Timer(limite_s, proceso.kill) # Por si la ventana nunca aparece.
+    temporizador.start()
+    try:
+        # Tareas.avisar_ventana_lista imprime 'VENTANA_LISTA' después del primer pintado.
+        for linea in proceso.stdout:
+            if linea.strip() == "VENTANA_LISTA":
+                return (time.perf_counter() - inicio) * 1000
+        return None
+    finally:
+        temporizador.cancel()
+        proceso.kill()
+        proceso.wait()
+
+
+def benchmark_arranque(retraso_ms=200, repeticiones=3):
+    """Tiempo hasta la primera ventana de Login.py y Menu.py con la base arriba, lenta y caída (requiere pantalla)."""
+    proxy = ProxyLento(uri_parser.parse_uri(MONGO_URL)["nodelist"][0], retraso_ms)
+    escenarios = {
+        "arriba": {},
+        f"lenta (+{retraso_ms} ms)": {"BLOG_MONGO_URL": proxy.url()},
+        "caída": {"BLOG_MONGO_URL": "mongodb://127.0.0.1:1/?directConnection=true"}, # Puerto sin servidor.
+    }
+    print(f"{'Escenario':<20}{'Login.py (ms)':>15}{'Menu.py (ms)':>15}")
+    try:
+        for nombre, entorno in escenarios.items():
+            tiempos = []
+            for script in ("Login.py", "Menu.py"):
+                muestras = [medir_arranque(script, entorno) for _ in range(repeticiones)]
+                muestras = [m for m in muestras if m is not None]
+                tiempos.append(f"{statistics.median(muestras):.0f}" if muestras else "sin ventana")
+            print(f"{nombre:<20}{tiempos[0]:>15}{tiempos[1]:>15}")
+    finally:
+        proxy.cerrar()
+
+
+def benchmark_login_a_menu(repeticiones=3):
+    """Latencia login -> menú: Menu.py en un intérprete nuevo (antes) contra el menú en la misma ventana (ahora)."""
+    # Importaciones locales: solo este benchmark necesita la interfaz gráfica (y una pantalla).
+    import customtkinter as ctk
+    from Login import AppLogin
+
+    muestras = [medir_arranque("Menu.py", {}) for _ in range(repeticiones)]
+    muestras = [m for m in muestras if m is not None]
+    antes = f"{statistics.median(muestras):.0f} ms" if muestras else "sin ventana"
+
+    usuario = {"_id": ObjectId(), "email": "benchmark@correo.com", "name": "Benchmark"}
+    tiempos = []
+    for _ in range(repeticiones):
+        raiz = ctk.CTk()
+        login = AppLogin(raiz)
+        login._conectar() # Lo que el Login ya hizo antes de habilitar el botón (ping y mapa de usuarios).
+        inicio = time.perf_counter()
+        menu = login.lanzar_aplicacion_principal(usuario)
+        if menu is None: # lanzar_aplicacion_principal muestra el error y retorna None.
+            raiz.destroy()
+            sys.exit("El menú no se abrió desde el Login: no hay latencia que medir.")
+        raiz.update() # Primer pintado del menú.
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        menu.ejecutor.cerrar()
+        raiz.destroy()
+    print(f"Login -> menú | subprocess.Popen: {antes} | misma ventana: {statistics.median(tiempos):.0f} ms")
+
+
+# --- Suite Reproducible (reporte JSON comparable entre commits) ---
+
+def ejecutar_suite(db, repeticiones):
+    """Mide sin interfaz los caminos reales de los gestores sobre la base de benchmark. Retorna {operacion: estadísticas}."""
+    asegurar_indices(db)
+    aleatorio = random.Random(7)
+    resultados = {}
+
+    usuarios, categorias, etiquetas = GestorUsuario(db=db), GestorCategoria(db=db), GestorEtiqueta(db=db)
+    for gestor in (usuarios, categorias, etiquetas):
+        resultados[f"{type(gestor).__name__}.cargar_mapa"] = medir_estadisticas(gestor.cargar_mapa, repeticiones)
+    comentarios = GestorComentario(db=db, usuarios=usuarios)
+    # Sin caché de páginas: cada repetición mide la consulta real.
+    articulos = GestorArticulo(db=db, usuarios=usuarios, categorias=categorias, etiquetas=etiquetas,
+                               comentarios=comentarios, cache=CacheResultados(max_entradas=0))
+
+    # Escrituras sobre tags temporales (se eliminan al terminar).
+    creados = []
+    resultados["GestorEtiqueta.crear_uno"] = medir_estadisticas(
+        lambda: creados.append(etiquetas.crear_uno({"name": f"benchmark {time.time_ns()}"})), repeticiones)
+    resultados["GestorEtiqueta.actualizar_uno"] = medir_estadisticas(
+        lambda: etiquetas.actualizar_uno(aleatorio.choice(creados), {"name": f"benchmark {time.time_ns()}"}), repeticiones)
+    for id_etiqueta in creados:
+        etiquetas.eliminar_uno(id_etiqueta)
+
+    emails = usuarios.obtener_todos_los_nombres()
+    if emails:
+        resultados["GestorUsuario.autenticar"] = medir_estadisticas(
+            lambda: usuarios.autenticar(aleatorio.choice(emails), "123"), repeticiones)
+
+    # El hilo más largo (el artículo más popular según la distribución de Zipf).
+    popular = db["articles"].find_one({}, {"_id": 1}, sort=[("comment_count", -1)])
+    if popular:
+        resultados["GestorComentario.obtener_comentarios_por_articulo"] = medir_estadisticas(
+            lambda: comentarios.obtener_comentarios_por_articulo(popular["_id"]), repeticiones)
+        resultados["GestorComentario.obtener_pagina_comentarios"] = medir_estadisticas(
+            lambda: comentarios.obtener_pagina_comentarios(popular["_id"]), repeticiones)
+
+    # Lo que ejecuta cargar_articulos en Menu.py: primera página, página siguiente y una búsqueda.
+    primera = articulos.obtener_pagina("", None, TAMANO_PAGINA)
+    resultados["cargar_articulos (primera página)"] = medir_estadisticas(
+        lambda: articulos.obtener_pagina("", None, TAMANO_PAGINA), repeticiones)
+    if primera["next_cursor"]:
+        resultados["cargar_articulos (página siguiente)"] = medir_estadisticas(
+            lambda: articulos.obtener_pagina("", primera["next_cursor"], TAMANO_PAGINA), repeticiones)
+    resultados["cargar_articulos (búsqueda 'pastel')"] = medir_estadisticas(
+        lambda: articulos.obtener_pagina("pastel", None, TAMANO_PAGINA), repeticiones)
+    return resultados
+
+
+def _commit_actual():
+    """Commit del código medido (con '+cambios' si hay modificaciones sin commitear)."""
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=directorio, text=True).strip()
+        cambios = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directorio, text=True)
+        return commit + ("+cambios" if cambios.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def construir_reporte(db, resultados):
+    """Arma el reporte JSON: resultados más lo necesario para saber si dos reportes son comparables."""
+    return {
+        "commit": _commit_actual(),
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pymongo": pymongo.version,
+        "servidor": db.client.server_info().get("version"),
+        "escala": {nombre: db[nombre].estimated_document_count()
+                   for nombre in ["users", "categories", "tags", "articles", "comments"]},
+        "resultados": resultados,
+    }
+
+
+def comparar_reportes(base, actual):
+    """Imprime la mediana de cada operación en ambos reportes y marca las regresiones."""
+    if base.get("escala") != actual.get("escala"):
+        print(f"Aviso: escalas distintas ({base.get('escala')} vs {actual.get('escala')}).")
+    print(f"{'Operación':<55}{base['commit']:>14}{actual['commit']:>14}{'Cambio':>10}")
+    for operacion, estadisticas in actual["resultados"].items():
+        anterior = base["resultados"].get(operacion)
+        if anterior is None:
+            print(f"{operacion:<55}{'-':>14}{estadisticas['mediana_ms']:>14.2f}{'nuevo':>10}")
+            continue
+        cambio = (estadisticas["mediana_ms"] - anterior["mediana_ms"]) / max(anterior["mediana_ms"], 0.001)
+        marca = "  REGRESIÓN" if cambio > UMBRAL_REGRESION else ""
+        print(f"{operacion:<55}{anterior['mediana_ms']:>14.2f}{estadisticas['mediana_ms']:>14.2f}{cambio:>+10.0%}{marca}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda de artículos.")
+    parser.add_argument("--articulos", type=int, default=100_000, help="Cantidad de artículos sintéticos.")
+    parser.add_argument("--usuarios", type=int, default=1000, help="Cantidad de usuarios sintéticos.")
+    parser.add_argument("--comentarios", type=int, default=0, help="Cantidad de comentarios sintéticos.")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones por medición.")
+    parser.add_argument("--sin-generar", action="store_true", help="Reutiliza los datos ya generados.")
+    parser.add_argument("--arranque", action="store_true", help="Solo mide el arranque de las ventanas y el paso login -> menú.")
+    parser.add_argument("--suite", action="store_true", help="Solo ejecuta la suite de operaciones de los gestores.")
+    parser.add_argument("--reporte", help="Con --suite: guarda el reporte JSON en esta ruta.")
+    parser.add_argument("--comparar", help="Con --suite: reporte JSON anterior con el que comparar.")
+    parser.add_argument("--clientes", type=int, default=50, help="Clientes concurrentes de la comparación síncrono/async.")
+    parser.add_argument("--nombres", type=int, help="Solo mide el índice y los mapas de nombres con esta cantidad (ej: 1000000).")
+    parser.add_argument("--api", type=int, metavar="CLIENTES", help="Solo hace la prueba de carga de ServidorAPI.py con estos clientes (ej: 200).")
+    argumentos = parser.parse_args()
+
+    if argumentos.arranque:
+        benchmark_arranque(repeticiones=argumentos.repeticiones)
+        benchmark_login_a_menu(repeticiones=argumentos.repeticiones)
+        sys.exit(0)
+    if argumentos.nombres:
+        benchmark_indice_nombres(argumentos.nombres, argumentos.repeticiones)
+        benchmark_mapa_compacto(argumentos.nombres, argumentos.repeticiones)
+        sys.exit(0)
+
+    db_benchmark = obtener_cliente()[DB_BENCHMARK]
+    if not argumentos.sin_generar:
+        generar(db_benchmark, argumentos.usuarios, argumentos.articulos, argumentos.comentarios)
+
+    if argumentos.api:
+        benchmark_api(db_benchmark, argumentos.api)
+        sys.exit(0)
+    if argumentos.suite:
+        reporte = construir_reporte(db_benchmark, ejecutar_suite(db_benchmark, argumentos.repeticiones))
+        for operacion, estadisticas in reporte["resultados"].items():
+            print(f"{operacion:<55}{estadisticas['mediana_ms']:>10.2f} ms (p95 {estadisticas['p95_ms']:.2f} ms)")
+        if argumentos.reporte:
+            with open(argumentos.reporte, "w", encoding="utf-8") as archivo:
+                json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+        if argumentos.comparar:
+            with open(argumentos.comparar, encoding="utf-8") as archivo:
+                comparar_reportes(json.load(archivo), reporte)
+        sys.exit(0)
+    benchmark_busqueda(db_benchmark, argumentos.repeticiones)
+    benchmark_paginacion(db_benchmark, argumentos.repeticiones)
+    benchmark_lista_virtual(db_benchmark, argumentos.repeticiones)
+    benchmark_modelo_lectura(db_benchmark, argumentos.repeticiones)
+    benchmark_busqueda_texto(db_benchmark, argumentos.repeticiones)
+    benchmark_cache(db_benchmark, argumentos.repeticiones)
+    benchmark_busqueda_viva(db_benchmark)
+    benchmark_lote(db_benchmark)
+    benchmark_instantanea(db_benchmark, argumentos.repeticiones)
+    escaneos = benchmark_escaneos_por_escritura()
+    benchmark_async(db_benchmark, argumentos.clientes)
+    if escaneos:
+        sys.exit(f"Regresión: las escrituras en 'tags' hicieron {escaneos} escaneos de la colección (se esperaban 0).")
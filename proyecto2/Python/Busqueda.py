@@ -0,0 +1,162 @@
+import datetime
+import os
+import re
+import threading
+import time
+import unicodedata
+
+# --- Configuración de la Búsqueda ---
+# "auto": usa el índice de texto de MongoDB si existe y, si no, el índice invertido en memoria.
+# "texto" / "invertido" fuerzan un motor; "regex" conserva la búsqueda original con $regex.
+MODO_BUSQUEDA = os.environ.get("BLOG_MODO_BUSQUEDA", "auto")
+# Sin índice de texto, cada cuántos segundos se vuelve a revisar (ej: alguien lo crea con la aplicación abierta).
+REVISAR_INDICE_TEXTO_S = float(os.environ.get("BLOG_REVISAR_INDICE_TEXTO_S", 60))
+
+# Pesos de relevancia: una coincidencia en el título vale más que una en el texto.
+PESO_TITULO = 10
+PESO_TEXTO = 1
+PESO_RELACION = 5 # Coincidencia por autor, categoría o tag.
+
+# Palabras vacías frecuentes en español que no aportan a la búsqueda.
+PALABRAS_VACIAS = {"de", "la", "el", "en", "y", "a", "los", "las", "del", "con", "un", "una",
+                   "por", "para", "que", "se", "al", "lo", "su", "sus", "muy", "o", "mi", "mis"}
+
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita acentos/diacríticos ("Jamón" -> "jamon")."""
+    descompuesto = unicodedata.normalize("NFD", texto.lower())
+    return "".join(c for c in descompuesto if unicodedata.category(c) != "Mn")
+
+
+def raiz(palabra):
+    """Stemming ligero para español: unifica plurales y la vocal final ("pasteles" y "pastel" -> "pastel")."""
+    if len(palabra) > 3 and palabra.endswith("s"):
+        palabra = palabra[:-1]
+    if len(palabra) > 3 and palabra.endswith("e") and palabra[-2] not in "aeiou":
+        palabra = palabra[:-1]
+    if palabra.endswith("z"):
+        palabra = palabra[:-1] + "c" # "luz"/"luces" -> "luc".
+    return palabra
+
+
+def tokenizar(texto):
+    """Convierte un texto en la lista de raíces indexables (sin acentos ni palabras vacías)."""
+    return [raiz(palabra) for palabra in re.findall(r"\w+", normalizar(texto or "")) if palabra not in PALABRAS_VACIAS]
+
+
+class IndiceInvertido:
+    """Índice invertido en memoria {raíz: {id_articulo: peso}} para despliegues sin índice de texto."""
+
+    def __init__(self):
+        self.postings = {} # { raíz o "@id_relacion": { id_articulo: peso } }
+        self.claves_por_articulo = {} # { id_articulo: [claves] } para poder quitar/reindexar un artículo.
+        self.fechas = {} # { id_articulo: fecha } para desempatar por las más recientes.
+        self.candado = threading.RLock()
+        self.listo = False # Pasa a True después de la primera construcción completa.
+
+    def construir(self, coleccion):
+        """Indexa todos los artículos de la colección (lectura completa, solo la primera vez)."""
+        proyeccion = {"title": 1, "text": 1, "date": 1, "user_id": 1, "categories": 1, "tags": 1}
+        for articulo in coleccion.find({}, proyeccion):
+            self.indexar(articulo)
+        self.listo = True
+        print(f"Índice invertido construido con {len(self.claves_por_articulo)} artículos.")
+
+    def indexar(self, articulo):
+        """Agrega o reemplaza un artículo en el índice."""
+        pesos = {}
+        for token in tokenizar(articulo.get("title")):
+            pesos[token] = pesos.get(token, 0) + PESO_TITULO
+        for token in tokenizar(articulo.get("text")):
+            pesos[token] = pesos.get(token, 0) + PESO_TEXTO
+        # Las relaciones se indexan por _id, así renombrar una categoría/tag/usuario no invalida el índice.
+        relaciones = [articulo.get("user_id")] + list(articulo.get("categories", [])) + list(articulo.get("tags", []))
+        for id_relacion in relaciones:
+            if id_relacion is not None:
+                pesos[f"@{id_relacion}"] = PESO_RELACION
+
+        with self.candado:
+            # Una edición no trae 'date': se conserva la fecha ya indexada.
+            fecha = articulo.get("date") or self.fechas.get(articulo["_id"]) or datetime.datetime.min
+            self.quitar(articulo["_id"])
+            for clave, peso in pesos.items():
+                self.postings.setdefault(clave, {})[articulo["_id"]] = peso
+            self.claves_por_articulo[articulo["_id"]] = list(pesos)
+            self.fechas[articulo["_id"]] = fecha
+
+    def quitar(self, id_articulo):
+        """Quita un artículo del índice (si estaba)."""
+        with self.candado:
+            for clave in self.claves_por_articulo.pop(id_articulo, []):
+                lista = self.postings.get(clave)
+                if lista is not None:
+                    lista.pop(id_articulo, None)
+                    if not lista:
+                        del self.postings[clave]
+            self.fechas.pop(id_articulo, None)
+
+    def buscar(self, consulta, ids_relacionados=()):
+        """Retorna los _id de artículos ordenados por relevancia (y luego por fecha descendente)."""
+        puntajes = {}
+        with self.candado:
+            claves = tokenizar(consulta) + [f"@{id_relacion}" for id_relacion in ids_relacionados]
+            for clave in claves:
+                for id_articulo, peso in self.postings.get(clave, {}).items():
+                    puntajes[id_articulo] = puntajes.get(id_articulo, 0) + peso
+            minimo = datetime.datetime.min
+            return sorted(puntajes, key=lambda i: (puntajes[i], self.fechas.get(i, minimo), i), reverse=True)
+
+
+class MotorBusqueda:
+    """Elige y ejecuta el motor de búsqueda de artículos: índice de texto de MongoDB, índice invertido o $regex."""
+
+    def __init__(self, coleccion, modo=None):
+        self.coleccion = coleccion # Colección 'articles'.
+        self.modo = modo or MODO_BUSQUEDA
+        self.indice_invertido = IndiceInvertido()
+        self._tiene_indice_texto = False # Un "sí" se guarda para siempre; un "no" se revisa de nuevo.
+        self._proxima_revision = 0.0 # time.monotonic() desde el que se vuelve a consultar index_information.
+
+    def hay_indice_texto(self):
+        """
+        Indica si la colección tiene un índice de texto. Una vez encontrado no se vuelve a consultar; si no
+        existe (o no se pudo leer), index_information se repite cada REVISAR_INDICE_TEXTO_S segundos.
+        """
+        if self._tiene_indice_texto or time.monotonic() < self._proxima_revision:
+            return self._tiene_indice_texto
+        self._proxima_revision = time.monotonic() + REVISAR_INDICE_TEXTO_S
+        try:
+            indices = self.coleccion.index_information()
+            self._tiene_indice_texto = any(
+                tipo == "text" for info in indices.values() for _, tipo in info.get("key", [])
+            )
+        except Exception as e:
+            print(f"No se pudieron leer los índices de {self.coleccion.name}: {e}")
+        return self._tiene_indice_texto
+
+    def modo_efectivo(self):
+        """Motor que se usará realmente: 'texto', 'invertido' o 'regex'."""
+        if self.modo == "auto":
+            return "texto" if self.hay_indice_texto() else "invertido"
+        return self.modo
+
+    def filtro_texto(self, termino_busqueda):
+        """Filtro $text con stemming en español (MongoDB también ignora acentos en los índices de texto)."""
+        return {"$text": {"$search": termino_busqueda, "$language": "spanish"}}
+
+    def buscar_invertido(self, termino_busqueda, ids_relacionados=()):
+        """Busca en el índice invertido, construyéndolo en la primera llamada."""
+        with self.indice_invertido.candado:
+            if not self.indice_invertido.listo:
+                self.indice_invertido.construir(self.coleccion)
+        return self.indice_invertido.buscar(termino_busqueda, ids_relacionados)
+
+    def articulo_guardado(self, articulo):
+        """Mantiene el índice invertido al día después de crear/editar un artículo."""
+        if self.indice_invertido.listo:
+            self.indice_invertido.indexar(articulo)
+
+    def articulo_eliminado(self, id_articulo):
+        """Mantiene el índice invertido al día después de eliminar un artículo."""
+        if self.indice_invertido.listo:
+            self.indice_invertido.quitar(id_articulo)
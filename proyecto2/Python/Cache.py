@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- Configuración de la Caché ---
+# BLOG_CACHE_ENTRADAS=0 desactiva la caché.
+MAX_ENTRADAS = int(os.environ.get("BLOG_CACHE_ENTRADAS", 256))
+TTL_S = float(os.environ.get("BLOG_CACHE_TTL_S", 60)) # Cubre las escrituras hechas desde otros procesos.
+MAX_BYTES = int(float(os.environ.get("BLOG_CACHE_MB", 32)) * 1024 * 1024)
+
+
+class CacheResultados:
+    """
+    Caché LRU con vencimiento (TTL) y tope de memoria para resultados de consultas.
+    Cada entrada lleva etiquetas (ej: ("articulo", _id)) para invalidar exactamente las afectadas por una escritura.
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, ttl_s=TTL_S, max_bytes=MAX_BYTES):
+        self.max_entradas = max_entradas
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.candado = threading.Lock()
+        self.entradas = OrderedDict() # { clave: (valor, vence, tamano_bytes, etiquetas) }, la más usada al final.
+        self.claves_por_etiqueta = {} # { etiqueta: {claves} } para invalidar sin recorrer toda la caché.
+        self.bytes_usados = 0
+        self.generacion = 0 # Aumenta con cada invalidación: descarta resultados consultados antes de una escritura.
+        self.contadores = {"aciertos": 0, "fallos": 0, "expulsiones_lru": 0, "expulsiones_memoria": 0,
+                           "vencidas": 0, "invalidadas": 0}
+
+    def activa(self):
+        return self.max_entradas > 0
+
+    def obtener(self, clave, contar_fallo=True):
+        """
+        Retorna el valor guardado, o None si no está o ya venció. contar_fallo=False para consultas
+        especulativas (ej: buscar el resultado de un prefijo) que no deben bajar la tasa de aciertos.
+        """
+        with self.candado:
+            entrada = self.entradas.get(clave)
+            if entrada is not None and entrada[1] < time.monotonic():
+                self._quitar(clave)
+                self.contadores["vencidas"] += 1
+                entrada = None
+            if entrada is None:
+                if contar_fallo:
+                    self.contadores["fallos"] += 1
+                return None
+            self.entradas.move_to_end(clave)
+            self.contadores["aciertos"] += 1
+            return entrada[0]
+
+    def guardar(self, clave, valor, etiquetas, tamano_bytes, generacion):
+        """
+        Guarda un resultado. 'generacion' es la que tenía la caché cuando empezó la consulta: si hubo una
+        invalidación mientras tanto, el resultado puede estar desactualizado y no se guarda.
+        """
+        if not self.activa() or tamano_bytes > self.max_bytes:
+            return
+        with self.candado:
+            if generacion != self.generacion:
+                return
+            if clave in self.entradas:
+                self._quitar(clave)
+            self.entradas[clave] = (valor, time.monotonic() + self.ttl_s, tamano_bytes, frozenset(etiquetas))
+            self.bytes_usados += tamano_bytes
+            for etiqueta in etiquetas:
+                self.claves_por_etiqueta.setdefault(etiqueta, set()).add(clave)
+            # Expulsa las menos usadas hasta cumplir los topes de entradas y de memoria.
+            while len(self.entradas) > self.max_entradas or self.bytes_usados > self.max_bytes:
+                motivo = "expulsiones_lru" if len(self.entradas) > self.max_entradas else "expulsiones_memoria"
+                self._quitar(next(iter(self.entradas)))
+                self.contadores[motivo] += 1
+
+    def invalidar(self, etiquetas):
+        """Quita todas las entradas que tienen alguna de las etiquetas. Retorna cuántas se quitaron."""
+        with self.candado:
+            self.generacion += 1
+            claves = set()
+            for etiqueta in etiquetas:
+                claves |= self.claves_por_etiqueta.get(etiqueta, set())
+            for clave in claves:
+                self._quitar(clave)
+            self.contadores["invalidadas"] += len(claves)
+            return len(claves)
+
+    def limpiar(self):
+        """Vacía la caché (los contadores se conservan)."""
+        with self.candado:
+            self.generacion += 1
+            self.entradas.clear()
+            self.claves_por_etiqueta.clear()
+            self.bytes_usados = 0
+
+    def _quitar(self, clave):
+        """Quita una entrada y sus referencias en el índice de etiquetas (con el candado tomado)."""
+        _, _, tamano_bytes, etiquetas = self.entradas.pop(clave)
+        self.bytes_usados -= tamano_bytes
+        for etiqueta in etiquetas:
+            claves = self.claves_por_etiqueta.get(etiqueta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self.claves_por_etiqueta[etiqueta]
+
+    def estadisticas(self):
+        """Contadores de aciertos, fallos, expulsiones e invalidaciones, más el uso actual."""
+        with self.candado:
+            consultas = self.contadores["aciertos"] + self.contadores["fallos"]
+            return dict(self.contadores, entradas=len(self.entradas), bytes=self.bytes_usados,
+                        tasa_aciertos=round(self.contadores["aciertos"] / consultas, 3) if consultas else 0)
@@ -1,59 +1,198 @@
-from pymongo import MongoClient 
-from tkinter import messagebox 
-import sys 
+from pymongo import AsyncMongoClient, MongoClient, monitoring
+from tkinter import messagebox
+import json
+import os
+import threading
+
+# Importaciones de nuestros módulos
+from Monitoreo import monitor_comandos, iniciar_exportacion
 
 # --- Configuración de la Conexión ---
-# Define la URL de conexión al servidor de MongoDB (AHORA APUNTA A ATLAS).
-MONGO_URL = "mongodb://localhost:27017/" 
-# Define el nombre de la base de datos que se va a utilizar.
-DB_NAME = "Blog_Recetas"
+# Valores por defecto. Cada uno puede sobrescribirse en 'conexion.json' (junto a este archivo, o la ruta
+# indicada en BLOG_CONFIG) y, con mayor prioridad, con la variable de entorno indicada al lado.
+CONFIGURACION_POR_DEFECTO = {
+    "url": "mongodb://localhost:27017/",  # BLOG_MONGO_URL: servidor de MongoDB (local o Atlas).
+    "base_datos": "Blog_Recetas",         # BLOG_DB_NAME: nombre de la base de datos que se va a utilizar.
+    "pool_maximo": 50,                    # BLOG_POOL_MAXIMO: conexiones máximas del pool compartido.
+    "pool_minimo": 0,                     # BLOG_POOL_MINIMO: conexiones que se mantienen abiertas.
+    "timeout_seleccion_ms": 5000,         # BLOG_TIMEOUT_SELECCION_MS: espera máxima para encontrar el servidor.
+    "timeout_conexion_ms": 5000,          # BLOG_TIMEOUT_CONEXION_MS: espera máxima del handshake TCP.
+    "timeout_socket_ms": 0,               # BLOG_TIMEOUT_SOCKET_MS: espera máxima por respuesta (0 = sin límite).
+    "preferencia_lectura": "primary",     # BLOG_PREFERENCIA_LECTURA: primary, secondaryPreferred, nearest...
+    "write_concern": "1",                 # BLOG_WRITE_CONCERN: 1, majority...
+    "compresores": "",                    # BLOG_COMPRESORES: ej. "zstd,snappy,zlib" (los no instalados se ignoran).
+}
+
+VARIABLES_DE_ENTORNO = {
+    "url": "BLOG_MONGO_URL",
+    "base_datos": "BLOG_DB_NAME",
+    "pool_maximo": "BLOG_POOL_MAXIMO",
+    "pool_minimo": "BLOG_POOL_MINIMO",
+    "timeout_seleccion_ms": "BLOG_TIMEOUT_SELECCION_MS",
+    "timeout_conexion_ms": "BLOG_TIMEOUT_CONEXION_MS",
+    "timeout_socket_ms": "BLOG_TIMEOUT_SOCKET_MS",
+    "preferencia_lectura": "BLOG_PREFERENCIA_LECTURA",
+    "write_concern": "BLOG_WRITE_CONCERN",
+    "compresores": "BLOG_COMPRESORES",
+}
+
+def cargar_configuracion():
+    """Combina los valores por defecto, el archivo de configuración y las variables de entorno."""
+    configuracion = dict(CONFIGURACION_POR_DEFECTO)
+    ruta = os.environ.get("BLOG_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "conexion.json"))
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, encoding="utf-8") as archivo:
+                configuracion.update(json.load(archivo))
+        except Exception as e:
+            print(f"No se pudo leer la configuración {ruta}: {e}")
+    for clave, variable in VARIABLES_DE_ENTORNO.items():
+        if variable in os.environ:
+            configuracion[clave] = os.environ[variable]
+    return configuracion
+
+CONFIGURACION = cargar_configuracion()
+# Se conservan los nombres originales para los módulos que los importan.
+MONGO_URL = CONFIGURACION["url"]
+DB_NAME = CONFIGURACION["base_datos"]
+
+
+class MetricasPool(monitoring.ConnectionPoolListener):
+    """Escucha los eventos del pool de conexiones de pymongo y lleva contadores simples."""
+
+    def __init__(self):
+        self.candado = threading.Lock()
+        self.contadores = {
+            "conexiones_creadas": 0,
+            "conexiones_cerradas": 0,
+            "conexiones_en_uso": 0,
+            "prestamos": 0,
+            "prestamos_fallidos": 0,
+            "pools_limpiados": 0,
+        }
+
+    def _sumar(self, clave, cantidad=1):
+        with self.candado:
+            self.contadores[clave] += cantidad
+
+    def obtener(self):
+        """Retorna una copia de los contadores actuales."""
+        with self.candado:
+            return dict(self.contadores)
+
+    # --- Eventos de pymongo.monitoring.ConnectionPoolListener ---
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): self._sumar("pools_limpiados")
+    def pool_closed(self, event): pass
+    def connection_created(self, event): self._sumar("conexiones_creadas")
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): self._sumar("conexiones_cerradas")
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): self._sumar("prestamos_fallidos")
+    def connection_checked_out(self, event):
+        self._sumar("prestamos")
+        self._sumar("conexiones_en_uso")
+    def connection_checked_in(self, event): self._sumar("conexiones_en_uso", -1)
+
+
+# --- Cliente Compartido ---
+# Un solo MongoClient (y por lo tanto un solo pool) por proceso, creado en el primer uso.
+metricas_pool = MetricasPool()
+_cliente = None
+_candado_cliente = threading.Lock()
+
+def opciones_cliente():
+    """Opciones de MongoClient según CONFIGURACION (las mismas para el cliente síncrono y el asíncrono)."""
+    opciones = {
+        "maxPoolSize": int(CONFIGURACION["pool_maximo"]),
+        "minPoolSize": int(CONFIGURACION["pool_minimo"]),
+        "serverSelectionTimeoutMS": int(CONFIGURACION["timeout_seleccion_ms"]),
+        "connectTimeoutMS": int(CONFIGURACION["timeout_conexion_ms"]),
+        "readPreference": CONFIGURACION["preferencia_lectura"],
+        # Métricas del pool y latencia/consultas lentas por operación de los gestores (Monitoreo.py).
+        "event_listeners": [metricas_pool, monitor_comandos],
+        "connect": False, # Conexión perezosa: nada de red al importar.
+    }
+    if int(CONFIGURACION["timeout_socket_ms"]):
+        opciones["socketTimeoutMS"] = int(CONFIGURACION["timeout_socket_ms"])
+    write_concern = str(CONFIGURACION["write_concern"])
+    opciones["w"] = int(write_concern) if write_concern.isdigit() else write_concern
+    if CONFIGURACION["compresores"]:
+        opciones["compressors"] = CONFIGURACION["compresores"]
+    return opciones
+
+def obtener_cliente():
+    """Retorna el MongoClient compartido del proceso. No abre conexiones hasta la primera operación."""
+    global _cliente
+    with _candado_cliente:
+        if _cliente is None:
+            _cliente = MongoClient(MONGO_URL, **opciones_cliente())
+            monitor_comandos.cliente = _cliente # Para pedir explain() de las consultas lentas.
+            monitor_comandos.agregar_contadores("pool", metricas_pool.obtener)
+            iniciar_exportacion() # Solo si BLOG_METRICAS_ARCHIVO está definida.
+        return _cliente
+
+def obtener_db():
+    """Retorna la base de datos de la aplicación sobre el cliente compartido."""
+    return obtener_cliente()[DB_NAME]
+
+def verificar_conexion():
+    """Hace 'ping' al servidor con el cliente compartido. Lanza la excepción de pymongo si no responde."""
+    obtener_cliente().admin.command("ping")
+
+def crear_cliente_async():
+    """
+    Crea un AsyncMongoClient con la misma configuración que el cliente compartido (ver LogicaAsync.py).
+    No se comparte: un cliente asíncrono queda atado al event loop que lo usa, y quien lo crea lo cierra.
+    """
+    return AsyncMongoClient(MONGO_URL, **opciones_cliente())
+
+def obtener_metricas_pool():
+    """Retorna los contadores del pool de conexiones compartido."""
+    return metricas_pool.obtener()
+
 
 class ConexionMongoDB:
     """Clase para gestionar la conexión a MongoDB y el objeto de la base de datos."""
-    
+
     def __init__(self, raiz=None):
         """
-        Inicializa la conexión.
-        'raiz' es un parámetro opcional para manejar 
-        errores de conexión de forma gráfica. Si se proporciona, muestra un error y sale de la app.
+        Inicializa la conexión sobre el cliente compartido y verifica que el servidor responda.
+        'raiz' es un parámetro opcional para manejar
+        errores de conexión de forma gráfica. Si se proporciona, muestra un error y sale de la app;
+        si no, lanza ConnectionError para que quien la llame decida (ya no termina el proceso).
         """
         self.cliente = None # Inicializa el cliente de MongoDB a None.
         self.db = None      # Inicializa el objeto de la base de datos a None.
-        
+
         try:
-            # Crea una instancia de MongoClient intentando conectarse a la URL definida.
-            self.cliente = MongoClient(MONGO_URL)
+            # Reutiliza el cliente compartido (no crea un pool ni un handshake nuevos).
+            self.cliente = obtener_cliente()
             # Prueba la conexión con el comando 'ping' (petición rápida al servidor).
-            self.cliente.admin.command('ping') 
+            verificar_conexion()
             # Si el ping es exitoso, selecciona la base de datos específica.
             self.db = self.cliente[DB_NAME]
             print("¡Conexión a MongoDB exitosa!")
-            
+
         except Exception as e:
             # Captura cualquier error de conexión (servidor apagado, URL incorrecta, etc.).
             error_msg = f"Error al conectar a MongoDB en {MONGO_URL}: {e}"
             print(error_msg)
-            
+
             if raiz:
                 # Si se llamó desde una, muestra una advertencia gráfica.
                 messagebox.showerror("Error de Conexión", error_msg)
                 # Sale de la aplicación de la GUI.
                 raiz.quit()
             else:
-                sys.exit(1)
+                raise ConnectionError(error_msg) from e
 
     def obtener_db(self):
         """Retorna el objeto de la base de datos (db)."""
         return self.db
 
 # --- Configuración de Instancia Global ---
-# Este bloque garantiza que la conexión se intente una vez al cargar el módulo.
-try:
-    # Intenta crear la conexión.
-    gestor_db = ConexionMongoDB()
-    # Almacena el objeto de la base de datos en la variable global DB.
-    DB = gestor_db.obtener_db()
-except:
-    # Si la conexión falla, DB se establece a None.
-    # Esto es manejado por los gestores en Logica.py.
-    DB = None
\ No newline at end of file
+# La base de datos global se obtiene sobre el cliente compartido sin hacer ping: importar este
+# módulo ya no bloquea en la red. La primera consulta real es la que abre la conexión.
+DB = obtener_db()
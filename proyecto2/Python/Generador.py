@@ -0,0 +1,144 @@
+import argparse
+import bisect
+import datetime
+import itertools
+import random
+import time
+
+from bson.objectid import ObjectId
+
+# Importaciones de nuestros módulos
+from Conexion import obtener_cliente
+
+# --- Configuración del Generador ---
+# Base de datos separada para no tocar los datos reales de 'Blog_Recetas'.
+DB_BENCHMARK = "Blog_Recetas_benchmark"
+PALABRAS = ["pastel", "chocolate", "casero", "receta", "pollo", "arroz", "sopa", "ensalada",
+            "horno", "rapido", "dulce", "salado", "vegano", "tradicional", "picante", "fresco"]
+FECHA_BASE = datetime.datetime(2024, 1, 1)
+TAMANO_LOTE = 10_000 # Documentos por insert_many.
+EXPONENTE_ZIPF = 1.0 # Popularidad de categorías, tags y artículos: el k-ésimo más popular pesa 1/k^s.
+
+
+class MuestreadorZipf:
+    """Elige elementos con distribución de Zipf (unos pocos muy populares y una cola larga)."""
+
+    def __init__(self, elementos, aleatorio, exponente=EXPONENTE_ZIPF):
+        self.elementos = list(elementos)
+        aleatorio.shuffle(self.elementos) # El más popular no tiene por qué ser el primero creado.
+        self.acumulado = list(itertools.accumulate(1 / (k ** exponente) for k in range(1, len(self.elementos) + 1)))
+        self.aleatorio = aleatorio
+
+    def elegir(self):
+        indice = bisect.bisect_left(self.acumulado, self.aleatorio.random() * self.acumulado[-1])
+        return self.elementos[min(indice, len(self.elementos) - 1)]
+
+    def elegir_distintos(self, cantidad):
+        """Elige 'cantidad' elementos distintos (para las categorías/tags de un artículo)."""
+        cantidad = min(cantidad, len(self.elementos))
+        elegidos = []
+        while len(elegidos) < cantidad:
+            elemento = self.elegir()
+            if elemento not in elegidos:
+                elegidos.append(elemento)
+        return elegidos
+
+
+def _insertar_por_lotes(coleccion, documentos, tamano_lote=TAMANO_LOTE):
+    """Inserta un iterable de documentos en lotes sin orden. Retorna la cantidad insertada."""
+    total, lote = 0, []
+    for documento in documentos:
+        lote.append(documento)
+        if len(lote) == tamano_lote:
+            coleccion.insert_many(lote, ordered=False)
+            total += len(lote)
+            lote = []
+    if lote:
+        coleccion.insert_many(lote, ordered=False)
+        total += len(lote)
+    return total
+
+
+def generar(db, usuarios=1000, articulos=100_000, comentarios=0, categorias=50, tags=500, semilla=42):
+    """
+    Reemplaza las colecciones de 'db' por un blog sintético con la forma de Blog_Recetas (incluido el
+    modelo de lectura de los artículos). Misma semilla y escala = mismo contenido (solo cambian los _id).
+    Retorna la escala generada.
+    """
+    aleatorio = random.Random(semilla)
+    inicio = time.perf_counter()
+    for nombre in ["users", "categories", "tags", "articles", "comments"]:
+        db[nombre].drop()
+
+    # Los _id se generan en el cliente para poder referenciarlos antes de insertar.
+    emails = {ObjectId(): f"usuario{i}@correo.com" for i in range(usuarios)}
+    _insertar_por_lotes(db["users"], ({"_id": i, "name": f"Usuario {n}", "email": e, "password": "123"}
+                                      for n, (i, e) in enumerate(emails.items())))
+    nombres_categorias = {ObjectId(): f"categoria {i}" for i in range(categorias)}
+    _insertar_por_lotes(db["categories"], ({"_id": i, "name": n} for i, n in nombres_categorias.items()))
+    nombres_tags = {ObjectId(): f"tag {i}" for i in range(tags)}
+    _insertar_por_lotes(db["tags"], ({"_id": i, "name": n} for i, n in nombres_tags.items()))
+
+    ids_usuarios = list(emails)
+    zipf_categorias = MuestreadorZipf(nombres_categorias, aleatorio)
+    zipf_tags = MuestreadorZipf(nombres_tags, aleatorio)
+    ids_articulos = [ObjectId() for _ in range(articulos)]
+    fechas = {id_articulo: FECHA_BASE + datetime.timedelta(minutes=i) for i, id_articulo in enumerate(ids_articulos)}
+
+    # Comentarios primero: cada artículo necesita su 'comment_count'. Unas pocas recetas concentran la mayoría.
+    conteos = dict.fromkeys(ids_articulos, 0)
+    if comentarios and articulos:
+        zipf_articulos = MuestreadorZipf(ids_articulos, aleatorio)
+
+        def documentos_comentarios():
+            for i in range(comentarios):
+                id_articulo = zipf_articulos.elegir()
+                conteos[id_articulo] += 1
+                yield {
+                    "article_id": id_articulo,
+                    "user_id": aleatorio.choice(ids_usuarios),
+                    "text": " ".join(aleatorio.choices(PALABRAS, k=8)),
+                    "date": fechas[id_articulo] + datetime.timedelta(minutes=aleatorio.randint(1, 60 * 24 * 30)),
+                }
+        _insertar_por_lotes(db["comments"], documentos_comentarios())
+
+    def documentos_articulos():
+        for id_articulo in ids_articulos:
+            id_usuario = aleatorio.choice(ids_usuarios)
+            ids_categorias = zipf_categorias.elegir_distintos(2)
+            ids_tags = zipf_tags.elegir_distintos(4)
+            yield {
+                "_id": id_articulo,
+                "title": " ".join(aleatorio.sample(PALABRAS, 3)),
+                "text": " ".join(aleatorio.choices(PALABRAS, k=30)),
+                "date": fechas[id_articulo],
+                "user_id": id_usuario,
+                "categories": ids_categorias,
+                "tags": ids_tags,
+                # Modelo de lectura (ver GestorArticulo.construir_proyeccion).
+                "author_email": emails[id_usuario],
+                "category_names": [nombres_categorias[i] for i in ids_categorias],
+                "tag_names": [nombres_tags[i] for i in ids_tags],
+                "comment_count": conteos[id_articulo],
+            }
+    _insertar_por_lotes(db["articles"], documentos_articulos())
+
+    escala = {"usuarios": usuarios, "articulos": articulos, "comentarios": comentarios,
+              "categorias": categorias, "tags": tags, "semilla": semilla}
+    print(f"Generado en '{db.name}' en {time.perf_counter() - inicio:.1f} s: {escala}")
+    return escala
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un blog de recetas sintético (distribución de Zipf).")
+    parser.add_argument("--base", default=DB_BENCHMARK, help="Base de datos destino (se reemplaza).")
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--articulos", type=int, default=100_000)
+    parser.add_argument("--comentarios", type=int, default=0)
+    parser.add_argument("--categorias", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--semilla", type=int, default=42)
+    argumentos = parser.parse_args()
+
+    generar(obtener_cliente()[argumentos.base], argumentos.usuarios, argumentos.articulos, argumentos.comentarios,
+            argumentos.categorias, argumentos.tags, argumentos.semilla)
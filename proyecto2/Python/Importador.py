@@ -0,0 +1,162 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from bson import json_util
+from pymongo import InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+# Importaciones de nuestros módulos
+from Conexion import obtener_cliente, DB_NAME
+
+# --- Configuración de la Importación/Exportación ---
+# Volcados de mongoexport incluidos en el repositorio (uno por colección: 'proyecto2.<coleccion>.json').
+DIRECTORIO_VOLCADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Mongosh")
+COLECCIONES = ["users", "categories", "tags", "articles", "comments"]
+TAMANO_LOTE = 1000 # Documentos por insert_many/bulk_write.
+TAMANO_BLOQUE = 1 << 20 # Bytes leídos del archivo por vez (1 MB).
+
+# Decodificador de Extended JSON ($oid, $date, ...) que se reutiliza para cada documento.
+_decodificador = json.JSONDecoder(object_pairs_hook=json_util.object_pairs_hook)
+
+
+def leer_documentos(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Generador que lee un archivo Extended JSON documento por documento, sin cargarlo entero en memoria.
+    Acepta un arreglo JSON (mongoexport --jsonArray) o un documento por línea (JSONL).
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        buffer, posicion, fin_archivo = "", 0, False
+        while True:
+            # Salta espacios y los separadores del arreglo ('[', ',' y ']').
+            while posicion < len(buffer) and buffer[posicion] in " \t\r\n[],":
+                posicion += 1
+            if posicion >= len(buffer):
+                if fin_archivo:
+                    return
+                buffer, posicion = archivo.read(tamano_bloque), 0
+                fin_archivo = not buffer
+                continue
+            try:
+                documento, posicion = _decodificador.raw_decode(buffer, posicion)
+            except json.JSONDecodeError:
+                if fin_archivo:
+                    raise # El archivo termina con un documento incompleto.
+                # El documento sigue en el próximo bloque: descarta lo ya leído y agrega más texto.
+                bloque = archivo.read(tamano_bloque)
+                fin_archivo = not bloque
+                buffer, posicion = buffer[posicion:] + bloque, 0
+                continue
+            yield documento
+
+
+def nombre_coleccion(ruta):
+    """'proyecto2.articles.json' -> 'articles' (el prefijo es el nombre de la base exportada)."""
+    return os.path.basename(ruta).split(".")[-2]
+
+
+def _escribir_lote(coleccion, lote, modo):
+    """Escribe un lote sin orden (el servidor sigue con el resto si un documento falla). Retorna (escritos, errores)."""
+    try:
+        if modo == "insertar":
+            return len(coleccion.insert_many(lote, ordered=False).inserted_ids), 0
+        # Upsert por _id: importar dos veces el mismo volcado no duplica documentos.
+        operaciones = [ReplaceOne({"_id": d["_id"]}, d, upsert=True) if "_id" in d else InsertOne(d) for d in lote]
+        resultado = coleccion.bulk_write(operaciones, ordered=False)
+        return resultado.upserted_count + resultado.matched_count + resultado.inserted_count, 0
+    except BulkWriteError as e:
+        # Ej: _id o email duplicado. Se cuentan los errores y se sigue con el siguiente lote.
+        errores = e.details.get("writeErrors", [])
+        return len(lote) - len(errores), len(errores)
+
+
+def importar(ruta, coleccion, tamano_lote=TAMANO_LOTE, modo="upsert", hilos=4):
+    """
+    Importa un archivo a la colección en lotes. Mientras un lote se escribe (en un hilo) se sigue
+    leyendo el archivo. Retorna {"documentos", "errores", "segundos"}.
+    """
+    escritos, errores, lote, pendientes = 0, 0, [], set()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        def recoger(bloquear):
+            nonlocal escritos, errores, pendientes
+            terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED) if bloquear else (pendientes, set())
+            for futuro in terminados:
+                cantidad, fallidos = futuro.result()
+                escritos += cantidad
+                errores += fallidos
+
+        for documento in leer_documentos(ruta):
+            lote.append(documento)
+            if len(lote) == tamano_lote:
+                pendientes.add(pool.submit(_escribir_lote, coleccion, lote, modo))
+                lote = []
+                if len(pendientes) >= hilos * 2:
+                    recoger(bloquear=True) # Limita los lotes en memoria si la base es más lenta que la lectura.
+        if lote:
+            pendientes.add(pool.submit(_escribir_lote, coleccion, lote, modo))
+        wait(pendientes)
+        recoger(bloquear=False)
+    return {"documentos": escritos, "errores": errores, "segundos": time.perf_counter() - inicio}
+
+
+def exportar(coleccion, ruta, formato="jsonl", tamano_lote=TAMANO_LOTE):
+    """
+    Escribe la colección en Extended JSON recorriendo el cursor (nunca la lista completa en memoria).
+    'jsonl': un documento por línea; 'json': un arreglo como el de mongoexport --jsonArray.
+    Retorna {"documentos", "segundos"}.
+    """
+    total = 0
+    inicio = time.perf_counter()
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        if formato == "json":
+            archivo.write("[")
+        for documento in coleccion.find().batch_size(tamano_lote):
+            if formato == "json" and total:
+                archivo.write(",")
+            archivo.write(json_util.dumps(documento, json_options=json_util.RELAXED_JSON_OPTIONS))
+            archivo.write("\n")
+            total += 1
+        if formato == "json":
+            archivo.write("]\n")
+    return {"documentos": total, "segundos": time.perf_counter() - inicio}
+
+
+def _reportar(accion, nombre, resultado):
+    """Imprime documentos, errores y throughput (documentos por minuto) de una operación."""
+    por_minuto = resultado["documentos"] / max(resultado["segundos"], 1e-9) * 60
+    errores = f", {resultado['errores']} errores" if resultado.get("errores") else ""
+    print(f"[{nombre}] {accion} {resultado['documentos']} documentos{errores} en "
+          f"{resultado['segundos']:.2f} s ({por_minuto:,.0f} docs/min)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa/exporta colecciones en Extended JSON por lotes.")
+    parser.add_argument("accion", choices=["importar", "exportar"])
+    parser.add_argument("rutas", nargs="*",
+                        help="Importar: archivos (por defecto ../Mongosh/*.json). Exportar: colecciones (por defecto todas).")
+    parser.add_argument("--base", default=DB_NAME, help="Base de datos destino/origen.")
+    parser.add_argument("--coleccion", help="Importar todos los archivos a esta colección (por defecto, según el nombre).")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Documentos por lote.")
+    parser.add_argument("--hilos", type=int, default=4, help="Lotes escritos en paralelo al importar.")
+    parser.add_argument("--modo", choices=["upsert", "insertar"], default="upsert",
+                        help="upsert por _id (reimportable) o insert_many (más rápido en colecciones vacías).")
+    parser.add_argument("--directorio", default=".", help="Exportar: carpeta de salida.")
+    parser.add_argument("--formato", choices=["jsonl", "json"], default="jsonl", help="Exportar: formato de salida.")
+    argumentos = parser.parse_args()
+
+    db = obtener_cliente()[argumentos.base]
+    if argumentos.accion == "importar":
+        rutas = argumentos.rutas or sorted(glob.glob(os.path.join(DIRECTORIO_VOLCADOS, "*.json")))
+        for ruta in rutas:
+            nombre = argumentos.coleccion or nombre_coleccion(ruta)
+            _reportar("Importados", nombre, importar(ruta, db[nombre], argumentos.lote, argumentos.modo, argumentos.hilos))
+        print("Si se importaron artículos o comentarios, ejecuta Reparar.py para completar su modelo de lectura.")
+    else:
+        for nombre in argumentos.rutas or COLECCIONES:
+            extension = "jsonl" if argumentos.formato == "jsonl" else "json"
+            ruta = os.path.join(argumentos.directorio, f"{argumentos.base}.{nombre}.{extension}")
+            _reportar("Exportados", nombre, exportar(db[nombre], ruta, argumentos.formato, argumentos.lote))
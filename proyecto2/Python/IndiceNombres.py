@@ -0,0 +1,199 @@
+import bisect
+import heapq
+import os
+import unicodedata
+from difflib import SequenceMatcher
+
+# --- Configuración del Índice de Nombres ---
+MAX_CANDIDATOS = 200 # Nombres que se puntúan como máximo por cada sugerencia aproximada (costo acotado).
+MAX_LETRAS_SIGUIENTES = 40 # Letras distintas que se prueban en el punto donde la consulta deja de coincidir.
+PUNTAJE_MINIMO = 0.5 # Parecido mínimo (0 a 1) para que un nombre se sugiera.
+FIN_PREFIJO = "\U0010ffff" # Mayor carácter posible: clave + FIN_PREFIJO acota todas las claves que empiezan con 'clave'.
+
+
+class _TablaSinAcentos(dict):
+    """Tabla para str.translate que quita los acentos de cada carácter y recuerda el resultado."""
+
+    def __missing__(self, codigo):
+        descompuesto = unicodedata.normalize("NFKD", chr(codigo))
+        self[codigo] = "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+        return self[codigo]
+
+
+_SIN_ACENTOS = _TablaSinAcentos()
+
+
+def normalizar(texto):
+    """Forma de comparación de un nombre: sin mayúsculas ni acentos ("Café Ñandú" -> "cafe nandu")."""
+    texto = str(texto).casefold()
+    if texto.isascii():
+        return texto # Camino rápido: la mayoría de los nombres y emails no tienen acentos.
+    return texto.translate(_SIN_ACENTOS) # Cada carácter se descompone una sola vez en todo el proceso.
+
+
+def _clave(nombre):
+    """Clave normalizada; si coincide con el nombre se reutiliza el mismo objeto (no duplica memoria)."""
+    clave = normalizar(nombre)
+    return nombre if clave == nombre else clave
+
+
+class IndiceNombres:
+    """
+    Nombres ordenados por su forma normalizada en dos listas paralelas (claves y nombres originales):
+    búsqueda por prefijo en O(log n) con bisect, sugerencias aproximadas acotadas e iteración en orden sin copiar.
+    No usa candado propio: GestorEntidad lo consulta y lo modifica con su candado tomado.
+    """
+
+    def __init__(self, nombres=()):
+        self.claves = [] # Claves normalizadas, ordenadas (con el nombre original como desempate).
+        self.nombres = [] # Nombres originales, en el mismo orden que 'claves'.
+        self.cargar(nombres)
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def cargar(self, nombres):
+        """Reemplaza el contenido con 'nombres' (un solo ordenamiento, O(n log n))."""
+        pares = sorted((_clave(nombre), nombre) for nombre in nombres)
+        self.claves = [clave for clave, _ in pares]
+        self.nombres = [nombre for _, nombre in pares]
+
+    def cargar_ordenados(self, nombres):
+        """
+        Como cargar, para nombres que ya vienen en el orden del índice (ej: los de una instantánea): solo
+        normaliza y verifica el orden en O(n). Si no están en orden, los ordena.
+        """
+        nombres = list(nombres)
+        claves = list(map(_clave, nombres))
+        pares = zip(zip(claves, nombres), zip(claves[1:], nombres[1:]))
+        if all(anterior < siguiente for anterior, siguiente in pares):
+            self.claves, self.nombres = claves, nombres
+        else:
+            self.cargar(nombres)
+
+    # --- Actualización Incremental ---
+
+    def _ubicar(self, nombre):
+        """Posición donde está (o iría) 'nombre'. Retorna (posicion, clave)."""
+        clave = _clave(nombre)
+        inicio = bisect.bisect_left(self.claves, clave)
+        fin = bisect.bisect_right(self.claves, clave, inicio)
+        # Entre claves iguales (ej: "Café" y "cafe") el orden lo define el nombre original.
+        return bisect.bisect_left(self.nombres, nombre, inicio, fin), clave
+
+    def agregar(self, nombre):
+        """Agrega un nombre en su lugar. Retorna False si ya estaba."""
+        posicion, clave = self._ubicar(nombre)
+        if posicion < len(self.nombres) and self.nombres[posicion] == nombre:
+            return False
+        self.claves.insert(posicion, clave)
+        self.nombres.insert(posicion, nombre)
+        return True
+
+    def quitar(self, nombre):
+        """Quita un nombre. Retorna False si no estaba."""
+        posicion, _ = self._ubicar(nombre)
+        if posicion >= len(self.nombres) or self.nombres[posicion] != nombre:
+            return False
+        del self.claves[posicion]
+        del self.nombres[posicion]
+        return True
+
+    # --- Consultas ---
+
+    def _rango(self, clave):
+        """Posiciones [inicio, fin) de las claves que empiezan con 'clave' (dos búsquedas binarias)."""
+        inicio = bisect.bisect_left(self.claves, clave)
+        return inicio, bisect.bisect_left(self.claves, clave + FIN_PREFIJO, inicio)
+
+    def buscar_prefijo(self, prefijo, limite=20, despues_de=None):
+        """
+        Retorna hasta 'limite' nombres que empiezan con 'prefijo' (sin mayúsculas ni acentos), en orden.
+        'despues_de' (el último nombre de la página anterior) continúa la lista aunque haya cambiado mientras tanto.
+        """
+        inicio, fin = self._rango(normalizar(prefijo))
+        if despues_de is not None:
+            posicion, _ = self._ubicar(despues_de)
+            if posicion < len(self.nombres) and self.nombres[posicion] == despues_de:
+                posicion += 1
+            inicio = max(inicio, posicion)
+        return self.nombres[inicio:min(fin, inicio + limite)]
+
+    def contar_prefijo(self, prefijo):
+        """Cantidad de nombres que empiezan con 'prefijo', sin recorrerlos."""
+        inicio, fin = self._rango(normalizar(prefijo))
+        return fin - inicio
+
+    def iterar(self, prefijo=""):
+        """Recorre en orden los nombres que empiezan con 'prefijo' sin copiar la lista (no modificar mientras tanto)."""
+        inicio, fin = self._rango(normalizar(prefijo))
+        nombres = self.nombres
+        for posicion in range(inicio, fin):
+            yield nombres[posicion]
+
+    def _letras_siguientes(self, base):
+        """Letras distintas que siguen a 'base' en las claves (una búsqueda binaria por letra, sin recorrer el rango)."""
+        inicio, fin = self._rango(base)
+        letras = []
+        while inicio < fin and len(letras) < MAX_LETRAS_SIGUIENTES:
+            clave = self.claves[inicio]
+            if len(clave) == len(base):
+                inicio += 1
+                continue
+            letras.append(clave[len(base)])
+            inicio = bisect.bisect_left(self.claves, base + clave[len(base)] + FIN_PREFIJO, inicio, fin)
+        return letras
+
+    def _variantes(self, consulta):
+        """
+        Consultas a probar: donde 'consulta' deja de coincidir con las claves se corrige un error de tipeo
+        (una letra de más, de menos, equivocada o dos letras cambiadas de lugar).
+        """
+        posicion = bisect.bisect_left(self.claves, consulta)
+        # El prefijo coincidente más largo lo comparte con alguna de sus dos vecinas en el orden.
+        largo = max(len(os.path.commonprefix([consulta, self.claves[vecina]]))
+                    for vecina in (posicion - 1, posicion) if 0 <= vecina < len(self.claves))
+        if largo == len(consulta):
+            return [consulta]
+        base, resto = consulta[:largo], consulta[largo:]
+        variantes = [consulta, base + resto[1:]]
+        if len(resto) > 1:
+            variantes.append(base + resto[1] + resto[0] + resto[2:])
+        for letra in self._letras_siguientes(base):
+            variantes.append(base + letra + resto[1:])
+            variantes.append(base + letra + resto)
+        return variantes
+
+    def sugerir(self, texto, cantidad=5, max_candidatos=MAX_CANDIDATOS):
+        """
+        Retorna los 'cantidad' nombres más parecidos a 'texto' (ej: con errores de tipeo), del más al menos parecido.
+        Solo se puntúan hasta 'max_candidatos' nombres: los que siguen en el orden a cada variante de la consulta.
+        A igual parecido gana el primero en orden alfabético.
+        """
+        consulta = normalizar(texto)
+        if not consulta or not self.claves:
+            return []
+        variantes = self._variantes(consulta)
+        ventana = max(cantidad, max_candidatos // len(variantes))
+        candidatos = {} # { posicion: None } sin repetidos y en el orden en que se encontraron.
+        for variante in variantes:
+            inicio = bisect.bisect_left(self.claves, variante)
+            for posicion in range(max(0, inicio - 1), min(len(self.claves), inicio + ventana)):
+                candidatos[posicion] = None
+            if len(candidatos) >= max_candidatos:
+                break
+
+        comparador = SequenceMatcher(autojunk=False)
+        comparador.set_seq2(consulta) # La consulta se analiza una sola vez.
+        puntajes = []
+        for posicion in candidatos:
+            clave = self.claves[posicion]
+            # Se compara con el comienzo de la clave (una letra más, por si falta una): "pastle" ~ "pastel de papa".
+            comparador.set_seq1(clave[:len(consulta) + 1])
+            # real_quick_ratio y quick_ratio son cotas superiores baratas: descartan sin calcular el ratio exacto.
+            if comparador.real_quick_ratio() < PUNTAJE_MINIMO or comparador.quick_ratio() < PUNTAJE_MINIMO:
+                continue
+            puntaje = comparador.ratio() + (0.1 if clave.startswith(consulta) else 0)
+            if puntaje >= PUNTAJE_MINIMO:
+                puntajes.append((puntaje, -posicion))
+        return [self.nombres[-menos_posicion] for _, menos_posicion in heapq.nlargest(cantidad, puntajes)]
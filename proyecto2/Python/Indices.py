@@ -0,0 +1,144 @@
+import argparse
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+# Importaciones de nuestros módulos
+from Conexion import DB
+from Cache import CacheResultados
+from Logica import (GestorUsuario, GestorCategoria, GestorEtiqueta, GestorComentario, GestorArticulo,
+                    TAMANO_PAGINA, TAMANO_PAGINA_COMENTARIOS)
+
+# --- Especificación Declarativa de Índices ---
+# Índices que las consultas de Logica.py y Menu.py necesitan, por colección.
+ESPECIFICACION_INDICES = {
+    "users": [
+        # GestorUsuario.autenticar busca por email (y el email identifica al usuario en toda la app).
+        IndexModel([("email", ASCENDING)], name="email_unico", unique=True),
+        # GestorEntidad.sondear_cambios: documentos modificados desde la última marca (sin recorrer la colección).
+        IndexModel([("last_modified", ASCENDING)], name="modificados_por_fecha"),
+    ],
+    "comments": [
+        # GestorComentario.obtener_pagina_comentarios: por artículo, paginación por llaves sobre (date, _id).
+        IndexModel([("article_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="comentarios_por_articulo_fecha"),
+    ],
+    "articles": [
+        # Paginación por llaves de GestorArticulo.obtener_pagina sobre (date, _id) descendente.
+        IndexModel([("date", DESCENDING), ("_id", DESCENDING)], name="articulos_por_fecha"),
+        # Índices multikey para las búsquedas por categoría/tag resueltas a _id.
+        IndexModel([("categories", ASCENDING)], name="articulos_por_categoria"),
+        IndexModel([("tags", ASCENDING)], name="articulos_por_tag"),
+        # Búsquedas por autor resueltas a _id.
+        IndexModel([("user_id", ASCENDING)], name="articulos_por_autor"),
+        # Búsqueda por relevancia (Busqueda.MotorBusqueda): stemming en español, el título pesa más que el texto.
+        IndexModel([("title", TEXT), ("text", TEXT)], name="busqueda_texto",
+                   weights={"title": 10, "text": 1}, default_language="spanish"),
+    ],
+    "categories": [
+        IndexModel([("name", ASCENDING)], name="nombre_unico", unique=True),
+        IndexModel([("last_modified", ASCENDING)], name="modificados_por_fecha"),
+    ],
+    "tags": [
+        IndexModel([("name", ASCENDING)], name="nombre_unico", unique=True),
+        IndexModel([("last_modified", ASCENDING)], name="modificados_por_fecha"),
+    ],
+}
+
+
+def asegurar_indices(db=None):
+    """Crea los índices de la especificación que todavía no existen. Retorna {coleccion: [mensajes]}."""
+    db = db if db is not None else DB
+    reporte = {}
+    for nombre_coleccion, indices in ESPECIFICACION_INDICES.items():
+        coleccion = db[nombre_coleccion]
+        existentes = coleccion.index_information() # { nombre_indice: {...} }
+        mensajes = []
+        for indice in indices:
+            nombre_indice = indice.document["name"]
+            if nombre_indice in existentes:
+                continue
+            try:
+                coleccion.create_indexes([indice])
+                mensajes.append(f"Creado índice '{nombre_indice}'.")
+            except Exception as e:
+                # Ej: un índice único no se puede crear si ya hay valores duplicados.
+                mensajes.append(f"No se pudo crear '{nombre_indice}': {e}")
+        reporte[nombre_coleccion] = mensajes
+    return reporte
+
+
+def _usa_collscan(plan):
+    """Busca recursivamente una etapa COLLSCAN en el plan ganador (ignora los planes rechazados)."""
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_usa_collscan(valor) for clave, valor in plan.items() if clave != "rejectedPlans")
+    if isinstance(plan, list):
+        return any(_usa_collscan(valor) for valor in plan)
+    return False
+
+
+def consultas_representativas(db):
+    """Consultas reales de Logica/Menu con valores tomados de la base (o de relleno si está vacía)."""
+    usuario = db["users"].find_one({}, {"email": 1}) or {}
+    articulo = db["articles"].find_one({}, {"categories": 1, "tags": 1, "user_id": 1}) or {}
+    categoria = (articulo.get("categories") or [None])[0]
+    tag = (articulo.get("tags") or [None])[0]
+    # El pipeline lo arma un gestor de esta misma base (no el global, que puede apuntar a otra).
+    usuarios = GestorUsuario(db=db)
+    articulos = GestorArticulo(db=db, usuarios=usuarios, categorias=GestorCategoria(db=db), etiquetas=GestorEtiqueta(db=db),
+                               comentarios=GestorComentario(db=db, usuarios=usuarios), cache=CacheResultados(max_entradas=0))
+
+    return {
+        "GestorUsuario.autenticar":
+            {"find": "users", "filter": {"email": usuario.get("email", ""), "password": ""}},
+        "GestorComentario.obtener_pagina_comentarios":
+            {"find": "comments", "filter": {"article_id": articulo.get("_id")},
+             "sort": {"date": -1, "_id": -1}, "limit": TAMANO_PAGINA_COMENTARIOS + 1},
+        "GestorArticulo.obtener_pagina (sin filtro)":
+            {"aggregate": "articles", "cursor": {},
+             "pipeline": articulos.construir_pipeline("", TAMANO_PAGINA + 1)},
+        "Búsqueda de artículos por categoría":
+            {"find": "articles", "filter": {"categories": {"$in": [categoria]}}},
+        "Búsqueda de artículos por tag":
+            {"find": "articles", "filter": {"tags": {"$in": [tag]}}},
+        "Búsqueda de artículos por autor":
+            {"find": "articles", "filter": {"user_id": {"$in": [articulo.get("user_id")]}}},
+        "Búsqueda de artículos por título/texto ($text)":
+            {"find": "articles", "filter": {"$text": {"$search": "receta", "$language": "spanish"}}},
+        "Búsqueda de artículos por título/texto ($regex)":
+            {"find": "articles", "filter": {"$or": [
+                {"title": {"$regex": "receta", "$options": "i"}},
+                {"text": {"$regex": "receta", "$options": "i"}}]}},
+        "Categoría por nombre": {"find": "categories", "filter": {"name": ""}},
+        "Tag por nombre": {"find": "tags", "filter": {"name": ""}},
+    }
+
+
+def verificar_consultas(db=None):
+    """Ejecuta explain() sobre las consultas representativas. Retorna {descripcion: usa_collscan}."""
+    db = db if db is not None else DB
+    resultado = {}
+    for descripcion, comando in consultas_representativas(db).items():
+        try:
+            plan = db.command("explain", comando, verbosity="queryPlanner")
+            resultado[descripcion] = _usa_collscan(plan)
+        except Exception as e:
+            print(f"No se pudo obtener el plan de '{descripcion}': {e}")
+            resultado[descripcion] = None
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crea y verifica los índices de la base Blog_Recetas.")
+    parser.add_argument("--solo-verificar", action="store_true", help="No crea índices, solo reporta los planes.")
+    argumentos = parser.parse_args()
+
+    if not argumentos.solo_verificar:
+        for nombre_coleccion, mensajes in asegurar_indices().items():
+            for mensaje in mensajes or ["Índices completos."]:
+                print(f"[{nombre_coleccion}] {mensaje}")
+
+    print("\n--- Planes de Consulta ---")
+    for descripcion, usa_collscan in verificar_consultas().items():
+        estado = "ERROR" if usa_collscan is None else ("COLLSCAN" if usa_collscan else "OK (usa índice)")
+        print(f"{descripcion:<55} {estado}")
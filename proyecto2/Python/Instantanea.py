@@ -0,0 +1,92 @@
+import datetime
+import json
+import os
+import sqlite3
+import time
+
+from bson.objectid import ObjectId
+
+# --- Configuración de las Instantáneas ---
+# Archivo local con la última copia de los mapas {nombre: _id}. BLOG_INSTANTANEA=0 las desactiva.
+RUTA_INSTANTANEA = os.environ.get("BLOG_INSTANTANEA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mapas.sqlite3"))
+VERSION_FORMATO = 1 # Cambia si cambia el formato o el orden del índice de nombres: las instantáneas viejas se ignoran.
+TAMANO_ID = 12 # Bytes de un ObjectId.
+
+
+class InstantaneaMapas:
+    """
+    Copia local (SQLite) de los mapas de los gestores para no leer las colecciones completas al iniciar.
+    Cada mapa es una fila: los _id empaquetados (12 bytes cada uno), los nombres en el orden del índice
+    (JSON) y las marcas desde las que se reconcilia con la base (mayor 'last_modified', mayor _id y total).
+    """
+
+    def __init__(self, ruta=RUTA_INSTANTANEA):
+        self.ruta = ruta
+
+    def activa(self):
+        return self.ruta not in ("", "0")
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=10) # Login y Menú pueden escribir a la vez: SQLite los ordena.
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS mapas (base TEXT, coleccion TEXT, clave_nombre TEXT, version INTEGER, "
+            "ids BLOB, nombres BLOB, marca_modificacion TEXT, ultimo_id BLOB, total INTEGER, guardada REAL, "
+            "PRIMARY KEY (base, coleccion, clave_nombre))")
+        return conexion
+
+    def guardar(self, base, coleccion, clave_nombre, nombres, ids, marca_modificacion, ultimo_id, total):
+        """
+        Reemplaza la instantánea de una colección. 'nombres' e 'ids' van alineados (ids[i] es el _id de nombres[i]).
+        Retorna False si no se pudo guardar (ej: hay _id que no son ObjectId).
+        """
+        if not self.activa() or not all(isinstance(id_objeto, ObjectId) for id_objeto in ids):
+            return False
+        fila = (base, coleccion, clave_nombre, VERSION_FORMATO,
+                b"".join(id_objeto.binary for id_objeto in ids),
+                json.dumps(nombres, ensure_ascii=False).encode("utf-8"),
+                marca_modificacion.isoformat() if marca_modificacion else None,
+                ultimo_id.binary if ultimo_id else None, total, time.time())
+        conexion = self._conectar()
+        try:
+            with conexion: # Una sola transacción: un lector nunca ve una instantánea a medio escribir.
+                conexion.execute("INSERT OR REPLACE INTO mapas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", fila)
+        finally:
+            conexion.close()
+        return True
+
+    def cargar(self, base, coleccion, clave_nombre, empaquetados=False):
+        """
+        Retorna {"nombres", "ids", "marca_modificacion", "ultimo_id", "total", "guardada"} de la colección,
+        o None si no hay instantánea (o es de otro formato). Con 'empaquetados', "ids" son los bytes tal como
+        están guardados (12 por _id) en vez de una lista de ObjectId.
+        """
+        if not self.activa() or not os.path.exists(self.ruta):
+            return None
+        conexion = self._conectar()
+        try:
+            fila = conexion.execute(
+                "SELECT ids, nombres, marca_modificacion, ultimo_id, total, guardada FROM mapas "
+                "WHERE base = ? AND coleccion = ? AND clave_nombre = ? AND version = ?",
+                (base, coleccion, clave_nombre, VERSION_FORMATO)).fetchone()
+        finally:
+            conexion.close()
+        if fila is None:
+            return None
+        ids, nombres, marca, ultimo_id, total, guardada = fila
+        return {
+            "nombres": json.loads(nombres),
+            "ids": ids if empaquetados else [ObjectId(ids[inicio:inicio + TAMANO_ID]) for inicio in range(0, len(ids), TAMANO_ID)],
+            "marca_modificacion": datetime.datetime.fromisoformat(marca) if marca else None,
+            "ultimo_id": ObjectId(ultimo_id) if ultimo_id else None,
+            "total": total,
+            "guardada": guardada,
+        }
+
+    def borrar(self):
+        """Elimina el archivo de instantáneas (la próxima carga lee las colecciones completas)."""
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
+
+
+# Instancia compartida por todos los gestores del proceso.
+instantanea_mapas = InstantaneaMapas()
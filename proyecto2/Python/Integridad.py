@@ -0,0 +1,197 @@
+import argparse
+import threading
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+# Importaciones de nuestros módulos
+from Conexion import obtener_db
+from Monitoreo import instrumentar
+
+# --- Configuración de la Integridad Referencial ---
+TAMANO_LOTE = 1000 # Ids por update_many/delete_many en cascada y documentos revisados por lote del barrido.
+PAUSA_LOTE_S = 0.05 # Pausa del barrido entre lotes: no compite con la aplicación por el servidor.
+INTERVALO_BARRIDO_S = 6 * 3600 # Cada cuánto repite el barrido el hilo de fondo.
+
+# Referencias entre colecciones: qué hacer con los documentos que apuntan a uno eliminado.
+# "quitar": se sacan el id (y su nombre en el modelo de lectura) del arreglo. "eliminar": se borra el documento.
+REGLAS = {
+    "categories": [{"origen": "articles", "campo": "categories", "accion": "quitar",
+                    "campo_nombres": "category_names", "clave_nombre": "name"}],
+    "tags": [{"origen": "articles", "campo": "tags", "accion": "quitar",
+              "campo_nombres": "tag_names", "clave_nombre": "name"}],
+    "articles": [{"origen": "comments", "campo": "article_id", "accion": "eliminar"}],
+}
+
+
+def _lotes(lista, tamano=TAMANO_LOTE):
+    """Divide una lista en lotes de 'tamano' elementos."""
+    for inicio in range(0, len(lista), tamano):
+        yield lista[inicio:inicio + tamano]
+
+
+class GestorIntegridad:
+    """Elimina documentos propagando la eliminación a sus referencias (REGLAS) y barre las referencias huérfanas."""
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else obtener_db()
+        self.transacciones = None # Se averigua en la primera eliminación (requiere replica set o mongos).
+        self.hilo_barrido = None
+        self.detener_barrido = threading.Event()
+
+    def soporta_transacciones(self):
+        """True si el servidor es un replica set o un clúster con mongos."""
+        if self.transacciones is None:
+            try:
+                hola = self.db.command("hello")
+                self.transacciones = "setName" in hola or hola.get("msg") == "isdbgrid"
+            except PyMongoError:
+                self.transacciones = False
+        return self.transacciones
+
+    # --- Eliminación en Cascada ---
+
+    @instrumentar
+    def eliminar(self, nombre_coleccion, ids):
+        """
+        Elimina los documentos 'ids' de la colección y limpia sus referencias según REGLAS, en una
+        transacción si el servidor la soporta. Retorna cuántos documentos de la colección se eliminaron.
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        if not self.soporta_transacciones():
+            # Standalone: primero el documento y luego las referencias. Si algo falla a mitad, el barrido lo corrige.
+            return self._eliminar(nombre_coleccion, ids, None)
+        with self.db.client.start_session() as sesion:
+            # with_transaction reintenta ante errores transitorios (ej: conflicto de escritura).
+            return sesion.with_transaction(lambda s: self._eliminar(nombre_coleccion, ids, s))
+
+    def _eliminar(self, nombre_coleccion, ids, sesion):
+        """Cuerpo de la eliminación (dentro o fuera de una transacción)."""
+        reglas = REGLAS.get(nombre_coleccion, [])
+        claves = {regla["clave_nombre"] for regla in reglas if regla.get("clave_nombre")}
+        nombres = {} # Nombres de lo eliminado, para quitarlos también del modelo de lectura.
+        if claves:
+            for documento in self.db[nombre_coleccion].find({"_id": {"$in": ids}}, dict.fromkeys(claves, 1), session=sesion):
+                nombres[documento["_id"]] = documento
+
+        eliminados = 0
+        for lote in _lotes(ids):
+            eliminados += self.db[nombre_coleccion].delete_many({"_id": {"$in": lote}}, session=sesion).deleted_count
+        for regla in reglas:
+            coleccion = self.db[regla["origen"]]
+            for lote in _lotes(ids):
+                if regla["accion"] == "eliminar":
+                    coleccion.delete_many({regla["campo"]: {"$in": lote}}, session=sesion)
+                    continue
+                quitar = {regla["campo"]: {"$in": lote}}
+                nombres_lote = [nombres[i][regla["clave_nombre"]] for i in lote if regla["clave_nombre"] in nombres.get(i, {})]
+                if nombres_lote:
+                    quitar[regla["campo_nombres"]] = {"$in": nombres_lote}
+                coleccion.update_many({regla["campo"]: {"$in": lote}}, {"$pull": quitar}, session=sesion)
+        return eliminados
+
+    # --- Barrido de Huérfanos ---
+    # Referencias que quedaron de antes de la cascada, de escrituras hechas fuera de la aplicación o de una
+    # cascada interrumpida. Se recorren por lotes de _id (cada lote es una consulta corta, sin transacción).
+
+    @instrumentar
+    def barrer_huerfanos(self, tamano_lote=TAMANO_LOTE, pausa_s=PAUSA_LOTE_S):
+        """Revisa todas las REGLAS y corrige las referencias a documentos que no existen. Retorna {regla: corregidos}."""
+        resultado = {}
+        for destino, reglas in REGLAS.items():
+            for regla in reglas:
+                clave = f"{regla['origen']}.{regla['campo']}"
+                resultado[clave] = self._barrer_regla(destino, regla, tamano_lote, pausa_s)
+                if self.detener_barrido.is_set():
+                    return resultado
+        return resultado
+
+    def _barrer_regla(self, destino, regla, tamano_lote, pausa_s):
+        """Barre una regla por lotes de _id ascendente. Retorna cuántos documentos corrigió."""
+        origen, campo = self.db[regla["origen"]], regla["campo"]
+        proyeccion = {campo: 1}
+        corregidos, ultimo_id = 0, None
+        while not self.detener_barrido.is_set():
+            filtro = {"_id": {"$gt": ultimo_id}} if ultimo_id is not None else {}
+            documentos = list(origen.find(filtro, proyeccion).sort("_id", 1).limit(tamano_lote))
+            if not documentos:
+                break
+            ultimo_id = documentos[-1]["_id"]
+
+            # Una sola consulta al destino por lote: qué referencias existen (y su nombre).
+            referencias = set()
+            for documento in documentos:
+                valor = documento.get(campo)
+                referencias.update(valor if isinstance(valor, list) else [valor])
+            referencias.discard(None)
+            clave_nombre = regla.get("clave_nombre")
+            existentes = {d["_id"]: d.get(clave_nombre) for d in self.db[destino].find(
+                {"_id": {"$in": list(referencias)}}, {clave_nombre: 1} if clave_nombre else {"_id": 1})}
+            if len(existentes) < len(referencias):
+                corregidos += self._corregir_lote(origen, regla, documentos, existentes)
+            time.sleep(pausa_s)
+        return corregidos
+
+    def _corregir_lote(self, origen, regla, documentos, existentes):
+        """Corrige los documentos del lote que apuntan a referencias que no están en 'existentes'."""
+        campo = regla["campo"]
+        if regla["accion"] == "eliminar":
+            huerfanos = [d["_id"] for d in documentos if d.get(campo) is not None and d[campo] not in existentes]
+            return origen.delete_many({"_id": {"$in": huerfanos}}).deleted_count if huerfanos else 0
+
+        operaciones = []
+        for documento in documentos:
+            ids = documento.get(campo) or []
+            validos = [i for i in ids if i in existentes]
+            if len(validos) == len(ids):
+                continue
+            cambios = {campo: validos}
+            if regla.get("campo_nombres"):
+                cambios[regla["campo_nombres"]] = [existentes[i] for i in validos if existentes[i] is not None]
+            # El filtro incluye el arreglo leído: si el documento cambió mientras tanto, no se pisa (se corrige en el próximo barrido).
+            operaciones.append(UpdateOne({"_id": documento["_id"], campo: ids}, {"$set": cambios}))
+        if not operaciones:
+            return 0
+        return origen.bulk_write(operaciones, ordered=False).modified_count
+
+    def iniciar_barrido(self, intervalo=INTERVALO_BARRIDO_S):
+        """Repite barrer_huerfanos en un hilo de fondo cada 'intervalo' segundos (el primero, al iniciar)."""
+        if self.hilo_barrido is not None and self.hilo_barrido.is_alive():
+            return self.hilo_barrido
+        self.detener_barrido.clear()
+
+        def barrer_periodicamente():
+            while not self.detener_barrido.is_set():
+                try:
+                    corregidos = self.barrer_huerfanos()
+                    if any(corregidos.values()):
+                        print(f"Referencias huérfanas corregidas: {corregidos}")
+                except Exception as e:
+                    print(f"Error en el barrido de huérfanos: {e}")
+                self.detener_barrido.wait(intervalo)
+
+        self.hilo_barrido = threading.Thread(target=barrer_periodicamente, daemon=True, name="barrido-huerfanos")
+        self.hilo_barrido.start()
+        return self.hilo_barrido
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corrige las referencias a categorías, tags y artículos eliminados.")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Documentos revisados por lote.")
+    parser.add_argument("--pausa", type=float, default=PAUSA_LOTE_S, help="Segundos de pausa entre lotes.")
+    parser.add_argument("--continuo", action="store_true",
+                        help=f"Repite el barrido cada {INTERVALO_BARRIDO_S} s hasta Ctrl+C (el proceso único del barrido).")
+    argumentos = parser.parse_args()
+
+    if argumentos.continuo:
+        try:
+            GestorIntegridad().iniciar_barrido().join()
+        except KeyboardInterrupt:
+            pass
+        raise SystemExit
+    inicio = time.perf_counter()
+    corregidos = GestorIntegridad().barrer_huerfanos(argumentos.lote, argumentos.pausa)
+    print(f"Corregidos {corregidos} en {time.perf_counter() - inicio:.1f} s.")
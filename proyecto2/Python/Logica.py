@@ -1,43 +1,458 @@
-from Conexion import DB 
+from Conexion import obtener_db
+from Busqueda import MotorBusqueda
+from Monitoreo import instrumentar, monitor_comandos
+from Cache import CacheResultados
+from Integridad import GestorIntegridad
+from IndiceNombres import IndiceNombres
+from Instantanea import instantanea_mapas
+from MapaCompacto import MapaCompacto, TAMANO_ID
+import bson
 from bson.objectid import ObjectId 
+from pymongo import UpdateOne, InsertOne
+from pymongo.errors import OperationFailure, BulkWriteError
+from collections import Counter
+from contextlib import contextmanager
 import datetime
+import os
+import re
+import threading
 
-class GestorEntidad:
+# Cantidad de artículos por página en los listados.
+TAMANO_PAGINA = 20
+# Cantidad de comentarios por página ("últimos 50, cargar más").
+TAMANO_PAGINA_COMENTARIOS = 50
+
+# Modelo de lectura desnormalizado: cada artículo guarda 'author_email', 'category_names', 'tag_names' y
+# 'comment_count', mantenidos en cada escritura, y el listado no necesita $lookup.
+# BLOG_PROYECCION_ARTICULOS=0 vuelve a los JOINs en cada consulta.
+USAR_PROYECCION = os.environ.get("BLOG_PROYECCION_ARTICULOS", "1") != "0"
+CAMPOS_PROYECCION = ("author_email", "category_names", "tag_names", "comment_count")
+
+# Mapas {nombre: _id} en un MapaCompacto (buffers empaquetados) en vez de dos diccionarios: mucha menos memoria
+# con cientos de miles de usuarios, a cambio de consultas algo más lentas. BLOG_MAPA_COMPACTO=1 lo activa.
+USAR_MAPA_COMPACTO = os.environ.get("BLOG_MAPA_COMPACTO", "0") == "1"
+
+# Borrados hechos por otros procesos (sondear_cambios): se cuentan los documentos por rangos de _id (solo el índice
+# de _id) y se comparan con el mapa; un rango distinto se divide en dos hasta tener a lo sumo estos ids, que se releen.
+TAMANO_RANGO_CONCILIACION = 1000
+
+# Modo de obtener_pagina para la búsqueda mientras se escribe: el término literal en cualquier parte del texto.
+MODO_PARCIAL = "parcial"
+
+# Caracteres con significado en una regex: un término que los usa no se refina en memoria (ver _refinar_busqueda).
+CARACTERES_REGEX = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+# 'comment' y maxTimeMS de las consultas de artículos del hilo actual (ver limitar_consultas). Por hilo, como
+# la etiqueta de Monitoreo, para no agregar parámetros a cada método que termina en una consulta.
+_limites = threading.local()
+
+
+@contextmanager
+def limitar_consultas(comentario=None, max_ms=None):
+    """
+    Dentro del bloque, las consultas de artículos de este hilo llevan 'comment' (para poder interrumpirlas
+    con GestorArticulo.cancelar_consultas) y maxTimeMS. Lo usa la búsqueda mientras se escribe del Menú.
+    """
+    anteriores = getattr(_limites, "opciones", None)
+    _limites.opciones = (comentario, max_ms)
+    try:
+        yield
+    finally:
+        _limites.opciones = anteriores
+
+def patron_busqueda(termino):
+    """
+    Patrón de regex para un término de búsqueda: el término tal cual si es una regex válida y, si no (ej: "(" o "["
+    a mitad de escribir), el texto literal escapado. Así el $regex del servidor y re.compile nunca fallan por él.
+    """
+    try:
+        re.compile(termino)
+        return termino
+    except re.error:
+        return re.escape(termino)
+
+def _limites_actuales():
+    """(comentario, max_ms) de limitar_consultas en este hilo, o (None, None)."""
+    return getattr(_limites, "opciones", None) or (None, None)
+
+
+class MapaEntidad:
+    """
+    Mapas en memoria {Nombre/Email: ID} de una colección, con su índice de nombres, su instantánea local y
+    sus suscriptores. No consulta la base: lo comparten GestorEntidad y GestorEntidadAsync (LogicaAsync.py).
+    """
+
+    def __init__(self, coleccion, clave_nombre="name"):
+        self.coleccion = coleccion # Colección de MongoDB (síncrona o asíncrona: aquí solo se usa su nombre).
+        self.clave_nombre = clave_nombre # Clave del campo que se usará para el mapeo (ej: 'name' o 'email'); None: sin mapa.
+        self.mapa_nombre_a_id = {} # Diccionario cache para mapear { "Nombre/Email": ObjectId(...) }.
+        self.mapa_id_a_nombre = {} # Mapa inverso { ObjectId(...): "Nombre/Email" } para renombrar/eliminar sin releer.
+        self.indice = IndiceNombres() # Nombres ordenados: búsqueda por prefijo y sugerencias sin recorrer el mapa.
+        self.total_documentos = 0 # Documentos en la colección según el mapa (detecta cambios externos al sondear).
+        self.marca_modificacion = None # Mayor 'last_modified' visto (sondeo versionado de cambios).
+        self.ultimo_id = None # Mayor _id visto: detecta inserciones sin 'last_modified' (ej: desde mongosh).
+        self.instantanea = instantanea_mapas # Copia local de los mapas para iniciar sin leer la colección.
+        self.compacto = USAR_MAPA_COMPACTO # Ver _construir_mapas.
+        self.mapa_cargado = False # True después de la primera carga completa (el Menú reutiliza la del Login).
+        self.suscriptores = [] # Funciones avisadas cuando una entidad se renombra o se elimina.
+        self.candado = threading.RLock() # Los mapas se modifican desde los hilos del ejecutor de tareas.
+
+    def _proyeccion(self, *campos):
+        """Proyección con _id, los 'campos' pedidos y la clave de nombre (si la colección tiene una)."""
+        proyeccion = dict.fromkeys(("_id",) + campos, 1)
+        if self.clave_nombre is not None:
+            proyeccion[self.clave_nombre] = 1
+        return proyeccion
+
+    def _instalar_mapas(self, nombres, ids, total, marca, ultimo_id, ordenados=False):
+        """
+        Arma los mapas y el índice a partir de listas alineadas y los reemplaza de una sola vez, para que los
+        lectores nunca vean un mapa a medio cargar. 'ordenados': los nombres ya vienen en el orden del índice.
+        """
+        mapa_nuevo, mapa_inverso = self._construir_mapas(nombres, ids)
+        # Se ordena fuera del candado: los lectores no esperan.
+        if ordenados:
+            indice = IndiceNombres()
+            indice.cargar_ordenados(nombres) # Ej: los de una instantánea (no se vuelven a ordenar).
+        else:
+            indice = IndiceNombres(dict.fromkeys(nombres))
+        with self.candado:
+            self.mapa_nombre_a_id = mapa_nuevo
+            self.mapa_id_a_nombre = mapa_inverso
+            self.indice = indice
+            self.total_documentos = total
+            self.marca_modificacion = marca
+            self.ultimo_id = ultimo_id
+            self.mapa_cargado = True
+
+    def _construir_mapas(self, nombres, ids):
+        """
+        Retorna (mapa_nombre_a_id, mapa_id_a_nombre) a partir de listas alineadas: dos diccionarios o, con
+        'compacto', las dos vistas de un MapaCompacto (se usan igual). 'ids' pueden venir ya empaquetados.
+        """
+        empaquetados = isinstance(ids, (bytes, bytearray))
+        if self.compacto and (empaquetados or all(isinstance(id_objeto, ObjectId) for id_objeto in ids)):
+            mapa = MapaCompacto(nombres, ids)
+            return mapa.por_nombre, mapa.por_id
+        if empaquetados:
+            ids = [ObjectId(ids[inicio:inicio + TAMANO_ID]) for inicio in range(0, len(ids), TAMANO_ID)]
+        # Sin compactar (o con _id que no son ObjectId, que el MapaCompacto no admite).
+        return dict(zip(nombres, ids)), dict(zip(ids, nombres))
+
+    # --- Instantánea Local ---
+
+    @instrumentar
+    def cargar_instantanea(self):
+        """Carga los mapas desde la instantánea local. Retorna False si no hay una para esta colección."""
+        try:
+            # Con el mapa compacto los _id se usan empaquetados, tal como están en el archivo.
+            datos = self.instantanea.cargar(self.coleccion.database.name, self.coleccion.name, self.clave_nombre,
+                                            empaquetados=self.compacto)
+        except Exception as e:
+            print(f"No se pudo leer la instantánea de {self.coleccion.name}: {e}")
+            return False
+        if datos is None:
+            return False
+        self._instalar_mapas(datos["nombres"], datos["ids"], datos["total"], datos["marca_modificacion"],
+                             datos["ultimo_id"], ordenados=True) # Se guardaron en el orden del índice.
+        print(f"Cargados {len(self.mapa_nombre_a_id)} elementos de la instantánea de '{self.coleccion.name}'.")
+        return True
+
+    def guardar_instantanea(self):
+        """Guarda los mapas actuales en la instantánea local (los errores solo se informan)."""
+        if not self.instantanea.activa() or self.clave_nombre is None:
+            return
+        with self.candado:
+            # Copia de las referencias: el archivo se escribe fuera del candado.
+            nombres = list(self.indice.nombres)
+            marca, ultimo_id, total = self.marca_modificacion, self.ultimo_id, self.total_documentos
+            ids = [self.mapa_nombre_a_id[nombre] for nombre in nombres]
+        try:
+            self.instantanea.guardar(self.coleccion.database.name, self.coleccion.name, self.clave_nombre,
+                                     nombres, ids, marca, ultimo_id, total)
+        except Exception as e:
+            print(f"No se pudo guardar la instantánea de {self.coleccion.name}: {e}")
+
+    # --- Actualización Incremental del Mapa ---
+
+    def _registrar(self, nombre, id_objeto):
+        """Agrega (o renombra) una entidad en los mapas sin consultar la base de datos."""
+        with self.candado:
+            nombre_anterior = self.mapa_id_a_nombre.get(id_objeto)
+            if nombre_anterior is not None and self.mapa_nombre_a_id.get(nombre_anterior) == id_objeto:
+                del self.mapa_nombre_a_id[nombre_anterior] # Renombrado: se quita la clave vieja.
+                self.indice.quitar(nombre_anterior)
+            if nombre not in self.mapa_nombre_a_id:
+                self.indice.agregar(nombre)
+            self.mapa_nombre_a_id[nombre] = id_objeto
+            self.mapa_id_a_nombre[id_objeto] = nombre
+
+    def _olvidar(self, id_objeto):
+        """Quita una entidad de los mapas sin consultar la base de datos."""
+        with self.candado:
+            # Primero la clave por nombre: en un MapaCompacto las dos vistas comparten la entrada.
+            nombre = self.mapa_id_a_nombre.get(id_objeto)
+            if nombre is not None and self.mapa_nombre_a_id.get(nombre) == id_objeto:
+                del self.mapa_nombre_a_id[nombre]
+                self.indice.quitar(nombre)
+            self.mapa_id_a_nombre.pop(id_objeto, None)
+
+    # --- Suscriptores ---
+
+    def suscribir(self, funcion):
+        """
+        Registra funcion(evento, id_objeto, nombre_anterior, nombre_nuevo), llamada después de cada
+        escritura propia que renombra ("renombrado") o elimina ("eliminado") una entidad.
+        eliminar_muchos avisa un solo "eliminados" con la lista de ids y la de nombres anteriores.
+        GestorComentario avisa además "comentarios_cambiados" con el _id del artículo comentado.
+        """
+        self.suscriptores.append(funcion)
+
+    def _notificar(self, evento, id_objeto, nombre_anterior=None, nombre_nuevo=None):
+        """Avisa a los suscriptores. Un suscriptor que falla no afecta la escritura ya hecha."""
+        for funcion in self.suscriptores:
+            try:
+                funcion(evento, id_objeto, nombre_anterior, nombre_nuevo)
+            except Exception as e:
+                print(f"Error notificando '{evento}' de {self.coleccion.name}: {e}")
+
+    # --- Consultas al Mapa (sin la base de datos) ---
+
+    def obtener_todos_los_nombres(self):
+        """Retorna una lista de todos los nombres (o emails) en orden alfabético."""
+        with self.candado:
+            return list(self.indice.nombres)
+
+    def buscar_por_prefijo(self, prefijo, limite=20):
+        """Retorna hasta 'limite' nombres que empiezan con 'prefijo' (sin mayúsculas ni acentos), en orden alfabético."""
+        with self.candado:
+            return self.indice.buscar_prefijo(prefijo, limite)
+
+    def contar_por_prefijo(self, prefijo):
+        """Cantidad de nombres que empiezan con 'prefijo', sin recorrerlos."""
+        with self.candado:
+            return self.indice.contar_prefijo(prefijo)
+
+    def sugerir_nombres(self, texto, cantidad=5):
+        """Retorna los nombres más parecidos a 'texto' (ej: "pastle" -> "pastel") para cuando el prefijo no encuentra nada."""
+        with self.candado:
+            return self.indice.sugerir(texto, cantidad)
+
+    def iterar_nombres(self, prefijo="", tamano_pagina=1000):
+        """
+        Recorre en orden los nombres que empiezan con 'prefijo' por páginas: el candado se toma solo para copiar
+        cada página y la siguiente continúa después del último nombre (las escrituras intermedias no la desordenan).
+        """
+        ultimo = None
+        while True:
+            with self.candado:
+                pagina = self.indice.buscar_prefijo(prefijo, tamano_pagina, despues_de=ultimo)
+            if not pagina:
+                return
+            yield from pagina
+            ultimo = pagina[-1]
+
+    def obtener_id_por_nombre(self, nombre):
+        """Retorna el ObjectId (el ID único de MongoDB) dado un nombre o email."""
+        return self.mapa_nombre_a_id.get(nombre) # Busca en el mapa cache.
+
+    def obtener_nombre_por_id(self, id_objeto):
+        """Retorna el nombre (o email) de una entidad dado su ObjectId, usando el mapa inverso."""
+        return self.mapa_id_a_nombre.get(id_objeto)
+
+    def obtener_ids_por_patron(self, patron):
+        """Retorna los ObjectId cuyos nombres (o emails) coinciden con el patrón, sin consultar la base de datos."""
+        # Misma semántica que {"$regex": patron, "$options": "i"}; un patrón inválido se busca como texto literal.
+        expresion = re.compile(patron_busqueda(patron), re.IGNORECASE)
+        with self.candado:
+            return [id_objeto for nombre, id_objeto in self.mapa_nombre_a_id.items() if expresion.search(str(nombre))]
+
+
+class GestorEntidad(MapaEntidad):
     """Clase base para gestionar colecciones, mapas de ID/Nombre y operaciones CRUD."""
     
-    def __init__(self, nombre_coleccion, clave_nombre="name"):
-        # Verifica si la conexión a la base de datos (DB) falló previamente.
-        if DB is None:
-            raise ConnectionError("La conexión a la base de datos no está disponible.")
-            
-        self.coleccion = DB[nombre_coleccion] # Asigna la colección de MongoDB (ej: DB['users']).
-        self.clave_nombre = clave_nombre # Clave del campo que se usará para el mapeo (ej: 'name' o 'email').
-        self.mapa_nombre_a_id = {} # Diccionario cache para mapear { "Nombre/Email": ObjectId(...) }.
+    def __init__(self, nombre_coleccion, clave_nombre="name", db=None):
+        # 'db' permite apuntar el gestor a otra base de datos (ej: la de benchmarks); por defecto usa la
+        # del cliente compartido. Crear un gestor no abre conexiones: la red se usa en la primera consulta.
+        db = db if db is not None else obtener_db()
+
+        super().__init__(db[nombre_coleccion], clave_nombre) # Asigna la colección de MongoDB (ej: DB['users']).
+        self.hilo_sincronizacion = None # Hilo de iniciar_sincronizacion, si está corriendo.
+        self.detener_sincronizacion = threading.Event() # Señal para terminar el hilo de sincronización.
+        self.integridad = GestorIntegridad(db) # Las eliminaciones limpian las referencias a lo eliminado.
 
+    @instrumentar
     def cargar_mapa(self):
         """Carga el mapa {Nombre/Email: ID} de la colección para consultas rápidas."""
-        self.mapa_nombre_a_id.clear() # Limpia el mapa anterior.
+        nombres, ids, total = [], [], 0
         try:
             # Busca todos los documentos, seleccionando solo el ID y la clave de nombre/email.
-            entidades = self.coleccion.find({}, {"_id": 1, self.clave_nombre: 1})
+            entidades = self.coleccion.find({}, self._proyeccion("last_modified"))
+            marca = ultimo_id = None
             for entidad in entidades:
+                total += 1
+                if isinstance(entidad["_id"], ObjectId) and (ultimo_id is None or entidad["_id"] > ultimo_id):
+                    ultimo_id = entidad["_id"]
                 if self.clave_nombre in entidad:
-                    # Rellena el mapa cache: Clave=Nombre/Email, Valor=ObjectId.
-                    self.mapa_nombre_a_id[entidad[self.clave_nombre]] = entidad["_id"]
+                    # Pares Nombre/Email - ObjectId para armar los mapas cache.
+                    nombres.append(entidad[self.clave_nombre])
+                    ids.append(entidad["_id"])
+                if entidad.get("last_modified") and (marca is None or entidad["last_modified"] > marca):
+                    marca = entidad["last_modified"]
+            self._instalar_mapas(nombres, ids, total, marca, ultimo_id)
             print(f"Cargados {len(self.mapa_nombre_a_id)} elementos en '{self.coleccion.name}'.")
+            self.guardar_instantanea()
         except Exception as e:
             print(f"Error cargando el mapa para {self.coleccion.name}: {e}")
-            
-    def obtener_todos_los_nombres(self):
-        """Retorna una lista de todos los nombres (o emails) para OptionMenus/Checkboxes."""
-        return list(self.mapa_nombre_a_id.keys())
-    
-    def obtener_id_por_nombre(self, nombre):
-        """Retorna el ObjectId (el ID único de MongoDB) dado un nombre o email."""
-        return self.mapa_nombre_a_id.get(nombre) # Busca en el mapa cache.
+
+    # --- Instantánea Local (arranque sin leer la colección completa) ---
+
+    def iniciar_mapa(self):
+        """
+        Deja el mapa listo lo antes posible: desde la instantánea local si existe, reconciliándola con la base
+        en un hilo de fondo; si no hay instantánea, leyendo la colección completa.
+        """
+        if not self.cargar_instantanea():
+            self.cargar_mapa()
+            return
+        threading.Thread(target=self.reconciliar, daemon=True, name=f"reconciliacion-{self.coleccion.name}").start()
+
+    def reconciliar(self):
+        """Aplica los cambios hechos en la base desde la instantánea y la actualiza si hubo alguno."""
+        if self.sondear_cambios():
+            self.guardar_instantanea()
+
+    # --- Sincronización con Escrituras de Otros Procesos ---
+
+    def _aplicar_cambio(self, cambio):
+        """Aplica al mapa un evento de change stream de MongoDB (también llegan las escrituras propias)."""
+        tipo = cambio["operationType"]
+        id_objeto = cambio["documentKey"]["_id"]
+        if tipo == "delete":
+            self._olvidar(id_objeto)
+        elif tipo in ("insert", "replace", "update"):
+            documento = cambio.get("fullDocument") or {}
+            if self.clave_nombre in documento:
+                self._registrar(documento[self.clave_nombre], id_objeto)
+
+    def iniciar_sincronizacion(self, intervalo=5.0):
+        """
+        Mantiene el mapa al día con escrituras de otros procesos en un hilo de fondo.
+        Usa un change stream si el servidor es un replica set; si no, sondea por 'last_modified'.
+        """
+        if self.hilo_sincronizacion is not None and self.hilo_sincronizacion.is_alive():
+            return self.hilo_sincronizacion # Ya está sincronizando (ej: lo inició otra ventana).
+        self.detener_sincronizacion.clear()
+        hilo = threading.Thread(target=self._sincronizar, args=(intervalo,), daemon=True,
+                                name=f"sincronizacion-{self.coleccion.name}")
+        hilo.start()
+        self.hilo_sincronizacion = hilo
+        return hilo
+
+    def _sincronizar(self, intervalo):
+        """Cuerpo del hilo de sincronización: change stream o, como alternativa, sondeo versionado."""
+        try:
+            with self.coleccion.watch(full_document="updateLookup", max_await_time_ms=int(intervalo * 1000)) as flujo:
+                while not self.detener_sincronizacion.is_set():
+                    cambio = flujo.try_next()
+                    if cambio is not None:
+                        self._aplicar_cambio(cambio)
+        except OperationFailure:
+            # Servidor standalone (sin replica set): los change streams no están disponibles.
+            while not self.detener_sincronizacion.wait(intervalo):
+                self.sondear_cambios()
+        except Exception as e:
+            print(f"Sincronización detenida para {self.coleccion.name}: {e}")
+
+    @instrumentar
+    def sondear_cambios(self):
+        """
+        Trae solo los documentos modificados (o insertados) desde las últimas marcas y, si el total sigue sin
+        coincidir (ej: borrados desde mongosh), busca los borrados con _conciliar_borrados. Retorna cuántos cambios aplicó.
+        """
+        cambios = 0
+        try:
+            filtro = {"last_modified": {"$gt": self.marca_modificacion}} if self.marca_modificacion else {"last_modified": {"$exists": True}}
+            if self.ultimo_id is not None:
+                # Índices de 'last_modified' y de _id: cada rama del $or se resuelve con el suyo.
+                filtro = {"$or": [filtro, {"_id": {"$gt": self.ultimo_id}}]}
+            for entidad in self.coleccion.find(filtro, self._proyeccion("last_modified")):
+                cambios += 1
+                with self.candado:
+                    if entidad["_id"] not in self.mapa_id_a_nombre:
+                        self.total_documentos += 1 # Insertado por otro proceso (los propios ya están en el mapa).
+                if self.clave_nombre in entidad:
+                    self._registrar(entidad[self.clave_nombre], entidad["_id"])
+                if entidad.get("last_modified") and (self.marca_modificacion is None or entidad["last_modified"] > self.marca_modificacion):
+                    self.marca_modificacion = entidad["last_modified"]
+                if isinstance(entidad["_id"], ObjectId) and (self.ultimo_id is None or entidad["_id"] > self.ultimo_id):
+                    self.ultimo_id = entidad["_id"]
+            # Un total distinto indica borrados (o inserciones sin marca ni _id nuevo).
+            total = self.coleccion.estimated_document_count()
+            if total != self.total_documentos:
+                cambios += self._conciliar_borrados()
+                with self.candado:
+                    self.total_documentos = total
+        except Exception as e:
+            print(f"Error sondeando cambios en {self.coleccion.name}: {e}")
+        return cambios
+
+    def _conciliar_borrados(self):
+        """
+        Quita del mapa los documentos que ya no existen sin releer la colección: cuenta por rangos de _id y
+        relee solo los rangos donde la cuenta no coincide con el mapa. Retorna cuántas entradas cambió.
+        """
+        with self.candado:
+            ids = list(self.mapa_id_a_nombre)
+        if not all(isinstance(id_objeto, ObjectId) for id_objeto in ids):
+            self.cargar_mapa() # Los rangos suponen _id comparables entre sí (ObjectId).
+            return 1
+        ids.sort()
+        cambios = 0
+        pendientes = [(0, len(ids))] # Rangos [inicio, fin) de 'ids'; el primero y el último quedan abiertos.
+        while pendientes:
+            inicio, fin = pendientes.pop()
+            rango = {}
+            if inicio > 0:
+                rango["$gte"] = ids[inicio]
+            if fin < len(ids):
+                rango["$lt"] = ids[fin]
+            filtro = {"_id": rango} if rango else {}
+            if self.coleccion.count_documents(filtro) == fin - inicio:
+                continue
+            if fin - inicio > TAMANO_RANGO_CONCILIACION:
+                medio = (inicio + fin) // 2
+                pendientes += [(inicio, medio), (medio, fin)]
+                continue
+            existentes = {entidad["_id"]: entidad.get(self.clave_nombre)
+                          for entidad in self.coleccion.find(filtro, self._proyeccion())}
+            for id_objeto in ids[inicio:fin]:
+                if id_objeto not in existentes:
+                    self._olvidar(id_objeto)
+                    cambios += 1
+            for id_objeto, nombre in existentes.items():
+                if nombre is not None and self.obtener_nombre_por_id(id_objeto) != nombre:
+                    self._registrar(nombre, id_objeto) # Insertado sin marca ni _id nuevo.
+                    cambios += 1
+        return cambios
+
+    @instrumentar
+    def obtener_nombres_por_ids(self, ids):
+        """
+        Retorna {ObjectId: nombre} para varios ids de una vez: usa el mapa inverso y lee de la base,
+        en una sola consulta, solo los que no estén en el mapa. Los ids que no existen no aparecen.
+        """
+        with self.candado:
+            nombres = {id_objeto: self.mapa_id_a_nombre.get(id_objeto) for id_objeto in ids}
+        faltantes = [id_objeto for id_objeto, nombre in nombres.items() if nombre is None]
+        if faltantes:
+            for documento in self.coleccion.find({"_id": {"$in": faltantes}}, self._proyeccion()):
+                nombres[documento["_id"]] = documento.get(self.clave_nombre)
+        return {id_objeto: nombre for id_objeto, nombre in nombres.items() if nombre is not None}
 
     # --- Operaciones CRUD Genéricas ---
     
+    @instrumentar
     def obtener_todos(self):
         """Retorna todos los documentos de la colección como una lista."""
         try:
@@ -46,44 +461,195 @@ class GestorEntidad:
             print(f"Error obteniendo todos los documentos para {self.coleccion.name}: {e}")
             return []
 
+    # --- Lectura por Bloques (listas virtuales) ---
+
+    @instrumentar
+    def obtener_bloque(self, despues_de=None, cantidad=100):
+        """
+        Retorna (documentos, siguiente): hasta 'cantidad' documentos en orden de _id a partir del
+        _id 'despues_de' (paginación por llaves), y el _id desde el cual pedir el bloque siguiente (o None).
+        """
+        filtro = {"_id": {"$gt": despues_de}} if despues_de is not None else {}
+        documentos = list(self.coleccion.find(filtro).sort("_id", 1).limit(cantidad + 1))
+        siguiente = documentos[cantidad - 1]["_id"] if len(documentos) > cantidad else None
+        return documentos[:cantidad], siguiente
+
+    @instrumentar
+    def id_en_posicion(self, desplazamiento):
+        """Cursor de obtener_bloque para empezar en la posición 'desplazamiento' (salto con skip sobre el índice _id)."""
+        if desplazamiento <= 0:
+            return None
+        anteriores = list(self.coleccion.find({}, {"_id": 1}).sort("_id", 1).skip(desplazamiento - 1).limit(1))
+        return anteriores[0]["_id"] if anteriores else None
+
+    @instrumentar
     def crear_uno(self, datos):
         """Inserta un nuevo documento en la colección."""
         try:
+            datos.setdefault("last_modified", datetime.datetime.now()) # Marca usada por el sondeo de cambios.
             resultado = self.coleccion.insert_one(datos)
-            self.cargar_mapa() # El mapa debe recargarse para incluir el nuevo elemento.
+            # Agrega solo el nuevo elemento al mapa (sin releer la colección).
+            with self.candado:
+                self.total_documentos += 1
+            if self.clave_nombre in datos:
+                self._registrar(datos[self.clave_nombre], resultado.inserted_id)
             return resultado.inserted_id # Retorna el ID generado por MongoDB.
         except Exception as e:
             print(f"Error creando el documento en {self.coleccion.name}: {e}")
             return None
 
+    @instrumentar
     def actualizar_uno(self, id_objeto, nuevos_datos):
         """Actualiza un documento por su ObjectId."""
         try:
             # Usa $set para actualizar solo los campos en 'nuevos_datos'.
-            resultado = self.coleccion.update_one({"_id": id_objeto}, {"$set": nuevos_datos})
-            self.cargar_mapa() # Recarga el mapa por si el nombre/email fue actualizado.
+            cambios = dict(nuevos_datos, last_modified=datetime.datetime.now())
+            nombre_anterior = self.obtener_nombre_por_id(id_objeto)
+            resultado = self.coleccion.update_one({"_id": id_objeto}, {"$set": cambios})
+            # Si el nombre/email cambió, se renombra la entrada del mapa y se avisa a los suscriptores.
+            if resultado.matched_count and self.clave_nombre in nuevos_datos:
+                nombre_nuevo = nuevos_datos[self.clave_nombre]
+                self._registrar(nombre_nuevo, id_objeto)
+                if nombre_nuevo != nombre_anterior:
+                    self._notificar("renombrado", id_objeto, nombre_anterior, nombre_nuevo)
             return resultado.modified_count # Retorna cuántos documentos fueron modificados (debería ser 1 o 0).
         except Exception as e:
             print(f"Error actualizando el documento en {self.coleccion.name}: {e}")
             return 0
 
+    @instrumentar
     def eliminar_uno(self, id_objeto):
         """Elimina un documento por su ObjectId."""
         try:
-            resultado = self.coleccion.delete_one({"_id": id_objeto})
-            self.cargar_mapa() # Recarga el mapa para eliminar la referencia del elemento borrado.
-            return resultado.deleted_count # Retorna cuántos documentos fueron eliminados.
+            nombre_anterior = self.obtener_nombre_por_id(id_objeto)
+            # Elimina el documento y, en cascada, sus referencias (ej: el tag dentro de 'articles.tags').
+            eliminados = self.integridad.eliminar(self.coleccion.name, [id_objeto])
+            if eliminados:
+                # Quita solo la referencia del elemento borrado.
+                with self.candado:
+                    self.total_documentos -= 1
+                self._olvidar(id_objeto)
+                self._notificar("eliminado", id_objeto, nombre_anterior)
+            return eliminados # Retorna cuántos documentos fueron eliminados.
         except Exception as e:
             print(f"Error eliminando el documento en {self.coleccion.name}: {e}")
             return 0
 
+    # --- Operaciones CRUD en Lote ---
+    # Una sola escritura sin orden por llamada: un elemento que falla (ej: nombre duplicado) no detiene
+    # a los demás, y cada error se reporta como {"indice", "id", "error"} según la posición en la entrada.
+
+    @staticmethod
+    def _errores_lote(error, ids):
+        """Convierte los writeErrors de un BulkWriteError en errores por elemento."""
+        return [{"indice": e["index"], "id": ids[e["index"]], "error": e.get("errmsg", "Error de escritura")}
+                for e in error.details.get("writeErrors", [])]
+
+    def _leer_existentes(self, ids):
+        """Retorna {id: nombre o None} de los ids que existen en la colección (una sola consulta)."""
+        return {documento["_id"]: documento.get(self.clave_nombre)
+                for documento in self.coleccion.find({"_id": {"$in": list(ids)}}, self._proyeccion())}
+
+    @instrumentar
+    def crear_muchos(self, lista_datos):
+        """
+        Inserta varios documentos en un bulk_write. Retorna {"ids": [...], "errores": [...]}, donde
+        ids[i] es el _id del documento i (None si falló).
+        """
+        ahora = datetime.datetime.now()
+        ids = []
+        for datos in lista_datos:
+            datos.setdefault("last_modified", ahora)
+            ids.append(datos.setdefault("_id", ObjectId())) # _id asignado aquí para conocerlo aunque otros fallen.
+        errores = []
+        if lista_datos:
+            try:
+                self.coleccion.bulk_write([InsertOne(datos) for datos in lista_datos], ordered=False)
+            except BulkWriteError as e:
+                errores = self._errores_lote(e, ids)
+        fallidos = {error["indice"] for error in errores}
+        # Actualiza el mapa una sola vez con los insertados.
+        with self.candado:
+            for indice, datos in enumerate(lista_datos):
+                if indice in fallidos:
+                    ids[indice] = None
+                    continue
+                self.total_documentos += 1
+                if self.clave_nombre in datos:
+                    self._registrar(datos[self.clave_nombre], datos["_id"])
+        return {"ids": ids, "errores": errores}
+
+    @instrumentar
+    def actualizar_muchos(self, cambios):
+        """
+        Aplica $set a varios documentos en un bulk_write. 'cambios' es una lista de (id_objeto, nuevos_datos).
+        Retorna {"modificados": n, "errores": [...]} (un id inexistente se reporta como error).
+        """
+        ids = [id_objeto for id_objeto, _ in cambios]
+        existentes = self._leer_existentes(ids) # También da el nombre anterior de cada uno.
+        errores = [{"indice": i, "id": id_objeto, "error": "No existe"}
+                   for i, id_objeto in enumerate(ids) if id_objeto not in existentes]
+        ahora = datetime.datetime.now()
+        operaciones, indices = [], [] # indices[k] = posición en 'cambios' de la operación k.
+        for indice, (id_objeto, nuevos_datos) in enumerate(cambios):
+            if id_objeto in existentes:
+                operaciones.append(UpdateOne({"_id": id_objeto}, {"$set": dict(nuevos_datos, last_modified=ahora)}))
+                indices.append(indice)
+        if not operaciones:
+            return {"modificados": 0, "errores": errores}
+
+        fallidos = set()
+        try:
+            modificados = self.coleccion.bulk_write(operaciones, ordered=False).modified_count
+        except BulkWriteError as e:
+            modificados = e.details.get("nModified", 0)
+            for error in self._errores_lote(e, [ids[i] for i in indices]):
+                error["indice"] = indices[error["indice"]]
+                fallidos.add(error["indice"])
+                errores.append(error)
+        # Renombra en el mapa y avisa a los suscriptores solo los que se escribieron.
+        for indice in indices:
+            id_objeto, nuevos_datos = cambios[indice]
+            if indice in fallidos or self.clave_nombre not in nuevos_datos:
+                continue
+            nombre_nuevo = nuevos_datos[self.clave_nombre]
+            self._registrar(nombre_nuevo, id_objeto)
+            if nombre_nuevo != existentes[id_objeto]:
+                self._notificar("renombrado", id_objeto, existentes[id_objeto], nombre_nuevo)
+        errores.sort(key=lambda error: error["indice"])
+        return {"modificados": modificados, "errores": errores}
+
+    @instrumentar
+    def eliminar_muchos(self, ids):
+        """
+        Elimina varios documentos (y sus referencias, con delete_many/update_many por lotes).
+        Retorna {"eliminados": n, "ids": [eliminados], "errores": [...]}.
+        Los suscriptores reciben un solo aviso "eliminados" para todo el lote.
+        """
+        ids = list(dict.fromkeys(ids)) # Sin repetidos (pegar la misma lista dos veces no genera errores).
+        existentes = self._leer_existentes(ids)
+        errores = [{"indice": i, "id": id_objeto, "error": "No existe"}
+                   for i, id_objeto in enumerate(ids) if id_objeto not in existentes]
+        a_eliminar = [id_objeto for id_objeto in ids if id_objeto in existentes]
+        if not a_eliminar:
+            return {"eliminados": 0, "ids": [], "errores": errores}
+
+        eliminados = self.integridad.eliminar(self.coleccion.name, a_eliminar)
+        with self.candado:
+            self.total_documentos -= eliminados
+            for id_objeto in a_eliminar:
+                self._olvidar(id_objeto)
+        self._notificar("eliminados", a_eliminar, [existentes[id_objeto] for id_objeto in a_eliminar])
+        return {"eliminados": eliminados, "ids": a_eliminar, "errores": errores}
+
 # --- Clases Específicas que Heredan de GestorEntidad ---
 
 class GestorUsuario(GestorEntidad):
-    def __init__(self):
+    def __init__(self, db=None):
         # Llama al constructor de la clase base, usando "email" como clave_nombre.
-        super().__init__("users", clave_nombre="email") 
+        super().__init__("users", clave_nombre="email", db=db) 
         
+    @instrumentar
     def autenticar(self, email, password):
         """Verifica el email y la contraseña contra la base de datos."""
         try:
@@ -96,41 +662,533 @@ class GestorUsuario(GestorEntidad):
             return None
 
 class GestorCategoria(GestorEntidad):
-    def __init__(self):
+    def __init__(self, db=None):
         # Usa la colección "categories" y "name" como clave.
-        super().__init__("categories", clave_nombre="name")
+        super().__init__("categories", clave_nombre="name", db=db)
         
 class GestorEtiqueta(GestorEntidad):
-    def __init__(self):
+    def __init__(self, db=None):
         # Usa la colección "tags" y "name" como clave.
-        super().__init__("tags", clave_nombre="name")
+        super().__init__("tags", clave_nombre="name", db=db)
         
-# --- Instancias Globales de Gestores ---
-# Estas son las instancias que se importan en Menu.py y Login.py.
-gestor_usuarios = GestorUsuario()
-gestor_categorias = GestorCategoria()
-gestor_etiquetas = GestorEtiqueta()
 
-class GestorArticulo:
+class ConsultasArticulo:
+    """
+    Filtros, pipelines y cursores del listado de artículos (sin consultar la base). Lo comparten GestorArticulo
+    y GestorArticuloAsync; usan 'usar_proyeccion' y los mapas de gestor_usuarios/categorias/etiquetas.
+    """
+
+    def construir_filtro_busqueda(self, termino_busqueda):
+        """Construye el filtro que se aplica ANTES de los $lookup, usando solo campos propios del artículo."""
+        if not termino_busqueda:
+            return {}
+
+        # Crea una consulta de expresión regular insensible a mayúsculas/minúsculas (escapada si no es válida).
+        consulta_regex = {"$regex": patron_busqueda(termino_busqueda), "$options": "i"}
+        condiciones = [
+            {"title": consulta_regex},
+            {"text": consulta_regex},
+        ]
+        condiciones += self._condiciones_relaciones(*self._resolver_relaciones(termino_busqueda))
+        return {"$or": condiciones}
+
+    def filtrar_articulos(self, articulos, termino_busqueda):
+        """Aplica en memoria el mismo filtro que construir_filtro_busqueda a artículos ya consultados."""
+        if not termino_busqueda:
+            return list(articulos)
+        patron = re.compile(patron_busqueda(termino_busqueda), re.IGNORECASE)
+        ids_autores, ids_categorias, ids_tags = (set(ids) for ids in self._resolver_relaciones(termino_busqueda))
+        return [articulo for articulo in articulos
+                if patron.search(articulo.get("title") or "") or patron.search(articulo.get("text") or "")
+                or articulo.get("user_id") in ids_autores
+                or not ids_categorias.isdisjoint(articulo.get("categories", []))
+                or not ids_tags.isdisjoint(articulo.get("tags", []))]
+
+    def _resolver_relaciones(self, patron):
+        """
+        Autor, categorías y tags se resuelven a conjuntos de _id con los mapas cache de los gestores,
+        así la búsqueda por nombre no necesita unir las colecciones para filtrar.
+        """
+        return (self.gestor_usuarios.obtener_ids_por_patron(patron),
+                self.gestor_categorias.obtener_ids_por_patron(patron),
+                self.gestor_etiquetas.obtener_ids_por_patron(patron))
+
+    def _condiciones_relaciones(self, ids_autores, ids_categorias, ids_tags):
+        """Condiciones $in sobre user_id/categories/tags (todas servidas por índices)."""
+        condiciones = []
+        if ids_autores:
+            condiciones.append({"user_id": {"$in": ids_autores}})
+        if ids_categorias:
+            condiciones.append({"categories": {"$in": ids_categorias}})
+        if ids_tags:
+            condiciones.append({"tags": {"$in": ids_tags}})
+        return condiciones
+
+    @staticmethod
+    def codificar_cursor(articulo):
+        """Convierte la llave (date, _id) de un artículo en un cursor de texto opaco."""
+        return f"{articulo['date'].isoformat()}|{articulo['_id']}"
+
+    @staticmethod
+    def decodificar_cursor(cursor):
+        """Convierte un cursor de texto en la llave (date, _id) que representa."""
+        fecha_str, id_str = cursor.split("|")
+        return datetime.datetime.fromisoformat(fecha_str), ObjectId(id_str)
+
+    def construir_filtro_pagina(self, cursor, hacia_atras=False):
+        """Filtro de paginación por llaves: artículos estrictamente después (o antes) de (date, _id)."""
+        if not cursor:
+            return {}
+        fecha, id_objeto = self.decodificar_cursor(cursor)
+        operador = "$gt" if hacia_atras else "$lt" # El orden normal es descendente (más recientes primero).
+        return {"$or": [
+            {"date": {operador: fecha}},
+            {"date": fecha, "_id": {operador: id_objeto}}
+        ]}
+
+    def construir_pipeline(self, termino_busqueda="", limite=None, cursor=None, hacia_atras=False):
+        """Construye el pipeline de agregación: primero filtra y luego une solo los artículos que sobreviven."""
+        filtro = self.construir_filtro_busqueda(termino_busqueda)
+        filtro_pagina = self.construir_filtro_pagina(cursor, hacia_atras)
+        if filtro and filtro_pagina:
+            filtro = {"$and": [filtro, filtro_pagina]}
+        else:
+            filtro = filtro or filtro_pagina
+
+        pipeline = [
+            # 1. $match: Aplica el filtro de búsqueda ANTES de los JOINs (puede usar índices).
+            { "$match": filtro }
+        ]
+        if limite:
+            # 2. $sort + $limit: Si se pide una página, solo esos artículos llegan a los JOINs.
+            orden = 1 if hacia_atras else -1
+            pipeline.append({ "$sort": {"date": orden, "_id": orden} })
+            pipeline.append({ "$limit": limite })
+
+        return pipeline + self._etapas_join()
+
+    def _etapas_join(self):
+        """Etapas que unen autor, categorías y tags a los artículos que ya pasaron el filtro."""
+        if self.usar_proyeccion:
+            return [] # Los nombres ya vienen guardados en cada artículo (modelo de lectura).
+        return [
+            # 3. $lookup: Trae la información del Autor (user_id -> users._id).
+            { "$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "author_details"}},
+            # 4. $lookup: Trae la información de las Categorías (categories -> categories._id).
+            { "$lookup": {"from": "categories", "localField": "categories", "foreignField": "_id", "as": "category_details"}},
+            # 5. $lookup: Trae la información de los Tags (tags -> tags._id).
+            { "$lookup": {"from": "tags", "localField": "tags", "foreignField": "_id", "as": "tag_details"}},
+
+            # 6. $unwind: Desanida el arreglo de 'author_details' (que solo tiene un elemento).
+            #    'preserveNullAndEmptyArrays': True permite que muestre artículos sin autor (aunque no debería).
+            { "$unwind": {"path": "$author_details", "preserveNullAndEmptyArrays": True}},
+        ]
+
+    @staticmethod
+    def normalizar_termino(termino_busqueda):
+        """Clave de caché del término: sin espacios en los extremos y en minúsculas (la búsqueda no distingue mayúsculas)."""
+        termino = termino_busqueda.strip()
+        # En una regex, \W y \w (o \S y \s) no son equivalentes: con escapes se respeta el término tal cual.
+        return termino if "\\" in termino else termino.lower()
+
+    def _etiquetas_cache(self, clave, articulos):
+        """
+        Etiquetas de invalidación de una página: los artículos consultados (incluido el extra que decide
+        si hay otra página), sus autores, categorías y tags, y el tipo de página.
+        """
+        termino, cursor, _, hacia_atras, *_ = clave
+        etiquetas = set()
+        for articulo in articulos:
+            etiquetas.add(("articulo", articulo["_id"]))
+            etiquetas.add(("relacion", articulo.get("user_id")))
+            etiquetas.update(("relacion", id_objeto) for id_objeto in articulo.get("categories", []))
+            etiquetas.update(("relacion", id_objeto) for id_objeto in articulo.get("tags", []))
+        if termino:
+            etiquetas.add("busqueda") # Cualquier escritura puede sumar o quitar resultados de una búsqueda.
+        elif cursor is None or hacia_atras:
+            etiquetas.add("inicio") # Un artículo nuevo (el más reciente) aparece al inicio del listado.
+        return etiquetas
+
+    def _armar_pagina(self, consultados, cursor, tamano_pagina, hacia_atras):
+        """Respuesta de una página por llaves a partir de los tamano_pagina + 1 artículos consultados."""
+        hay_mas = len(consultados) > tamano_pagina
+        articulos = consultados[:tamano_pagina]
+        if hacia_atras:
+            articulos.reverse() # Se consultó en orden ascendente; se devuelve en el orden normal.
+
+        # Hacia adelante, siempre hay página anterior si se partió de un cursor (y viceversa).
+        hay_siguiente = hay_mas if not hacia_atras else bool(cursor)
+        hay_anterior = hay_mas if hacia_atras else bool(cursor)
+        return {
+            "articulos": articulos,
+            "next_cursor": self.codificar_cursor(articulos[-1]) if articulos and hay_siguiente else None,
+            "prev_cursor": self.codificar_cursor(articulos[0]) if articulos and hay_anterior else None,
+        }
+
+
+class GestorArticulo(ConsultasArticulo):
     """Clase específica para Artículos. No hereda de GestorEntidad porque usa agregación compleja."""
-    def __init__(self):
-        if DB is None:
-            raise ConnectionError("La conexión a la base de datos no está disponible.")
-        self.coleccion_articulos = DB["articles"] # Referencia directa a la colección.
-    
+    def __init__(self, db=None, usuarios=None, categorias=None, etiquetas=None, proyeccion=None,
+                 comentarios=None, cache=None):
+        db = db if db is not None else obtener_db()
+        self.coleccion_articulos = db["articles"] # Referencia directa a la colección.
+        self.coleccion_comentarios = db["comments"] # Para recalcular 'comment_count' al reparar.
+        self.usar_proyeccion = USAR_PROYECCION if proyeccion is None else proyeccion
+        # Gestores cuyos mapas {Nombre: ID} se usan para resolver autor, categorías y tags antes del JOIN.
+        self.gestor_usuarios = usuarios or obtener_gestor("gestor_usuarios")
+        self.gestor_categorias = categorias or obtener_gestor("gestor_categorias")
+        self.gestor_etiquetas = etiquetas or obtener_gestor("gestor_etiquetas")
+        # Caché de páginas de artículos; cada escritura invalida solo las páginas que afecta.
+        self.cache = cache if cache is not None else CacheResultados()
+        self.integridad = GestorIntegridad(db) # Eliminar un artículo elimina también sus comentarios.
+        monitor_comandos.agregar_contadores("cache_articulos", self.cache.estadisticas)
+        # Motor de búsqueda por relevancia (índice de texto de MongoDB o índice invertido en memoria).
+        self.motor_busqueda = MotorBusqueda(self.coleccion_articulos)
+        # Renombrar o eliminar un autor/categoría/tag se propaga a la proyección de los artículos.
+        self.gestor_usuarios.suscribir(self._al_cambiar_usuario)
+        self.gestor_categorias.suscribir(lambda *evento: self._al_cambiar_relacion("categories", "category_names", *evento))
+        self.gestor_etiquetas.suscribir(lambda *evento: self._al_cambiar_relacion("tags", "tag_names", *evento))
+        # Crear o eliminar un comentario cambia el 'comment_count' que muestran las páginas.
+        (comentarios or obtener_gestor("gestor_comentarios")).suscribir(self._al_cambiar_comentarios)
+
     def obtener_coleccion(self):
         """Retorna el objeto de la colección 'articles'."""
         # Se usa para ejecutar comandos de agregación directamente desde Menu.py.
         return self.coleccion_articulos
-        
-gestor_articulos = GestorArticulo() # Instancia global para el gestor de artículos.
+
+    @instrumentar
+    def buscar_articulos(self, termino_busqueda="", limite=None):
+        """Ejecuta la búsqueda de artículos y retorna el cursor de la agregación."""
+        return self._agregar(self.construir_pipeline(termino_busqueda, limite))
+
+    @instrumentar
+    def obtener_pagina(self, termino_busqueda="", cursor=None, tamano_pagina=TAMANO_PAGINA, hacia_atras=False,
+                       modo=None):
+        """
+        Retorna una página de artículos ordenada por (date, _id) descendente.
+        'cursor' es el 'next_cursor' (o 'prev_cursor' con hacia_atras=True) de la página anterior.
+        Con un término de búsqueda y un motor de texto disponible, el orden es por relevancia.
+        modo="parcial" busca el término como texto literal en cualquier parte (ej: "pol" encuentra "pollo"),
+        que es lo que necesita la búsqueda mientras se escribe; el orden es por fecha.
+        Las páginas repetidas (ej: volver a la pestaña de artículos) se sirven desde la caché.
+        """
+        if not termino_busqueda.strip():
+            modo = None # Sin término es el listado normal (y comparte su caché).
+        clave = (self.normalizar_termino(termino_busqueda), cursor, tamano_pagina, hacia_atras, modo)
+        pagina = self.cache.obtener(clave)
+        if pagina is not None:
+            return dict(pagina)
+        generacion = self.cache.generacion # Antes de consultar: una escritura durante la consulta descarta el resultado.
+        pagina = self._refinar_busqueda(clave, termino_busqueda)
+        if pagina is not None:
+            consultados = pagina["articulos"]
+        elif modo == MODO_PARCIAL:
+            pipeline = self.construir_pipeline(re.escape(termino_busqueda.strip()), tamano_pagina + 1, cursor, hacia_atras)
+            consultados = list(self._agregar(pipeline))
+            pagina = self._completar_proyeccion(self._armar_pagina(consultados, cursor, tamano_pagina, hacia_atras))
+        else:
+            pagina, consultados = self._consultar_pagina(termino_busqueda, cursor, tamano_pagina, hacia_atras)
+            pagina = self._completar_proyeccion(pagina)
+        self.cache.guardar(clave, pagina, self._etiquetas_cache(clave, consultados),
+                           sum(len(bson.encode(articulo)) for articulo in pagina["articulos"]), generacion)
+        return dict(pagina)
+
+    def _consultar_pagina(self, termino_busqueda, cursor, tamano_pagina, hacia_atras):
+        """Consulta una página en la base. Retorna (pagina, articulos_consultados)."""
+        modo = self.motor_busqueda.modo_efectivo() if termino_busqueda else "regex"
+        if modo == "texto":
+            pagina = self._obtener_pagina_texto(termino_busqueda, cursor, tamano_pagina)
+            return pagina, pagina["articulos"]
+        if modo == "invertido":
+            pagina = self._obtener_pagina_invertido(termino_busqueda, cursor, tamano_pagina)
+            return pagina, pagina["articulos"]
+
+        # Se pide un artículo extra para saber si existe otra página en esa dirección.
+        pipeline = self.construir_pipeline(termino_busqueda, tamano_pagina + 1, cursor, hacia_atras)
+        consultados = list(self._agregar(pipeline))
+        return self._armar_pagina(consultados, cursor, tamano_pagina, hacia_atras), consultados
+
+    def _refinar_busqueda(self, clave, termino_busqueda):
+        """
+        Búsqueda mientras se escribe: si la caché tiene el resultado COMPLETO (una sola página) de un prefijo
+        del término, lo filtra en memoria en vez de consultar. Solo con la búsqueda parcial o $regex, donde lo
+        que coincide con "pollo" es un subconjunto de lo que coincide con "pol"; los índices de texto e
+        invertido buscan por palabras y no cumplen eso. Retorna la primera página, o None si hay que consultar.
+        """
+        termino, cursor, tamano_pagina, hacia_atras, modo = clave
+        if not termino or cursor or hacia_atras:
+            return None
+        if modo == MODO_PARCIAL:
+            termino_busqueda = re.escape(termino_busqueda.strip()) # Texto literal: cualquier carácter refina.
+        elif CARACTERES_REGEX.search(termino) or self.motor_busqueda.modo_efectivo() != "regex":
+            return None
+        for largo in range(len(termino) - 1, 0, -1): # Del prefijo más largo (el más chico de filtrar) al más corto.
+            anterior = self.cache.obtener((termino[:largo], None, tamano_pagina, False, modo), contar_fallo=False)
+            if anterior is not None and anterior["next_cursor"] is None:
+                articulos = self.filtrar_articulos(anterior["articulos"], termino_busqueda.strip())
+                return {"articulos": articulos, "next_cursor": None, "prev_cursor": None}
+        return None
+
+    def _agregar(self, pipeline):
+        """aggregate sobre 'articles' con el 'comment' y maxTimeMS de limitar_consultas (si los hay)."""
+        comentario, max_ms = _limites_actuales()
+        opciones = {"maxTimeMS": int(max_ms)} if max_ms else {}
+        return self.coleccion_articulos.aggregate(pipeline, comment=comentario, **opciones)
+
+    def cancelar_consultas(self, comentario):
+        """
+        Interrumpe en el servidor las consultas marcadas con 'comentario' que siguen en curso ($currentOp y
+        killOp: cada usuario puede interrumpir sus propias operaciones). Retorna cuántas se interrumpieron.
+        """
+        admin = self.coleccion_articulos.database.client.admin
+        en_curso = admin.aggregate([{"$currentOp": {}}, {"$match": {"command.comment": comentario}}, {"$project": {"opid": 1}}])
+        interrumpidas = 0
+        for operacion in en_curso:
+            try:
+                admin.command("killOp", op=operacion["opid"])
+                interrumpidas += 1
+            except OperationFailure:
+                pass # Terminó entre $currentOp y killOp.
+        return interrumpidas
+
+    @instrumentar
+    def cursor_en_posicion(self, termino_busqueda, desplazamiento, modo=None):
+        """
+        Cursor de obtener_pagina (con el mismo 'modo') para empezar en la posición 'desplazamiento' sin
+        recorrer las páginas anteriores (lo usan las listas virtuales al saltar con la barra de desplazamiento).
+        """
+        if desplazamiento <= 0:
+            return None
+        if modo == MODO_PARCIAL:
+            termino_busqueda = re.escape(termino_busqueda.strip())
+        elif termino_busqueda and self.motor_busqueda.modo_efectivo() != "regex":
+            return f"r|{desplazamiento}" # Las páginas por relevancia ya usan desplazamientos.
+        # skip sobre el índice (date, _id): solo se lee la llave del artículo anterior a la posición.
+        comentario, max_ms = _limites_actuales()
+        anteriores = list(self.coleccion_articulos.find(self.construir_filtro_busqueda(termino_busqueda), {"date": 1},
+                                                        comment=comentario, max_time_ms=max_ms)
+                          .sort([("date", -1), ("_id", -1)]).skip(desplazamiento - 1).limit(1))
+        return self.codificar_cursor(anteriores[0]) if anteriores else None
+
+    def contar(self, termino_busqueda=""):
+        """Total de artículos del listado, o None si hay búsqueda (contarla costaría tanto como recorrerla)."""
+        return None if termino_busqueda else self.coleccion_articulos.estimated_document_count()
+
+    # --- Búsqueda por Relevancia ---
+    # El orden por relevancia no es una llave estable, así que estas páginas usan cursores de desplazamiento ("r|N").
+
+    @staticmethod
+    def _decodificar_desplazamiento(cursor):
+        """Convierte un cursor de relevancia "r|N" en el desplazamiento N (0 si no hay cursor)."""
+        return int(cursor.split("|")[1]) if cursor else 0
+
+    def _pagina_por_desplazamiento(self, articulos, desplazamiento, tamano_pagina):
+        """Arma la respuesta de una página de relevancia a partir de tamano_pagina + 1 artículos."""
+        hay_siguiente = len(articulos) > tamano_pagina
+        return {
+            "articulos": articulos[:tamano_pagina],
+            "next_cursor": f"r|{desplazamiento + tamano_pagina}" if hay_siguiente else None,
+            "prev_cursor": f"r|{max(desplazamiento - tamano_pagina, 0)}" if desplazamiento > 0 else None,
+        }
+
+    def _obtener_pagina_texto(self, termino_busqueda, cursor, tamano_pagina):
+        """Página ordenada por relevancia usando el índice de texto de MongoDB (stemming en español)."""
+        desplazamiento = self._decodificar_desplazamiento(cursor)
+        # El término se usa como texto literal (no como regex) para resolver autor, categorías y tags.
+        condiciones = [self.motor_busqueda.filtro_texto(termino_busqueda)]
+        condiciones += self._condiciones_relaciones(*self._resolver_relaciones(re.escape(termino_busqueda)))
+        pipeline = [
+            # $text dentro de $or es válido porque todas las demás condiciones están indexadas.
+            { "$match": condiciones[0] if len(condiciones) == 1 else {"$or": condiciones} },
+            { "$sort": {"puntaje": {"$meta": "textScore"}, "date": -1, "_id": -1} },
+            { "$skip": desplazamiento },
+            { "$limit": tamano_pagina + 1 },
+        ] + self._etapas_join()
+        articulos = list(self._agregar(pipeline))
+        return self._pagina_por_desplazamiento(articulos, desplazamiento, tamano_pagina)
+
+    def _obtener_pagina_invertido(self, termino_busqueda, cursor, tamano_pagina):
+        """Página ordenada por relevancia usando el índice invertido en memoria (sin índice de texto)."""
+        desplazamiento = self._decodificar_desplazamiento(cursor)
+        ids_autores, ids_categorias, ids_tags = self._resolver_relaciones(re.escape(termino_busqueda))
+        ids_ordenados = self.motor_busqueda.buscar_invertido(termino_busqueda, ids_autores + ids_categorias + ids_tags)
+        ids_pagina = ids_ordenados[desplazamiento:desplazamiento + tamano_pagina + 1]
+
+        # Solo los artículos de la página se leen y se unen; luego se restaura el orden de relevancia.
+        pipeline = [{ "$match": {"_id": {"$in": ids_pagina}} }] + self._etapas_join()
+        por_id = {articulo["_id"]: articulo for articulo in self._agregar(pipeline)}
+        articulos = [por_id[id_articulo] for id_articulo in ids_pagina if id_articulo in por_id]
+        return self._pagina_por_desplazamiento(articulos, desplazamiento, tamano_pagina)
+
+    # --- Escrituras de Artículos ---
+
+    @instrumentar
+    def obtener_por_id(self, id_articulo):
+        """Retorna el documento del artículo (o None si no existe)."""
+        return self.coleccion_articulos.find_one({"_id": id_articulo})
+
+    @instrumentar
+    def guardar_articulo(self, id_articulo, datos):
+        """Crea (id_articulo=None) o actualiza un artículo. Retorna el _id del artículo."""
+        # Los nombres del autor, categorías y tags se guardan junto a los _id (modelo de lectura).
+        datos.update(self.construir_proyeccion(datos))
+        if id_articulo:
+            # Si hay ID, es una ACTUALIZACIÓN
+            datos["last_modified"] = datetime.datetime.now()
+            self.coleccion_articulos.update_one({"_id": id_articulo}, {"$set": datos})
+            # La fecha no cambia: en el listado sin búsqueda solo cambian las páginas que lo contienen.
+            self.cache.invalidar([("articulo", id_articulo), "busqueda"])
+        else:
+            # Si no hay ID, es una CREACIÓN
+            datos["date"] = datetime.datetime.now()
+            datos.setdefault("comment_count", 0)
+            id_articulo = self.coleccion_articulos.insert_one(datos).inserted_id
+            self.cache.invalidar(["inicio", "busqueda"])
+        self.motor_busqueda.articulo_guardado(dict(datos, _id=id_articulo))
+        return id_articulo
+
+    @instrumentar
+    def eliminar_articulo(self, id_articulo):
+        """Elimina un artículo (y sus comentarios) por su ObjectId. Retorna cuántos artículos fueron eliminados."""
+        eliminados = self.integridad.eliminar("articles", [id_articulo])
+        if eliminados:
+            self.motor_busqueda.articulo_eliminado(id_articulo)
+            self.cache.invalidar([("articulo", id_articulo), "busqueda"])
+        return eliminados
+
+    @instrumentar
+    def eliminar_articulos(self, ids):
+        """
+        Elimina varios artículos y sus comentarios. Retorna {"eliminados": n, "errores": [...]}
+        (un id inexistente se reporta como error, igual que en GestorEntidad.eliminar_muchos).
+        """
+        ids = list(dict.fromkeys(ids))
+        existentes = {a["_id"] for a in self.coleccion_articulos.find({"_id": {"$in": ids}}, {"_id": 1})}
+        errores = [{"indice": i, "id": id_articulo, "error": "No existe"}
+                   for i, id_articulo in enumerate(ids) if id_articulo not in existentes]
+        a_eliminar = [id_articulo for id_articulo in ids if id_articulo in existentes]
+        if not a_eliminar:
+            return {"eliminados": 0, "errores": errores}
+
+        eliminados = self.integridad.eliminar("articles", a_eliminar)
+        for id_articulo in a_eliminar:
+            self.motor_busqueda.articulo_eliminado(id_articulo)
+        self.cache.invalidar([("articulo", id_articulo) for id_articulo in a_eliminar] + ["busqueda"])
+        return {"eliminados": eliminados, "errores": errores}
+
+    # --- Modelo de Lectura (Proyección Desnormalizada) ---
+
+    def _nombres(self, gestor, ids):
+        """Nombres de los ids, en el mismo orden, resueltos con el mapa del gestor."""
+        nombres = gestor.obtener_nombres_por_ids(ids)
+        return [nombres[id_objeto] for id_objeto in ids if id_objeto in nombres]
+
+    def construir_proyeccion(self, datos):
+        """Campos desnormalizados que corresponden a los 'user_id', 'categories' y 'tags' presentes en 'datos'."""
+        proyeccion = {}
+        if "user_id" in datos:
+            nombres = self._nombres(self.gestor_usuarios, [datos["user_id"]])
+            proyeccion["author_email"] = nombres[0] if nombres else None
+        if "categories" in datos:
+            proyeccion["category_names"] = self._nombres(self.gestor_categorias, datos["categories"])
+        if "tags" in datos:
+            proyeccion["tag_names"] = self._nombres(self.gestor_etiquetas, datos["tags"])
+        return proyeccion
+
+    def _completar_proyeccion(self, pagina):
+        """Artículos guardados antes del modelo de lectura: completa sus nombres al vuelo (ver reparar_proyeccion)."""
+        if self.usar_proyeccion:
+            for articulo in pagina["articulos"]:
+                if "author_email" not in articulo:
+                    articulo.update(self.construir_proyeccion(articulo))
+        return pagina
+
+    def _al_cambiar_usuario(self, evento, id_usuario, nombre_anterior, nombre_nuevo):
+        """Suscriptor de gestor_usuarios: propaga el nuevo email (o la eliminación) a los artículos del autor."""
+        email = nombre_nuevo if evento == "renombrado" else None
+        ids = id_usuario if evento == "eliminados" else [id_usuario] # "eliminados" trae la lista del lote.
+        try:
+            self.coleccion_articulos.update_many({"user_id": {"$in": ids}}, {"$set": {"author_email": email}})
+        finally:
+            # El nombre ya cambió en su colección: las búsquedas por ese nombre cambian aunque falle la propagación.
+            self.cache.invalidar([("relacion", id_objeto) for id_objeto in ids] + ["busqueda"])
+
+    def _al_cambiar_relacion(self, campo_ids, campo_nombres, evento, id_objeto, nombre_anterior, nombre_nuevo):
+        """Suscriptor de categorías/tags: propaga el renombrado a los artículos que la usan."""
+        # Al eliminar, la cascada de GestorIntegridad ya quitó el id y su nombre de los artículos; solo se
+        # invalida la caché. "eliminados" (eliminar_muchos) trae la lista de ids del lote.
+        ids = id_objeto if evento == "eliminados" else [id_objeto]
+        try:
+            if evento == "renombrado" and nombre_anterior is None:
+                # El mapa no conocía el nombre anterior: se recalcula la proyección de esos artículos.
+                self.reparar_proyeccion({campo_ids: id_objeto})
+            elif evento == "renombrado":
+                # arrayFilters reemplaza solo el nombre viejo dentro del arreglo (los nombres son únicos).
+                self.coleccion_articulos.update_many(
+                    {campo_ids: id_objeto}, {"$set": {f"{campo_nombres}.$[nombre]": nombre_nuevo}},
+                    array_filters=[{"nombre": nombre_anterior}]
+                )
+        finally:
+            self.cache.invalidar([("relacion", id_relacion) for id_relacion in ids] + ["busqueda"])
+
+    def _al_cambiar_comentarios(self, evento, id_objeto, nombre_anterior, nombre_nuevo):
+        """Suscriptor de gestor_comentarios: las páginas que muestran el artículo tienen otro 'comment_count'."""
+        if evento == "comentarios_cambiados":
+            self.cache.invalidar([("articulo", id_objeto)])
+
+    @instrumentar
+    def reparar_proyeccion(self, filtro=None, tamano_lote=1000):
+        """
+        Recalcula la proyección de los artículos (todos, o los que cumplen 'filtro') y corrige
+        solo los que no coinciden. Retorna cuántos artículos se corrigieron.
+        """
+        for gestor in (self.gestor_usuarios, self.gestor_categorias, self.gestor_etiquetas):
+            if not gestor.mapa_cargado:
+                gestor.cargar_mapa()
+
+        campos = dict({"user_id": 1, "categories": 1, "tags": 1}, **{campo: 1 for campo in CAMPOS_PROYECCION})
+        corregidos, lote = 0, []
+        for articulo in self.coleccion_articulos.find(filtro or {}, campos):
+            lote.append(articulo)
+            if len(lote) == tamano_lote:
+                corregidos += self._reparar_lote(lote)
+                lote = []
+        if lote:
+            corregidos += self._reparar_lote(lote)
+        return corregidos
+
+    def _reparar_lote(self, articulos):
+        """Compara un lote de artículos con su proyección esperada y corrige las diferencias en un bulk_write."""
+        # Conteo real de comentarios del lote (una agregación servida por el índice de 'comments').
+        conteos = {grupo["_id"]: grupo["total"] for grupo in self.coleccion_comentarios.aggregate([
+            { "$match": {"article_id": {"$in": [articulo["_id"] for articulo in articulos]}} },
+            { "$group": {"_id": "$article_id", "total": {"$sum": 1}} },
+        ])}
+        operaciones = []
+        for articulo in articulos:
+            esperado = self.construir_proyeccion({
+                "user_id": articulo.get("user_id"),
+                "categories": articulo.get("categories", []),
+                "tags": articulo.get("tags", []),
+            })
+            esperado["comment_count"] = conteos.get(articulo["_id"], 0)
+            if any(campo not in articulo or articulo[campo] != valor for campo, valor in esperado.items()):
+                operaciones.append(UpdateOne({"_id": articulo["_id"]}, {"$set": esperado}))
+        if operaciones:
+            self.coleccion_articulos.bulk_write(operaciones, ordered=False)
+        return len(operaciones)
 
 class GestorComentario(GestorEntidad):
     """Clase específica para Comentarios. Usa la colección 'comments'."""
-    def __init__(self):
-        # Llama al constructor de la clase base. No necesita clave_nombre para mapeo simple.
-        super().__init__("comments", clave_nombre="text") 
+    def __init__(self, db=None, usuarios=None):
+        # Sin clave_nombre: el texto de un comentario no es un nombre (no entra en los mapas ni en el índice).
+        super().__init__("comments", clave_nombre=None, db=db) 
+        # El email de cada autor se resuelve con el mapa de usuarios (sin $lookup).
+        self.gestor_usuarios = usuarios or obtener_gestor("gestor_usuarios")
+        # Cada comentario creado o eliminado actualiza 'comment_count' del artículo (modelo de lectura).
+        self.coleccion_articulos = self.coleccion.database["articles"]
 
+    @instrumentar
     def crear_comentario(self, id_articulo, id_usuario, texto):
         """Inserta un nuevo comentario referenciando al artículo y al usuario."""
         if not id_articulo or not id_usuario or not texto:
@@ -143,32 +1201,107 @@ class GestorComentario(GestorEntidad):
             "date": datetime.datetime.now()
         }
         # Llama al método de inserción de la clase base.
-        return self.crear_uno(datos) 
+        id_comentario = self.crear_uno(datos)
+        if id_comentario:
+            self.coleccion_articulos.update_one({"_id": id_articulo}, {"$inc": {"comment_count": 1}})
+            self._notificar("comentarios_cambiados", id_articulo)
+        return id_comentario
 
-    def obtener_comentarios_por_articulo(self, id_articulo):
-        """Obtiene y detalla todos los comentarios para un artículo específico."""
-        
-        # --- PIPELINE DE AGREGACIÓN para unir el autor del comentario ---
-        pipeline = [
-            # 1. $match: Filtra solo los comentarios de este artículo.
-            { "$match": {"article_id": id_articulo} },
-            
-            # 2. $lookup: Trae los detalles del autor del comentario (user_id -> users._id).
-            { "$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "author_details"}},
-            
-            # 3. $unwind: Desanida el autor (que solo tiene un elemento).
-            { "$unwind": {"path": "$author_details", "preserveNullAndEmptyArrays": True}},
+    @instrumentar
+    def eliminar_uno(self, id_objeto):
+        """Elimina un comentario y descuenta 'comment_count' de su artículo."""
+        comentario = self.coleccion.find_one({"_id": id_objeto}, {"article_id": 1})
+        eliminados = super().eliminar_uno(id_objeto)
+        if eliminados and comentario:
+            self.coleccion_articulos.update_one({"_id": comentario["article_id"]}, {"$inc": {"comment_count": -1}})
+            self._notificar("comentarios_cambiados", comentario["article_id"])
+        return eliminados
 
-            # 4. $sort: Muestra los comentarios más recientes primero.
-            { "$sort": {"date": -1} } 
-        ]
-        
+    @instrumentar
+    def eliminar_muchos(self, ids):
+        """Elimina varios comentarios y descuenta 'comment_count' de sus artículos (un $inc por artículo)."""
+        articulos = {c["_id"]: c["article_id"] for c in self.coleccion.find({"_id": {"$in": list(ids)}}, {"article_id": 1})}
+        resultado = super().eliminar_muchos(ids)
+        conteos = Counter(articulos[id_comentario] for id_comentario in resultado["ids"] if id_comentario in articulos)
+        if conteos:
+            self.coleccion_articulos.bulk_write(
+                [UpdateOne({"_id": id_articulo}, {"$inc": {"comment_count": -total}}) for id_articulo, total in conteos.items()],
+                ordered=False)
+            for id_articulo in conteos:
+                self._notificar("comentarios_cambiados", id_articulo)
+        return resultado
+
+    def _agregar_autores(self, comentarios):
+        """Agrega 'author_email' a cada comentario, resolviendo todos los autores de una vez con el mapa."""
+        emails = self.gestor_usuarios.obtener_nombres_por_ids({c.get("user_id") for c in comentarios})
+        for comentario in comentarios:
+            comentario["author_email"] = emails.get(comentario.get("user_id"))
+        return comentarios
+
+    @instrumentar
+    def obtener_pagina_comentarios(self, id_articulo, cursor=None, tamano_pagina=TAMANO_PAGINA_COMENTARIOS):
+        """
+        Retorna {"comentarios", "next_cursor"}: los comentarios más recientes primero, paginados por
+        llaves (date, _id) con el índice (article_id, date, _id). 'cursor' es el 'next_cursor' anterior.
+        """
+        filtro = {"article_id": id_articulo}
+        if cursor:
+            fecha, id_objeto = GestorArticulo.decodificar_cursor(cursor) # Mismo formato de cursor que los artículos.
+            filtro["$or"] = [
+                {"date": {"$lt": fecha}},
+                {"date": fecha, "_id": {"$lt": id_objeto}}
+            ]
+        # Se pide un comentario extra para saber si hay más.
+        comentarios = list(self.coleccion.find(filtro).sort([("date", -1), ("_id", -1)]).limit(tamano_pagina + 1))
+        hay_mas = len(comentarios) > tamano_pagina
+        comentarios = self._agregar_autores(comentarios[:tamano_pagina])
+        return {
+            "comentarios": comentarios,
+            "next_cursor": GestorArticulo.codificar_cursor(comentarios[-1]) if hay_mas else None,
+        }
+
+    @instrumentar
+    def obtener_comentarios_por_articulo(self, id_articulo):
+        """Obtiene todos los comentarios de un artículo (más recientes primero), con el email de su autor."""
         try:
-            # Ejecuta la agregación en la colección de comentarios.
-            return list(self.coleccion.aggregate(pipeline))
+            comentarios = list(self.coleccion.find({"article_id": id_articulo}).sort([("date", -1), ("_id", -1)]))
+            return self._agregar_autores(comentarios)
         except Exception as e:
-            print(f"Error en la agregación de comentarios: {e}")
+            print(f"Error obteniendo los comentarios: {e}")
             return []
 
-# --- Instancia Global del Gestor de Comentarios ---
-gestor_comentarios = GestorComentario()
\ No newline at end of file
+    def iterar_comentarios(self, id_articulo, tamano_lote=1000):
+        """Recorre los comentarios de un artículo (más recientes primero) sin cargarlos todos, de a un lote con sus autores."""
+        lote = []
+        for comentario in self.coleccion.find({"article_id": id_articulo}, batch_size=tamano_lote).sort([("date", -1), ("_id", -1)]):
+            lote.append(comentario)
+            if len(lote) == tamano_lote:
+                yield from self._agregar_autores(lote)
+                lote = []
+        yield from self._agregar_autores(lote)
+
+# --- Registro de Gestores ---
+# Los gestores se crean la primera vez que se piden (importar este módulo no crea ninguno).
+FABRICAS_GESTORES = {
+    "gestor_usuarios": GestorUsuario,
+    "gestor_categorias": GestorCategoria,
+    "gestor_etiquetas": GestorEtiqueta,
+    "gestor_articulos": GestorArticulo,
+    "gestor_comentarios": GestorComentario,
+    "gestor_integridad": GestorIntegridad,
+}
+_gestores = {} # { nombre: instancia ya creada }
+_candado_gestores = threading.RLock() # Reentrante: crear gestor_articulos pide los otros tres.
+
+def obtener_gestor(nombre):
+    """Retorna la instancia compartida del gestor indicado, creándola en el primer uso."""
+    with _candado_gestores:
+        if nombre not in _gestores:
+            _gestores[nombre] = FABRICAS_GESTORES[nombre]()
+        return _gestores[nombre]
+
+def __getattr__(nombre):
+    """Mantiene 'from Logica import gestor_usuarios' (y los demás nombres globales) funcionando."""
+    if nombre in FABRICAS_GESTORES:
+        return obtener_gestor(nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
\ No newline at end of file
@@ -0,0 +1,327 @@
+import asyncio
+import datetime
+import os
+
+import bson
+from bson.objectid import ObjectId
+
+from Conexion import CONFIGURACION, DB_NAME, crear_cliente_async
+from Monitoreo import instrumentar_async
+from Cache import CacheResultados
+from Logica import (MapaEntidad, ConsultasArticulo, GestorArticulo, TAMANO_PAGINA, TAMANO_PAGINA_COMENTARIOS,
+                    USAR_PROYECCION)
+
+# --- Configuración de la Capa Asíncrona ---
+# Gestores equivalentes a los de Logica.py sobre el API asíncrono de PyMongo (AsyncMongoClient): muchas
+# consultas en vuelo desde un solo hilo, para servidores o scripts con muchos clientes concurrentes.
+# Las eliminaciones en cascada, las escrituras en lote y la sincronización siguen en la capa síncrona.
+
+# Corrutinas de en_paralelo consultando a la vez: más que el pool solo agregaría espera por una conexión.
+CONCURRENCIA_MAXIMA = int(os.environ.get("BLOG_CONCURRENCIA_ASYNC", CONFIGURACION["pool_maximo"]))
+TAMANO_LOTE = 1000 # Documentos por lote (batch_size) de los cursores que se recorren con 'async for'.
+
+
+class GestorEntidadAsync(MapaEntidad):
+    """
+    Versión asíncrona de GestorEntidad: los mismos mapas, índice e instantánea (MapaEntidad), con las
+    consultas como corrutinas. 'db' es una base de un AsyncMongoClient (ej: crear_cliente_async()[DB_NAME]).
+    """
+
+    def __init__(self, nombre_coleccion, clave_nombre="name", db=None):
+        if db is None:
+            raise ValueError("GestorEntidadAsync necesita la base de un AsyncMongoClient (ver crear_gestores_async).")
+        super().__init__(db[nombre_coleccion], clave_nombre)
+
+    @instrumentar_async
+    async def cargar_mapa(self):
+        """Carga el mapa {Nombre/Email: ID} de la colección sin bloquear el event loop."""
+        nombres, ids, total = [], [], 0
+        try:
+            marca = ultimo_id = None
+            cursor = self.coleccion.find({}, self._proyeccion("last_modified"), batch_size=TAMANO_LOTE)
+            async for entidad in cursor:
+                total += 1
+                if isinstance(entidad["_id"], ObjectId) and (ultimo_id is None or entidad["_id"] > ultimo_id):
+                    ultimo_id = entidad["_id"]
+                if self.clave_nombre in entidad:
+                    nombres.append(entidad[self.clave_nombre])
+                    ids.append(entidad["_id"])
+                if entidad.get("last_modified") and (marca is None or entidad["last_modified"] > marca):
+                    marca = entidad["last_modified"]
+            # Ordenar el índice y armar los mapas es trabajo de CPU (segundos con un millón de nombres):
+            # se hace en un hilo para que las demás corrutinas sigan atendiendo consultas mientras tanto.
+            await asyncio.to_thread(self._instalar_mapas, nombres, ids, total, marca, ultimo_id)
+            print(f"Cargados {len(self.mapa_nombre_a_id)} elementos en '{self.coleccion.name}'.")
+            await asyncio.to_thread(self.guardar_instantanea)
+        except Exception as e:
+            print(f"Error cargando el mapa para {self.coleccion.name}: {e}")
+
+    async def iniciar_mapa(self):
+        """Como GestorEntidad.iniciar_mapa, sin la reconciliación de fondo: si no hay instantánea, lee la colección."""
+        if not await asyncio.to_thread(self.cargar_instantanea):
+            await self.cargar_mapa()
+
+    @instrumentar_async
+    async def obtener_nombres_por_ids(self, ids):
+        """Retorna {ObjectId: nombre} para varios ids: usa el mapa y lee en una sola consulta solo los que falten."""
+        with self.candado:
+            nombres = {id_objeto: self.mapa_id_a_nombre.get(id_objeto) for id_objeto in ids}
+        faltantes = [id_objeto for id_objeto, nombre in nombres.items() if nombre is None]
+        if faltantes:
+            async for documento in self.coleccion.find({"_id": {"$in": faltantes}}, self._proyeccion()):
+                nombres[documento["_id"]] = documento.get(self.clave_nombre)
+        return {id_objeto: nombre for id_objeto, nombre in nombres.items() if nombre is not None}
+
+    # --- Operaciones CRUD ---
+
+    @instrumentar_async
+    async def obtener_todos(self):
+        """Retorna todos los documentos de la colección como una lista (para colecciones grandes, iterar_todos)."""
+        try:
+            return await self.coleccion.find().to_list()
+        except Exception as e:
+            print(f"Error obteniendo todos los documentos para {self.coleccion.name}: {e}")
+            return []
+
+    async def iterar_todos(self, filtro=None, proyeccion=None, tamano_lote=TAMANO_LOTE):
+        """
+        Recorre los documentos con 'async for' sin cargarlos todos: el driver pide el lote siguiente al
+        terminar el anterior. Si quien itera corta antes, el cursor se cierra al cerrar el generador.
+        """
+        async with self.coleccion.find(filtro or {}, proyeccion, batch_size=tamano_lote) as cursor:
+            async for documento in cursor:
+                yield documento
+
+    @instrumentar_async
+    async def crear_uno(self, datos):
+        """Inserta un nuevo documento en la colección y lo agrega al mapa."""
+        try:
+            datos.setdefault("last_modified", datetime.datetime.now()) # Marca usada por el sondeo de cambios.
+            resultado = await self.coleccion.insert_one(datos)
+            with self.candado:
+                self.total_documentos += 1
+            if self.clave_nombre in datos:
+                self._registrar(datos[self.clave_nombre], resultado.inserted_id)
+            return resultado.inserted_id
+        except Exception as e:
+            print(f"Error creando el documento en {self.coleccion.name}: {e}")
+            return None
+
+
+class GestorUsuarioAsync(GestorEntidadAsync):
+    def __init__(self, db=None):
+        super().__init__("users", clave_nombre="email", db=db)
+
+    @instrumentar_async
+    async def autenticar(self, email, password):
+        """Verifica el email y la contraseña contra la base de datos (igual que GestorUsuario.autenticar)."""
+        try:
+            return await self.coleccion.find_one({"email": email, "password": password})
+        except Exception as e:
+            print(f"Error de autenticación: {e}")
+            return None
+
+
+class GestorCategoriaAsync(GestorEntidadAsync):
+    def __init__(self, db=None):
+        super().__init__("categories", clave_nombre="name", db=db)
+
+
+class GestorEtiquetaAsync(GestorEntidadAsync):
+    def __init__(self, db=None):
+        super().__init__("tags", clave_nombre="name", db=db)
+
+
+class GestorArticuloAsync(ConsultasArticulo):
+    """
+    Listado de artículos asíncrono con los mismos pipelines y cursores que GestorArticulo. La búsqueda
+    usa el filtro por regex con paginación por llaves (la relevancia de MotorBusqueda es de la capa síncrona).
+    """
+
+    def __init__(self, db, usuarios, categorias, etiquetas, comentarios=None, proyeccion=None, cache=None):
+        self.coleccion_articulos = db["articles"]
+        self.usar_proyeccion = USAR_PROYECCION if proyeccion is None else proyeccion
+        self.gestor_usuarios = usuarios
+        self.gestor_categorias = categorias
+        self.gestor_etiquetas = etiquetas
+        self.cache = cache if cache is not None else CacheResultados()
+        if comentarios is not None:
+            # Crear un comentario cambia el 'comment_count' que muestran las páginas.
+            comentarios.suscribir(self._al_cambiar_comentarios)
+
+    @instrumentar_async
+    async def buscar_articulos(self, termino_busqueda="", limite=None, tamano_lote=TAMANO_LOTE):
+        """Retorna el cursor de la agregación, para recorrerlo con 'async for' a medida que llegan los lotes."""
+        return await self.coleccion_articulos.aggregate(self.construir_pipeline(termino_busqueda, limite),
+                                                        batchSize=tamano_lote)
+
+    @instrumentar_async
+    async def obtener_pagina(self, termino_busqueda="", cursor=None, tamano_pagina=TAMANO_PAGINA, hacia_atras=False):
+        """Retorna una página de artículos ordenada por (date, _id) descendente (ver GestorArticulo.obtener_pagina)."""
+        clave = (self.normalizar_termino(termino_busqueda), cursor, tamano_pagina, hacia_atras)
+        pagina = self.cache.obtener(clave)
+        if pagina is not None:
+            return dict(pagina)
+        generacion = self.cache.generacion
+        # Se pide un artículo extra para saber si existe otra página en esa dirección.
+        pipeline = self.construir_pipeline(termino_busqueda, tamano_pagina + 1, cursor, hacia_atras)
+        consultados = await (await self.coleccion_articulos.aggregate(pipeline)).to_list()
+        pagina = await self._completar_proyeccion(self._armar_pagina(consultados, cursor, tamano_pagina, hacia_atras))
+        self.cache.guardar(clave, pagina, self._etiquetas_cache(clave, consultados),
+                           sum(len(bson.encode(articulo)) for articulo in pagina["articulos"]), generacion)
+        return dict(pagina)
+
+    @instrumentar_async
+    async def obtener_por_id(self, id_articulo):
+        """Retorna el documento del artículo (o None si no existe)."""
+        return await self.coleccion_articulos.find_one({"_id": id_articulo})
+
+    async def contar(self, termino_busqueda=""):
+        """Total de artículos del listado, o None si hay búsqueda."""
+        return None if termino_busqueda else await self.coleccion_articulos.estimated_document_count()
+
+    # --- Modelo de Lectura (Proyección Desnormalizada) ---
+
+    async def _nombres(self, gestor, ids):
+        nombres = await gestor.obtener_nombres_por_ids(ids)
+        return [nombres[id_objeto] for id_objeto in ids if id_objeto in nombres]
+
+    async def construir_proyeccion(self, datos):
+        """Como GestorArticulo.construir_proyeccion, resolviendo los tres gestores a la vez."""
+        ids_autor = [datos["user_id"]] if "user_id" in datos else None
+        autor, categorias, tags = await asyncio.gather(*(
+            self._nombres(gestor, ids) if ids is not None else asyncio.sleep(0)
+            for gestor, ids in ((self.gestor_usuarios, ids_autor),
+                                (self.gestor_categorias, datos.get("categories")),
+                                (self.gestor_etiquetas, datos.get("tags")))))
+        proyeccion = {}
+        if ids_autor is not None:
+            proyeccion["author_email"] = autor[0] if autor else None
+        if "categories" in datos:
+            proyeccion["category_names"] = categorias
+        if "tags" in datos:
+            proyeccion["tag_names"] = tags
+        return proyeccion
+
+    async def _completar_proyeccion(self, pagina):
+        """Artículos guardados antes del modelo de lectura: completa sus nombres al vuelo."""
+        if self.usar_proyeccion:
+            for articulo in pagina["articulos"]:
+                if "author_email" not in articulo:
+                    articulo.update(await self.construir_proyeccion(articulo))
+        return pagina
+
+    def _al_cambiar_comentarios(self, evento, id_objeto, nombre_anterior, nombre_nuevo):
+        if evento == "comentarios_cambiados":
+            self.cache.invalidar([("articulo", id_objeto)])
+
+
+class GestorComentarioAsync(GestorEntidadAsync):
+    """Versión asíncrona de GestorComentario (crear, paginar y leer los hilos de comentarios)."""
+
+    def __init__(self, db, usuarios):
+        super().__init__("comments", clave_nombre=None, db=db) # Sin mapa de nombres (ver GestorComentario).
+        self.gestor_usuarios = usuarios # El email de cada autor se resuelve con el mapa de usuarios.
+        self.coleccion_articulos = self.coleccion.database["articles"]
+
+    @instrumentar_async
+    async def crear_comentario(self, id_articulo, id_usuario, texto):
+        """Inserta un nuevo comentario y suma uno al 'comment_count' del artículo."""
+        if not id_articulo or not id_usuario or not texto:
+            return None
+        datos = {"article_id": id_articulo, "user_id": id_usuario, "text": texto, "date": datetime.datetime.now()}
+        id_comentario = await self.crear_uno(datos)
+        if id_comentario:
+            await self.coleccion_articulos.update_one({"_id": id_articulo}, {"$inc": {"comment_count": 1}})
+            self._notificar("comentarios_cambiados", id_articulo)
+        return id_comentario
+
+    async def _agregar_autores(self, comentarios):
+        """Agrega 'author_email' a cada comentario, resolviendo todos los autores de una vez."""
+        emails = await self.gestor_usuarios.obtener_nombres_por_ids({c.get("user_id") for c in comentarios})
+        for comentario in comentarios:
+            comentario["author_email"] = emails.get(comentario.get("user_id"))
+        return comentarios
+
+    @instrumentar_async
+    async def obtener_pagina_comentarios(self, id_articulo, cursor=None, tamano_pagina=TAMANO_PAGINA_COMENTARIOS):
+        """Retorna {"comentarios", "next_cursor"} como GestorComentario.obtener_pagina_comentarios."""
+        filtro = {"article_id": id_articulo}
+        if cursor:
+            fecha, id_objeto = GestorArticulo.decodificar_cursor(cursor)
+            filtro["$or"] = [
+                {"date": {"$lt": fecha}},
+                {"date": fecha, "_id": {"$lt": id_objeto}}
+            ]
+        comentarios = await self.coleccion.find(filtro).sort([("date", -1), ("_id", -1)]).limit(tamano_pagina + 1).to_list()
+        hay_mas = len(comentarios) > tamano_pagina
+        comentarios = await self._agregar_autores(comentarios[:tamano_pagina])
+        return {
+            "comentarios": comentarios,
+            "next_cursor": GestorArticulo.codificar_cursor(comentarios[-1]) if hay_mas else None,
+        }
+
+    @instrumentar_async
+    async def obtener_comentarios_por_articulo(self, id_articulo):
+        """Obtiene todos los comentarios de un artículo (más recientes primero), con el email de su autor."""
+        try:
+            comentarios = await self.coleccion.find({"article_id": id_articulo}).sort([("date", -1), ("_id", -1)]).to_list()
+            return await self._agregar_autores(comentarios)
+        except Exception as e:
+            print(f"Error obteniendo los comentarios: {e}")
+            return []
+
+    async def iterar_comentarios(self, id_articulo, tamano_lote=TAMANO_LOTE):
+        """Recorre con 'async for' los comentarios de un artículo (hilos largos) de a un lote por vez, con sus autores."""
+        lote = []
+        async with self.coleccion.find({"article_id": id_articulo}, batch_size=tamano_lote).sort([("date", -1), ("_id", -1)]) as cursor:
+            async for comentario in cursor:
+                lote.append(comentario)
+                if len(lote) == tamano_lote:
+                    for comentario_lote in await self._agregar_autores(lote):
+                        yield comentario_lote
+                    lote = []
+        if lote:
+            for comentario in await self._agregar_autores(lote):
+                yield comentario
+
+
+# --- Consultas Concurrentes ---
+
+def crear_gestores_async(db=None):
+    """
+    Crea los gestores asíncronos, conectados entre sí como los del registro de Logica.py.
+    Sin 'db' usa la base de la aplicación en un AsyncMongoClient nuevo (cerrarlo con gestores["cliente"].close()).
+    """
+    cliente = None
+    if db is None:
+        cliente = crear_cliente_async()
+        db = cliente[DB_NAME]
+    usuarios, categorias, etiquetas = GestorUsuarioAsync(db=db), GestorCategoriaAsync(db=db), GestorEtiquetaAsync(db=db)
+    comentarios = GestorComentarioAsync(db, usuarios)
+    return {
+        "cliente": cliente,
+        "gestor_usuarios": usuarios,
+        "gestor_categorias": categorias,
+        "gestor_etiquetas": etiquetas,
+        "gestor_comentarios": comentarios,
+        "gestor_articulos": GestorArticuloAsync(db, usuarios, categorias, etiquetas, comentarios),
+    }
+
+
+async def cargar_mapas(*gestores):
+    """Carga los mapas de varios gestores a la vez (ej: usuarios, categorías y tags al iniciar)."""
+    await asyncio.gather(*(gestor.cargar_mapa() for gestor in gestores))
+
+
+async def en_paralelo(corrutinas, limite=CONCURRENCIA_MAXIMA):
+    """
+    Ejecuta las corrutinas concurrentemente, con a lo sumo 'limite' en vuelo, y retorna sus resultados
+    en el mismo orden. Si una falla, la excepción se propaga (como en asyncio.gather).
+    """
+    semaforo = asyncio.Semaphore(limite)
+
+    async def limitada(corrutina):
+        async with semaforo:
+            return await corrutina
+    return await asyncio.gather(*(limitada(corrutina) for corrutina in corrutinas))
@@ -1,12 +1,12 @@
 import customtkinter as ctk 
 from tkinter import messagebox 
-import subprocess 
-import sys 
-import os 
  
 # Importaciones de nuestros módulos de lógica y conexión.
-from Conexion import ConexionMongoDB # Importa la clase de conexión (para manejar el inicio y errores).
-from Logica import gestor_usuarios # Importa el gestor de usuarios para la autenticación.
+from Conexion import MONGO_URL, verificar_conexion # Ping al servidor (se hace en segundo plano).
+from Logica import obtener_gestor # Los gestores se crean al pedirlos, no al importar.
+from Tareas import EjecutorTareas, avisar_ventana_lista # Consultas fuera del hilo de la GUI.
+from Sesion import iniciar_sesion # Lleva el usuario autenticado al menú.
+from Menu import AppMenuPrincipal # El menú se abre en esta misma ventana y proceso.
 
 class AppLogin:
     """Clase para la ventana de Inicio de Sesión."""
@@ -16,13 +16,8 @@ class AppLogin:
         self.raiz.geometry("400x350")
         self.raiz.resizable(False, False) 
         
-        # --- Manejo de Conexión ---
-        # Inicializa la conexión. Si la conexión a MongoDB falla, llama a raiz.quit() 
-        # para cerrar la aplicación de manera segura, mostrando un error.
-        self.conn_db = ConexionMongoDB(raiz=self.raiz) 
-
-        # Carga inicial de datos de usuarios.
-        gestor_usuarios.cargar_mapa()
+        self.gestor_usuarios = obtener_gestor("gestor_usuarios")
+        self.ejecutor = EjecutorTareas(self.raiz) # Ping, carga del mapa y autenticación en segundo plano.
 
         # --- Configuración y Creación de la Interfaz ---
         ctk.set_appearance_mode("dark") 
@@ -46,8 +41,35 @@ class AppLogin:
         self.entrada_contrasena.pack(pady=5, padx=10)
 
         # Botón de Login que llama a la función de autenticación.
-        self.boton_login = ctk.CTkButton(master=frame_principal, text="Entrar", command=self.intentar_login, fg_color="#3B82F6")
-        self.boton_login.pack(pady=20, padx=10)
+        # Queda deshabilitado hasta que el servidor responda.
+        self.boton_login = ctk.CTkButton(master=frame_principal, text="Entrar", command=self.intentar_login, fg_color="#3B82F6", state="disabled")
+        self.boton_login.pack(pady=(20, 5), padx=10)
+
+        # Estado de la conexión (la ventana se muestra sin esperar a MongoDB).
+        self.etiqueta_estado = ctk.CTkLabel(master=frame_principal, text="Conectando...", text_color="orange")
+        self.etiqueta_estado.pack()
+
+        # --- Manejo de Conexión ---
+        # El ping y la carga inicial de usuarios corren mientras la ventana se pinta. Si la conexión
+        # a MongoDB falla, se muestra el error y se cierra la aplicación de manera segura.
+        self.ejecutor.enviar(self._conectar, al_terminar=self._conexion_lista, al_error=self._conexion_fallida)
+
+    def _conectar(self):
+        """Verifica el servidor y carga el mapa de usuarios (en segundo plano; desde la instantánea local si existe)."""
+        verificar_conexion()
+        self.gestor_usuarios.iniciar_mapa()
+
+    def _conexion_lista(self, _resultado):
+        """Habilita el login una vez que MongoDB respondió."""
+        self.etiqueta_estado.configure(text="")
+        self.boton_login.configure(state="normal")
+
+    def _conexion_fallida(self, error):
+        """Muestra el error de conexión y cierra la aplicación."""
+        error_msg = f"Error al conectar a MongoDB en {MONGO_URL}: {error}"
+        print(error_msg)
+        messagebox.showerror("Error de Conexión", error_msg)
+        self.raiz.quit()
 
     def intentar_login(self):
         """Intenta autenticar al usuario."""
@@ -58,33 +80,50 @@ class AppLogin:
             messagebox.showwarning("Error de Entrada", "Todos los campos son obligatorios.")
             return
 
-        # LLAMADA A LA LÓGICA DE AUTENTICACIÓN (en Logica.py)
-        # user_manager.authenticate() retorna el documento del usuario si es exitoso, sino None.
-        usuario = gestor_usuarios.autenticar(email, password)
-        
+        # LLAMADA A LA LÓGICA DE AUTENTICACIÓN (en Logica.py, en segundo plano)
+        # autenticar() retorna el documento del usuario si es exitoso, sino None.
+        self.boton_login.configure(state="disabled") # Evita enviar dos veces.
+        self.ejecutor.enviar(
+            self.gestor_usuarios.autenticar, email, password,
+            al_terminar=lambda usuario: self._resultado_login(usuario, email),
+            al_error=self._error_login
+        )
+
+    def _resultado_login(self, usuario, email):
+        """Recibe el resultado de la autenticación en el hilo de la GUI."""
+        self.boton_login.configure(state="normal")
         if usuario:
             # Autenticación exitosa
             messagebox.showinfo("Éxito", f"Bienvenido, {usuario.get('name', email)}!")
-            self.lanzar_aplicacion_principal() # Pasa al menú.
+            self.lanzar_aplicacion_principal(usuario) # Pasa al menú.
         else:
             # Autenticación fallida
             messagebox.showerror("Error de Autenticación", "Correo o contraseña incorrectos.")
 
-    def lanzar_aplicacion_principal(self):
-        """Cierra la ventana de Login y lanza Menu.py usando subprocess."""
-        self.raiz.destroy() # Cierra la ventana actual (Login).
-        
+    def _error_login(self, error):
+        """Muestra un error de la base de datos durante la autenticación."""
+        self.boton_login.configure(state="normal")
+        messagebox.showerror("Error de Conexión", f"No se pudo verificar el usuario:\n{error}")
+
+    def lanzar_aplicacion_principal(self, usuario):
+        """Reemplaza el Login por el menú principal en la misma ventana, con la sesión del usuario."""
+        sesion = iniciar_sesion(usuario)
+        self.ejecutor.cerrar()
+        # Quita los widgets del Login; la ventana, la conexión y los mapas ya cargados se reutilizan.
+        for widget in self.raiz.winfo_children():
+            widget.destroy()
+        self.raiz.resizable(True, True)
+
         try:
-            # Construye la ruta absoluta al archivo Menu.py.
-            ruta_menu = os.path.join(os.path.dirname(__file__), "Menu.py")
-            # Inicia el script Menu.py en un proceso separado.
-            subprocess.Popen([sys.executable, ruta_menu])
+            return AppMenuPrincipal(self.raiz, sesion)
         except Exception as e:
             messagebox.showerror("Error de Aplicación", f"No se pudo iniciar el menú principal:\n{e}")
+            self.raiz.quit()
 
 
 if __name__ == "__main__":
     # Bloque de ejecución principal
     raiz_login = ctk.CTk()
     app_login = AppLogin(raiz_login) 
+    avisar_ventana_lista(raiz_login) # Solo con BLOG_MEDIR_ARRANQUE (benchmark de arranque).
     raiz_login.mainloop() # Inicia el bucle principal de la GUI.
\ No newline at end of file
@@ -0,0 +1,264 @@
+import itertools
+from array import array
+
+from bson.objectid import ObjectId
+
+# --- Configuración del Mapa Compacto ---
+TAMANO_ID = 12 # Bytes de un ObjectId.
+VACIA, BORRADA = 0, -1 # Ranuras de las tablas hash (las ocupadas guardan posicion + 1).
+CARGA_MAXIMA = 2 / 3 # Ocupación (incluidas las borradas) a partir de la cual una tabla duplica su tamaño.
+
+
+def _capacidad(cantidad):
+    """Menor potencia de 2 que deja la tabla por debajo de CARGA_MAXIMA con 'cantidad' entradas."""
+    capacidad = 8
+    while cantidad >= capacidad * CARGA_MAXIMA:
+        capacidad *= 2
+    return capacidad
+
+
+class MapaCompacto:
+    """
+    Mapa bidireccional nombre <-> ObjectId sin un objeto Python por entrada: los nombres van en un solo
+    buffer UTF-8 con sus desplazamientos, los _id empaquetados de a 12 bytes, y dos tablas hash de
+    direccionamiento abierto (por nombre y por _id) guardan posiciones. Los objetos str/ObjectId se crean
+    solo al consultar. Las vistas por_nombre y por_id se usan como los diccionarios de GestorEntidad.
+    """
+
+    def __init__(self, nombres=(), ids=()):
+        self.cargar(nombres, ids)
+        self.por_nombre = _VistaNombres(self) # { nombre: ObjectId }
+        self.por_id = _VistaIds(self) # { ObjectId: nombre }
+
+    def cargar(self, nombres, ids):
+        """
+        Reemplaza el contenido. 'ids' son ObjectId alineados con 'nombres', o los bytes ya empaquetados
+        (ej: los de una instantánea). Si un nombre se repite, queda la última entrada (como en un dict).
+        """
+        codificados = [nombre.encode("utf-8") for nombre in nombres]
+        self.texto = bytearray(b"".join(codificados)) # Nombres UTF-8, uno a continuación del otro.
+        self.inicios = array("I", itertools.accumulate(map(len, codificados), initial=0)) # Nombre i: texto[inicios[i]:inicios[i+1]]
+        empaquetados = ids if isinstance(ids, (bytes, bytearray)) else b"".join(id_objeto.binary for id_objeto in ids)
+        self.ids = bytearray(empaquetados) # _id i: ids[12*i:12*i+12]
+        self.vivas = bytearray(b"\x01" * len(codificados)) # 1 si la entrada i sigue en el mapa.
+        self.cantidad = len(codificados)
+        self._reconstruir_tablas(codificados)
+
+    def _reconstruir_tablas(self, codificados):
+        """Arma las tablas hash desde las entradas vivas ('codificados': sus nombres UTF-8, en orden de posición)."""
+        capacidad = _capacidad(self.cantidad + self.cantidad // 4 + 1) # Con lugar para crecer sin rehacerlas enseguida.
+        tabla_nombres = self.tabla_nombres = array("i", bytes(4 * capacidad))
+        tabla_ids = self.tabla_ids = array("i", bytes(4 * capacidad))
+        mascara, ids = capacidad - 1, bytes(self.ids)
+        # Bucle con variables locales y sin llamadas a métodos: es el costo de cargar un millón de entradas.
+        for posicion, clave in enumerate(codificados):
+            ranura = hash(clave) & mascara
+            while tabla_nombres[ranura] != VACIA:
+                anterior = tabla_nombres[ranura] - 1
+                if codificados[anterior] == clave: # Nombre repetido: la entrada anterior deja de existir.
+                    self._quitar_de_tabla(tabla_ids, ids[TAMANO_ID * anterior:TAMANO_ID * (anterior + 1)], anterior)
+                    self.vivas[anterior] = 0
+                    self.cantidad -= 1
+                    break
+                ranura = (ranura + 1) & mascara
+            tabla_nombres[ranura] = posicion + 1
+            ranura = hash(ids[TAMANO_ID * posicion:TAMANO_ID * (posicion + 1)]) & mascara
+            while tabla_ids[ranura] != VACIA:
+                ranura = (ranura + 1) & mascara
+            tabla_ids[ranura] = posicion + 1
+        self.ocupadas_nombres = self.ocupadas_ids = len(codificados)
+
+    # --- Acceso a las Entradas ---
+
+    def _nombre_bytes(self, posicion):
+        return bytes(self.texto[self.inicios[posicion]:self.inicios[posicion + 1]])
+
+    def _id_bytes(self, posicion):
+        return bytes(self.ids[TAMANO_ID * posicion:TAMANO_ID * (posicion + 1)])
+
+    def nombre(self, posicion):
+        return self._nombre_bytes(posicion).decode("utf-8")
+
+    def id(self, posicion):
+        return ObjectId(self._id_bytes(posicion))
+
+    def __len__(self):
+        return self.cantidad
+
+    def posiciones(self):
+        """Posiciones de las entradas vivas, en orden de inserción."""
+        return (posicion for posicion, viva in enumerate(self.vivas) if viva)
+
+    # --- Tablas Hash (direccionamiento abierto con sondeo lineal) ---
+
+    def _buscar(self, tabla, clave, leer):
+        """Posición de la entrada con esa clave (leer(posicion) -> bytes de su clave), o -1."""
+        mascara = len(tabla) - 1
+        ranura = hash(clave) & mascara
+        while True:
+            valor = tabla[ranura]
+            if valor == VACIA:
+                return -1
+            if valor != BORRADA and leer(valor - 1) == clave:
+                return valor - 1
+            ranura = (ranura + 1) & mascara
+
+    def _insertar(self, tabla, clave, posicion):
+        mascara = len(tabla) - 1
+        ranura = hash(clave) & mascara
+        while tabla[ranura] > 0:
+            ranura = (ranura + 1) & mascara
+        tabla[ranura] = posicion + 1
+
+    def _quitar_de_tabla(self, tabla, clave, posicion):
+        mascara = len(tabla) - 1
+        ranura = hash(clave) & mascara
+        while tabla[ranura] != VACIA:
+            if tabla[ranura] == posicion + 1:
+                tabla[ranura] = BORRADA # Marca (no vacía): no corta las cadenas de sondeo de otras claves.
+                return
+            ranura = (ranura + 1) & mascara
+
+    def buscar_nombre(self, nombre):
+        return self._buscar(self.tabla_nombres, nombre.encode("utf-8"), self._nombre_bytes)
+
+    def buscar_id(self, id_objeto):
+        if not isinstance(id_objeto, ObjectId):
+            return -1
+        return self._buscar(self.tabla_ids, id_objeto.binary, self._id_bytes)
+
+    # --- Modificación ---
+
+    def agregar(self, nombre, id_objeto):
+        """Agrega una entrada nueva al final de los buffers (el nombre y el _id no deben estar). Retorna su posición."""
+        if not isinstance(id_objeto, ObjectId):
+            raise TypeError(f"MapaCompacto solo guarda ObjectId (recibió {type(id_objeto).__name__}).")
+        if max(self.ocupadas_nombres, self.ocupadas_ids) + 1 >= len(self.tabla_nombres) * CARGA_MAXIMA:
+            self._compactar() # Tablas llenas (o con muchas ranuras borradas): se rehacen más grandes.
+        clave = nombre.encode("utf-8")
+        posicion = len(self.vivas)
+        self.texto += clave
+        self.inicios.append(len(self.texto))
+        self.ids += id_objeto.binary
+        self.vivas.append(1)
+        self.cantidad += 1
+        self._insertar(self.tabla_nombres, clave, posicion)
+        self._insertar(self.tabla_ids, id_objeto.binary, posicion)
+        self.ocupadas_nombres += 1
+        self.ocupadas_ids += 1
+        return posicion
+
+    def quitar(self, posicion):
+        """Quita la entrada (su espacio en los buffers se recupera al compactar)."""
+        self._quitar_de_tabla(self.tabla_nombres, self._nombre_bytes(posicion), posicion)
+        self._quitar_de_tabla(self.tabla_ids, self._id_bytes(posicion), posicion)
+        self.vivas[posicion] = 0
+        self.cantidad -= 1
+        if len(self.vivas) > 1024 and self.cantidad < len(self.vivas) // 2:
+            self._compactar() # Más de la mitad de los buffers es espacio de entradas quitadas.
+
+    def _compactar(self):
+        """Reescribe los buffers solo con las entradas vivas y rehace las tablas."""
+        posiciones = list(self.posiciones())
+        codificados = [self._nombre_bytes(posicion) for posicion in posiciones]
+        ids = b"".join(self._id_bytes(posicion) for posicion in posiciones)
+        self.texto = bytearray(b"".join(codificados))
+        self.inicios = array("I", itertools.accumulate(map(len, codificados), initial=0))
+        self.ids = bytearray(ids)
+        self.vivas = bytearray(b"\x01" * len(posiciones))
+        self.cantidad = len(posiciones)
+        self._reconstruir_tablas(codificados)
+
+
+class _VistaNombres:
+    """Vista { nombre: ObjectId } de un MapaCompacto con las operaciones de dict que usa GestorEntidad."""
+
+    def __init__(self, mapa):
+        self.mapa = mapa
+
+    def get(self, nombre, defecto=None):
+        posicion = self.mapa.buscar_nombre(nombre)
+        return self.mapa.id(posicion) if posicion >= 0 else defecto
+
+    def __getitem__(self, nombre):
+        posicion = self.mapa.buscar_nombre(nombre)
+        if posicion < 0:
+            raise KeyError(nombre)
+        return self.mapa.id(posicion)
+
+    def __contains__(self, nombre):
+        return self.mapa.buscar_nombre(nombre) >= 0
+
+    def __setitem__(self, nombre, id_objeto):
+        if self.get(nombre) == id_objeto:
+            return
+        # Cada nombre y cada _id está en una sola entrada: se quitan las que tengan uno u otro (de a una,
+        # porque quitar puede compactar y cambiar las posiciones).
+        posicion = self.mapa.buscar_nombre(nombre)
+        if posicion >= 0:
+            self.mapa.quitar(posicion)
+        posicion = self.mapa.buscar_id(id_objeto)
+        if posicion >= 0:
+            self.mapa.quitar(posicion)
+        self.mapa.agregar(nombre, id_objeto)
+
+    def __delitem__(self, nombre):
+        posicion = self.mapa.buscar_nombre(nombre)
+        if posicion < 0:
+            raise KeyError(nombre)
+        self.mapa.quitar(posicion)
+
+    def __len__(self):
+        return len(self.mapa)
+
+    def __iter__(self):
+        return (self.mapa.nombre(posicion) for posicion in self.mapa.posiciones())
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return ((self.mapa.nombre(posicion), self.mapa.id(posicion)) for posicion in self.mapa.posiciones())
+
+
+class _VistaIds:
+    """Vista { ObjectId: nombre } de un MapaCompacto con las operaciones de dict que usa GestorEntidad."""
+
+    def __init__(self, mapa):
+        self.mapa = mapa
+
+    def get(self, id_objeto, defecto=None):
+        posicion = self.mapa.buscar_id(id_objeto)
+        return self.mapa.nombre(posicion) if posicion >= 0 else defecto
+
+    def __getitem__(self, id_objeto):
+        posicion = self.mapa.buscar_id(id_objeto)
+        if posicion < 0:
+            raise KeyError(id_objeto)
+        return self.mapa.nombre(posicion)
+
+    def __contains__(self, id_objeto):
+        return self.mapa.buscar_id(id_objeto) >= 0
+
+    def __setitem__(self, id_objeto, nombre):
+        if self.get(id_objeto) != nombre:
+            self.mapa.por_nombre[nombre] = id_objeto
+
+    def pop(self, id_objeto, *defecto):
+        posicion = self.mapa.buscar_id(id_objeto)
+        if posicion < 0:
+            if defecto:
+                return defecto[0]
+            raise KeyError(id_objeto)
+        nombre = self.mapa.nombre(posicion)
+        self.mapa.quitar(posicion)
+        return nombre
+
+    def __len__(self):
+        return len(self.mapa)
+
+    def __iter__(self):
+        return (self.mapa.id(posicion) for posicion in self.mapa.posiciones())
+
+    def items(self):
+        return ((self.mapa.id(posicion), self.mapa.nombre(posicion)) for posicion in self.mapa.posiciones())
@@ -1,40 +1,58 @@
 import customtkinter as ctk 
 from tkinter import messagebox 
 import datetime 
+import os
+import re 
+import uuid
 from bson.objectid import ObjectId 
 
 # Importaciones de nuestros módulos
-from Conexion import ConexionMongoDB, DB # Importa la variable global DB para el chequeo de conexión.
+from Conexion import MONGO_URL, verificar_conexion # Ping al servidor (en segundo plano) para el chequeo de conexión.
 from Logica import (
     gestor_usuarios, # Gestor de la colección 'users'.
     gestor_categorias, # Gestor de la colección 'categories'.
     gestor_etiquetas, # Gestor de la colección 'tags'.
     gestor_articulos, # Gestor de la colección 'articles'.
-    gestor_comentarios # Gestor de la colección 'comentarios'
+    gestor_comentarios, # Gestor de la colección 'comentarios'
+    gestor_integridad, # Eliminaciones en cascada y barrido de referencias huérfanas.
+    limitar_consultas, # 'comment' y maxTimeMS de las consultas de la búsqueda mientras se escribe.
+    MODO_PARCIAL, # Búsqueda literal por subcadena: encuentra palabras a medio escribir.
 )
+from Sesion import obtener_sesion # Usuario autenticado en el Login (mismo proceso).
+from Tareas import EjecutorTareas, avisar_ventana_lista # Ejecuta las consultas a MongoDB fuera del hilo de la GUI.
+from Indices import asegurar_indices # Crea los índices que faltan al iniciar.
+from Widgets import ListaVirtual, FuentePaginada, Selector # Listas que solo crean widgets para las filas visibles.
+import Servicios # Operaciones del blog independientes de la interfaz (las mismas que sirve ServidorAPI.py).
+
+# --- Búsqueda Mientras se Escribe ---
+RETRASO_BUSQUEDA_MS = int(os.environ.get("BLOG_RETRASO_BUSQUEDA_MS", 60)) # Pausa sin teclas antes de consultar.
+MAX_MS_BUSQUEDA = int(os.environ.get("BLOG_MAX_MS_BUSQUEDA", 3000)) # maxTimeMS de cada consulta de la búsqueda en vivo.
+RETRASO_RELEVANCIA_MS = int(os.environ.get("BLOG_RETRASO_RELEVANCIA_MS", 400)) # Pausa más larga: búsqueda por relevancia.
+
+# --- Integridad ---
+# El barrido de huérfanos corre en un solo proceso (python Integridad.py --continuo o ServidorAPI.py --barrido);
+# cada ventana abierta lo repetiría sobre las mismas colecciones. Con BLOG_BARRIDO=1 el Menú también lo inicia.
+BARRIDO_EN_MENU = os.environ.get("BLOG_BARRIDO", "0") == "1"
 
 class AppMenuPrincipal:
     
-    def __init__(self, raiz):
+    def __init__(self, raiz, sesion=None):
         self.raiz = raiz
+        # Sesión del usuario que inició sesión; None si Menu.py se ejecuta directamente.
+        self.sesion = sesion if sesion is not None else obtener_sesion()
         self.raiz.title("Gestión CRUD - Blog de Recetas")
         self.raiz.geometry("1000x700")
         
-        # --- Chequeo de Conexión ---
-        if DB is None:
-            # Si DB es None, significa que la conexión falló en Conexion.py.
-            messagebox.showerror("Error Global", "La conexión global a la DB falló. Revisa que mongod esté corriendo.")
-            self.raiz.quit()
-            return
-            
         # Obtenemos la referencia a la colección de artículos.
         self.coleccion_articulos = gestor_articulos.obtener_coleccion()
         self.frame_actual = None # Para rastrear el frame visible.
+        self.busqueda_programada = None # 'after' pendiente de la búsqueda mientras se escribe.
+        self.termino_articulos = None # Término del listado de artículos que se está mostrando.
+        self.modo_articulos = None # Modo de ese listado (MODO_PARCIAL mientras se escribe).
+        self.comentario_busqueda = None # 'comment' de las consultas del listado actual (para cancelarlas).
 
-        # Cargar los mapas de los managers al inicio para los OptionMenus y Checkboxes.
-        gestor_usuarios.cargar_mapa()
-        gestor_categorias.cargar_mapa()
-        gestor_etiquetas.cargar_mapa()
+        # Todas las llamadas a pymongo pasan por el ejecutor para no congelar la ventana.
+        self.ejecutor = EjecutorTareas(self.raiz, al_cambiar_estado=self._actualizar_estado_carga)
 
         # --- Configuración de Layout (Grid) ---
         self.raiz.grid_columnconfigure(1, weight=1) # Columna de contenido principal expandible.
@@ -46,6 +64,8 @@ class AppMenuPrincipal:
         self.frame_sidebar.grid_rowconfigure(5, weight=1) # Empuja el botón "Salir" al fondo.
 
         ctk.CTkLabel(self.frame_sidebar, text="Menú Principal", font=("Arial", 18, "bold")).pack(pady=20)
+        if self.sesion:
+            ctk.CTkLabel(self.frame_sidebar, text=f"Usuario: {self.sesion.nombre}").pack(pady=(0, 10))
         
         # Botones para cambiar la vista (Artículos, Categorías, Tags, Usuarios).
         self.boton_articulos = ctk.CTkButton(self.frame_sidebar, text="1. Artículos (CRUD)", command=lambda: self.seleccionar_frame_por_nombre("articles"))
@@ -63,6 +83,15 @@ class AppMenuPrincipal:
         # Botón de Salir.
         ctk.CTkButton(self.frame_sidebar, text="Salir", command=self.raiz.quit, fg_color="red").pack(side="bottom", pady=20, padx=20, fill="x")
 
+        # Indicador de carga: visible mientras haya consultas en segundo plano.
+        self.etiqueta_estado = ctk.CTkLabel(self.frame_sidebar, text="", text_color="orange")
+        self.etiqueta_estado.pack(side="bottom", pady=5)
+
+        # --- Chequeo de Conexión ---
+        # No bloquea la ventana: si el servidor no responde, se avisa y se cierra la aplicación.
+        # Va después de 'etiqueta_estado': cada tarea enviada actualiza el indicador de carga.
+        self.ejecutor.enviar(verificar_conexion, al_error=self._conexion_fallida)
+
         # --- Frame de Contenido Principal ---
         self.frame_contenido_principal = ctk.CTkFrame(self.raiz, corner_radius=0)
         self.frame_contenido_principal.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
@@ -78,9 +107,45 @@ class AppMenuPrincipal:
             "users": self.crear_frame_crud_generico("Usuarios", gestor_usuarios, clave_nombre="email")
         }
         
+        # Cargar los mapas de los managers al inicio (en segundo plano) para los OptionMenus y Checkboxes.
+        # Después se mantienen al día de forma incremental, sin volver a leer las colecciones completas.
+        # Los mapas que ya cargó el Login (mismo proceso) se reutilizan.
+        self.ejecutor.enviar(self._recargar_mapas, clave="mapas")
+        # Crea los índices que falten (en segundo plano; si ya existen no hace nada).
+        self.ejecutor.enviar(asegurar_indices, al_terminar=self._reportar_indices)
+        # Quita por lotes, en su propio hilo, las referencias a categorías/tags/artículos que ya no existen (opcional).
+        if BARRIDO_EN_MENU:
+            gestor_integridad.iniciar_barrido()
+
         # Muestra la vista de artículos por defecto.
         self.seleccionar_frame_por_nombre("articles")
 
+    def _recargar_mapas(self):
+        """Carga los mapas {Nombre: ID} de usuarios, categorías y tags y los mantiene sincronizados (en segundo plano)."""
+        for gestor in (gestor_usuarios, gestor_categorias, gestor_etiquetas):
+            if not gestor.mapa_cargado:
+                gestor.iniciar_mapa() # Instantánea local (reconciliada en segundo plano) o lectura completa.
+            gestor.iniciar_sincronizacion() # Change stream o sondeo por 'last_modified'.
+
+    def _conexion_fallida(self, error):
+        """Muestra el error de conexión y cierra la aplicación."""
+        messagebox.showerror("Error Global", f"No se pudo conectar a MongoDB en {MONGO_URL}. Revisa que mongod esté corriendo.\n{error}")
+        self.raiz.quit()
+
+    def _reportar_indices(self, reporte):
+        """Muestra en consola los índices creados (o los que no se pudieron crear) al iniciar."""
+        for nombre_coleccion, mensajes in reporte.items():
+            for mensaje in mensajes:
+                print(f"[Índices {nombre_coleccion}] {mensaje}")
+
+    def _actualizar_estado_carga(self, pendientes):
+        """Muestra u oculta el indicador de carga según las tareas pendientes del ejecutor."""
+        self.etiqueta_estado.configure(text="Cargando..." if pendientes > 0 else "")
+
+    def _mostrar_error(self, titulo, mensaje, parent=None):
+        """Retorna un callback 'al_error' que muestra la excepción en un messagebox."""
+        return lambda e: messagebox.showerror(titulo, f"{mensaje}{e}", parent=parent or self.raiz)
+
     def seleccionar_frame_por_nombre(self, nombre):
         """Oculta todos los frames y muestra el seleccionado, recargando su lista de datos."""
         for frame in self.frames.values():
@@ -98,7 +163,7 @@ class AppMenuPrincipal:
             elif nombre == "categories": manager = gestor_categorias
             else: manager = gestor_etiquetas
             # Carga la lista genérica.
-            self.cargar_lista_generica(manager, self.frame_actual.textbox, self.frame_actual.clave_nombre)
+            self.cargar_lista_generica(manager, self.frame_actual.lista, self.frame_actual.clave_nombre)
 
 
     # --- LÓGICA DE GESTIÓN DE ARTÍCULOS ---
@@ -116,15 +181,26 @@ class AppMenuPrincipal:
         # Entrada de búsqueda.
         entrada_busqueda = ctk.CTkEntry(frame_controles, width=300, placeholder_text="Buscar por título, texto, autor, categoría o tag...")
         entrada_busqueda.pack(side="left", padx=(10, 5), fill="x", expand=True)
+        # Busca mientras se escribe (con una pausa corta) y Enter busca enseguida.
+        entrada_busqueda.bind("<KeyRelease>", self._al_escribir_busqueda)
+        entrada_busqueda.bind("<Return>", lambda _: self.cargar_articulos())
 
-        # Botones de acción.
-        ctk.CTkButton(frame_controles, text="Buscar / Recargar", command=self.cargar_articulos).pack(side="left", padx=5)
+        # Botones de acción. Buscar siempre vuelve a la primera página.
+        ctk.CTkButton(frame_controles, text="Buscar / Recargar", command=lambda: self.cargar_articulos()).pack(side="left", padx=5)
         ctk.CTkButton(frame_controles, text="Crear Nuevo", command=self.abrir_ventana_creacion_articulo, fg_color="#3B82F6").pack(side="right", padx=(5, 10))
 
-        # Textbox para mostrar la lista de artículos.
-        self.caja_texto_articulos = ctk.CTkTextbox(frame, width=760, height=450, font=("Consolas", 13))
-        self.caja_texto_articulos.pack(pady=10, padx=10, fill="both", expand=True)
-        self.caja_texto_articulos.configure(state="disabled")
+        # Lista virtual: una fila por artículo, pedidos por bloques (paginación por llaves) al desplazarse.
+        self.lista_articulos = ListaVirtual(
+            frame, self.ejecutor, self._formatear_fila_articulo, al_seleccionar=self._al_seleccionar_articulo,
+            al_error=self._mostrar_error("Error al Cargar", "Error en la consulta de artículos: "),
+            mensaje_vacio="No se encontraron artículos.", clave="articulos", height=330
+        )
+        self.lista_articulos.pack(pady=10, padx=10, fill="both", expand=True)
+
+        # Detalle del artículo seleccionado en la lista.
+        self.caja_detalle_articulo = ctk.CTkTextbox(frame, height=150, font=("Consolas", 12))
+        self.caja_detalle_articulo.pack(pady=(0, 5), padx=10, fill="x")
+        self.caja_detalle_articulo.configure(state="disabled")
 
         # Frame para acciones de edición/eliminación.
         frame_accion = ctk.CTkFrame(frame)
@@ -136,92 +212,129 @@ class AppMenuPrincipal:
         
         ctk.CTkButton(frame_accion, text="Editar Artículo", command=self.abrir_ventana_edicion_articulo, fg_color="orange").pack(side="left", padx=5)
         ctk.CTkButton(frame_accion, text="Eliminar Artículo", command=self.eliminar_articulo, fg_color="red").pack(side="left", padx=5)
+        ctk.CTkButton(frame_accion, text="En Lote...", command=lambda: self.abrir_ventana_lote("articles"), width=90).pack(side="left", padx=5)
 
         frame.entrada_busqueda = entrada_busqueda # Almacena la referencia a la entrada de búsqueda en el frame.
         return frame
 
-    def cargar_articulos(self):
-        """Carga y muestra la lista de artículos con filtro y detalle de relaciones."""
+    def _al_escribir_busqueda(self, evento=None):
+        """Cada tecla reinicia la espera: solo se consulta cuando pasan RETRASO_BUSQUEDA_MS sin teclas nuevas."""
+        if self.busqueda_programada is not None:
+            self.raiz.after_cancel(self.busqueda_programada)
+        self.busqueda_programada = self.raiz.after(RETRASO_BUSQUEDA_MS, self._buscar_mientras_escribe)
+
+    def _buscar_mientras_escribe(self):
+        """
+        Mientras se escribe se busca el texto literal por subcadena (los índices de texto e invertido buscan
+        palabras completas y no encuentran "pol" en "pollo"); al dejar de escribir RETRASO_RELEVANCIA_MS,
+        la búsqueda por relevancia reemplaza ese listado. Con el motor $regex ya se busca por subcadena.
+        """
+        self.busqueda_programada = None
+        termino = self.frames["articles"].entrada_busqueda.get().strip()
+        # Las teclas que no cambian el término (flechas, Shift...) no vuelven a consultar.
+        if termino != self.termino_articulos:
+            modo = None if gestor_articulos.motor_busqueda.modo == "regex" else MODO_PARCIAL
+            self.cargar_articulos(max_ms=MAX_MS_BUSQUEDA, modo=modo)
+        if termino and self.modo_articulos == MODO_PARCIAL:
+            self.busqueda_programada = self.raiz.after(RETRASO_RELEVANCIA_MS, self.cargar_articulos)
+
+    def cargar_articulos(self, max_ms=None, modo=None):
+        """
+        Muestra los artículos que coinciden con la búsqueda en la lista virtual (los bloques se piden al desplazarse).
+        Las consultas del listado anterior que sigan en curso se interrumpen en el servidor. 'max_ms' limita
+        cada consulta y 'modo' elige la búsqueda (ver Servicios.listar_articulos): la búsqueda mientras se escribe
+        usa los dos; el botón Buscar / Recargar y Enter buscan por relevancia y sin límite.
+        """
         
         # --- LÓGICA DE FILTRO ---
+        # El filtro y el pipeline (con el $match antes de los JOINs) los construye el gestor de artículos.
         entrada_busqueda = self.frames["articles"].entrada_busqueda
         termino_busqueda = entrada_busqueda.get()
-        filtro_mongo = {} 
-        
-        if termino_busqueda:
-            # Crea una consulta de expresión regular insensible a mayúsculas/minúsculas.
-            consulta_regex = {"$regex": termino_busqueda, "$options": "i"}
-            
-            # Aplica el filtro $or para buscar en múltiples campos, incluyendo los campos JOIN.
-            filtro_mongo = {
-                "$or": [
-                    {"title": consulta_regex}, 
-                    {"text": consulta_regex},
-                    {"author_details.email": consulta_regex},  # Búsqueda por email del autor.
-                    {"category_details.name": consulta_regex}, # Búsqueda por nombre de categoría.
-                    {"tag_details.name": consulta_regex}      # Búsqueda por nombre de tag.
-                ]
-            }
-        
-        # --- PIPELINE DE AGREGACIÓN (Simula los JOINs SQL) ---
-        pipeline = [
-            # 1. $lookup: Trae la información del Autor (user_id -> users._id).
-            { "$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "author_details"}},
-            # 2. $lookup: Trae la información de las Categorías (categories -> categories._id).
-            { "$lookup": {"from": "categories", "localField": "categories", "foreignField": "_id", "as": "category_details"}},
-            # 3. $lookup: Trae la información de los Tags (tags -> tags._id).
-            { "$lookup": {"from": "tags", "localField": "tags", "foreignField": "_id", "as": "tag_details"}},
-            
-            # 4. $unwind: Desanida el arreglo de 'author_details' (que solo tiene un elemento).
-            #    'preserveNullAndEmptyArrays': True permite que muestre artículos sin autor (aunque no debería).
-            { "$unwind": {"path": "$author_details", "preserveNullAndEmptyArrays": True}},
-            
-            # 5. $match: Aplica el filtro de búsqueda DESPUÉS de haber cargado todos los detalles.
-            { "$match": filtro_mongo }
-        ]
-        
-        try:
-            self.caja_texto_articulos.configure(state="normal")
-            self.caja_texto_articulos.delete("1.0", "end")
-            
-            # Ejecuta la agregación en la colección de artículos.
-            articulos = self.coleccion_articulos.aggregate(pipeline) 
-            texto_a_mostrar = ""
-            contador = 0
-            
-            for articulo in articulos:
-                contador += 1
-                titulo = articulo.get("title", "Sin Título")
-                texto_previo = articulo.get("text", "")[:70] + "..."
-                fecha_str = articulo.get("date", datetime.datetime.now()).strftime("%Y-%m-%d %H:%M")
-
-                # Extrae los nombres de los detalles unidos (JOINed)
-                nombre_autor = articulo.get('author_details', {}).get('email', 'Usuario Desconocido') # Usamos email como identificador.
-                nombres_cats = [cat.get('name') for cat in articulo.get('category_details', []) if cat.get('name')]
-                nombres_tags = [tag.get('name') for tag in articulo.get('tag_details', []) if tag.get('name')]
-
-                # Formatea la salida
-                texto_a_mostrar += f"--- {titulo} ---\n"
-                texto_a_mostrar += f"ID: {articulo['_id']}\n"
-                texto_a_mostrar += f"Fecha: {fecha_str}\n"
-                texto_a_mostrar += f"Autor: {nombre_autor}\n"
-                texto_a_mostrar += f"Categorías: {', '.join(nombres_cats) or 'Ninguna'}\n"
-                texto_a_mostrar += f"Tags: {', '.join(nombres_tags) or 'Ninguno'}\n"
-                texto_a_mostrar += f"Texto: {texto_previo}\n"
-                texto_a_mostrar += "-"*80 + "\n\n"
-            
-            if contador == 0:
-                texto_a_mostrar = f"No se encontraron artículos que coincidan con '{termino_busqueda}'." if termino_busqueda else "No hay artículos en la base de datos."
-                
-            self.caja_texto_articulos.insert("1.0", texto_a_mostrar)
-            self.caja_texto_articulos.configure(state="disabled")
-        except Exception as e:
-            messagebox.showerror("Error al Cargar", f"Error en la agregación de artículos: {e}")
+        if self.busqueda_programada is not None: # Enter o el botón se adelantan a la búsqueda programada.
+            self.raiz.after_cancel(self.busqueda_programada)
+            self.busqueda_programada = None
+
+        if self.comentario_busqueda:
+            # Sin permisos para $currentOp/killOp, la consulta vieja termina sola (o por maxTimeMS) y se descarta.
+            self.ejecutor.enviar(gestor_articulos.cancelar_consultas, self.comentario_busqueda,
+                                 al_error=lambda e: print(f"No se pudo cancelar la búsqueda anterior: {e}"))
+        comentario = self.comentario_busqueda = f"busqueda-{uuid.uuid4().hex}"
+        self.termino_articulos = termino_busqueda.strip()
+        self.modo_articulos = modo
+
+        def obtener_pagina(cursor, cantidad):
+            with limitar_consultas(comentario, max_ms):
+                pagina = Servicios.listar_articulos(termino_busqueda, cursor, cantidad, modo=modo)
+            return pagina["articulos"], pagina["next_cursor"]
+
+        def posicionar(desplazamiento):
+            with limitar_consultas(comentario, max_ms):
+                return Servicios.cursor_de_articulos(termino_busqueda, desplazamiento, modo)
+
+        # Cada búsqueda es una fuente nueva; los pedidos de la anterior se descartan.
+        self.lista_articulos.mostrar(FuentePaginada(
+            obtener_pagina,
+            posicionar=posicionar,
+            contar=lambda: Servicios.contar_articulos(termino_busqueda)
+        ))
+        self._mostrar_detalle_articulo(None)
+
+    def _al_seleccionar_articulo(self, articulo):
+        """Clic en una fila: copia su ID a la entrada de acciones y muestra su detalle."""
+        self.entrada_id_articulo.delete(0, "end")
+        self.entrada_id_articulo.insert(0, str(articulo["_id"]))
+        self._mostrar_detalle_articulo(articulo)
+
+    def _mostrar_detalle_articulo(self, articulo):
+        self.caja_detalle_articulo.configure(state="normal")
+        self.caja_detalle_articulo.delete("1.0", "end")
+        self.caja_detalle_articulo.insert("1.0", self._formatear_articulo(articulo) if articulo else "Seleccione un artículo de la lista.")
+        self.caja_detalle_articulo.configure(state="disabled")
+
+    def _nombres_articulo(self, articulo):
+        """Retorna (autor, categorías, tags) del artículo, desde su proyección o sus detalles unidos."""
+        # Extrae los nombres guardados en el artículo (modelo de lectura) o, sin él, de los detalles unidos (JOINed).
+        if "author_email" in articulo:
+            nombre_autor = articulo["author_email"] or 'Usuario Desconocido'
+            nombres_cats = articulo.get('category_names', [])
+            nombres_tags = articulo.get('tag_names', [])
+        else:
+            nombre_autor = articulo.get('author_details', {}).get('email', 'Usuario Desconocido') # Usamos email como identificador.
+            nombres_cats = [cat.get('name') for cat in articulo.get('category_details', []) if cat.get('name')]
+            nombres_tags = [tag.get('name') for tag in articulo.get('tag_details', []) if tag.get('name')]
+        return nombre_autor, nombres_cats, nombres_tags
+
+    def _formatear_fila_articulo(self, articulo):
+        """Una línea de la lista virtual: fecha, título, autor y cantidad de comentarios."""
+        fecha_str = articulo.get("date", datetime.datetime.now()).strftime("%Y-%m-%d")
+        nombre_autor, _, _ = self._nombres_articulo(articulo)
+        return f"{fecha_str} | {articulo.get('title', 'Sin Título'):<40.40} | {nombre_autor:<28.28} | {articulo.get('comment_count', 0)} coment."
+
+    def _formatear_articulo(self, articulo):
+        """Auxiliar que convierte un artículo (con su proyección o sus detalles unidos) en el bloque de texto del detalle."""
+        titulo = articulo.get("title", "Sin Título")
+        texto_previo = articulo.get("text", "")[:70] + "..."
+        fecha_str = articulo.get("date", datetime.datetime.now()).strftime("%Y-%m-%d %H:%M")
+        nombre_autor, nombres_cats, nombres_tags = self._nombres_articulo(articulo)
+
+        # Formatea la salida
+        return "".join([
+            f"--- {titulo} ---\n",
+            f"ID: {articulo['_id']}\n",
+            f"Fecha: {fecha_str}\n",
+            f"Autor: {nombre_autor}\n",
+            f"Categorías: {', '.join(nombres_cats) or 'Ninguna'}\n",
+            f"Tags: {', '.join(nombres_tags) or 'Ninguno'}\n",
+            f"Comentarios: {articulo.get('comment_count', 0)}\n",
+            f"Texto: {texto_previo}\n",
+            "-"*80 + "\n\n",
+        ])
 
     # Funciones auxiliares para abrir el formulario (Crear/Editar)
 
     def abrir_ventana_creacion_articulo(self):
         """Abre el formulario para crear un nuevo artículo."""
+        # Los mapas de los selectores ya están al día (se actualizan de forma incremental).
         self.abrir_formulario_articulo(es_edicion=False)
 
     def abrir_ventana_edicion_articulo(self):
@@ -232,14 +345,26 @@ class AppMenuPrincipal:
             return
 
         try:
-            # Busca el artículo por ID.
-            articulo = self.coleccion_articulos.find_one({"_id": ObjectId(id_articulo)})
+            id_objeto = ObjectId(id_articulo)
+        except Exception as e:
+            messagebox.showerror("ID Inválido", f"El ID proporcionado no es un ObjectId válido: {e}")
+            return
+
+        def buscar_articulo():
+            # Busca el artículo por ID (en segundo plano).
+            return gestor_articulos.obtener_por_id(id_objeto)
+
+        def al_encontrar(articulo):
             if not articulo:
                 messagebox.showerror("No Encontrado", f"Artículo con ID '{id_articulo}' no existe.")
                 return
             self.abrir_formulario_articulo(es_edicion=True, articulo=articulo)
-        except Exception as e:
-            messagebox.showerror("ID Inválido", f"El ID proporcionado no es un ObjectId válido: {e}")
+
+        self.ejecutor.enviar(
+            buscar_articulo, al_terminar=al_encontrar,
+            al_error=self._mostrar_error("Error al Cargar", "No se pudo obtener el artículo: "),
+            clave="formulario"
+        )
 
     def abrir_formulario_articulo(self, es_edicion, articulo=None):
         """Genera y muestra el formulario de creación/edición de artículos."""
@@ -248,16 +373,11 @@ class AppMenuPrincipal:
         ventana.geometry("600x700")
         ventana.grab_set() # Hace que la ventana sea modal (bloquea la principal).
         
-        # Recarga los mapas para asegurar que los selectores y checkboxes tengan los datos más recientes.
-        gestor_usuarios.cargar_mapa()
-        gestor_categorias.cargar_mapa()
-        gestor_etiquetas.cargar_mapa()
-        
         frame_formulario = ctk.CTkScrollableFrame(ventana) # Frame con scrollbar.
         frame_formulario.pack(fill="both", expand=True, padx=20, pady=20)
 
         
-        # Widgets del formulario: Título, Texto, Autor (OptionMenu), Categorías (Checkboxes), Tags (Checkboxes).
+        # Widgets del formulario: Título, Texto, Autor, Categorías y Tags (selectores con búsqueda por prefijo).
         
         # Título
         ctk.CTkLabel(frame_formulario, text="Título:").pack(padx=10, pady=(10, 0), anchor="w")
@@ -269,69 +389,103 @@ class AppMenuPrincipal:
         caja_texto = ctk.CTkTextbox(frame_formulario, width=500, height=200)
         caja_texto.pack(padx=10, pady=5)
         
-        # Autor (Selector OptionMenu)
+        # En edición, los selectores empiezan con los valores actuales del artículo (nombres tomados de los mapas).
+        articulo_actual = articulo if es_edicion and articulo else {}
+
+        # Autor (un solo email)
         ctk.CTkLabel(frame_formulario, text="Autor:").pack(padx=10, pady=(10, 0), anchor="w")
-        usuarios = gestor_usuarios.obtener_todos_los_nombres()
-        menu_opciones_usuario = ctk.CTkOptionMenu(frame_formulario, values=usuarios if usuarios else ["No hay usuarios"])
-        menu_opciones_usuario.pack(padx=10, pady=5, anchor="w")
+        selector_autor = Selector(frame_formulario, gestor_usuarios.buscar_por_prefijo, multiple=False,
+                                  seleccion=[gestor_usuarios.obtener_nombre_por_id(articulo_actual.get("user_id"))],
+                                  marcador="Buscar email...", sugerir=gestor_usuarios.sugerir_nombres)
+        selector_autor.pack(padx=10, pady=5, fill="x")
 
-        # Categorías (Checkboxes)
+        # Categorías
         ctk.CTkLabel(frame_formulario, text="Categorías:").pack(padx=10, pady=(10, 0), anchor="w")
-        # _setup_checkboxes retorna una lista de tuplas (variable_tkinter, object_id)
-        mapa_vars_categoria = self._configurar_checkboxes(frame_formulario, gestor_categorias) 
-        
-        # Tags (Checkboxes)
+        selector_categorias = self._crear_selector(frame_formulario, gestor_categorias, articulo_actual.get("categories", []))
+
+        # Tags
         ctk.CTkLabel(frame_formulario, text="Tags:").pack(padx=10, pady=(10, 0), anchor="w")
-        mapa_vars_tag = self._configurar_checkboxes(frame_formulario, gestor_etiquetas)
+        selector_tags = self._crear_selector(frame_formulario, gestor_etiquetas, articulo_actual.get("tags", []))
 
         # Precargar datos si es edición
         if es_edicion and articulo:
             entrada_titulo.insert(0, articulo.get("title", ""))
             caja_texto.insert("1.0", articulo.get("text", ""))
-            
-            # Marcar checkboxes iniciales.
-            self._marcar_valores_iniciales(mapa_vars_categoria, articulo.get("categories", []))
-            self._marcar_valores_iniciales(mapa_vars_tag, articulo.get("tags", []))
 
         # Botón Guardar
         comando_guardar = lambda: self.guardar_articulo(
             ventana, articulo['_id'] if es_edicion else None, entrada_titulo.get(),
-            caja_texto.get("1.0", "end-1c"), menu_opciones_usuario.get(),
-            mapa_vars_categoria, mapa_vars_tag
+            caja_texto.get("1.0", "end-1c"), (selector_autor.obtener_seleccion() or [None])[0],
+            selector_categorias.obtener_seleccion(), selector_tags.obtener_seleccion()
         )
         boton_guardar = ctk.CTkButton(master=frame_formulario, 
                                           text="Guardar Cambios" if es_edicion else "Crear Artículo", 
                                           fg_color="green",
                                           command=comando_guardar)
         boton_guardar.pack(pady=20, padx=10)
+
+        # La sección de comentarios solo existe para artículos ya guardados.
         if es_edicion and articulo:
+            self._crear_seccion_comentarios(ventana, frame_formulario, articulo)
+
+    def _crear_seccion_comentarios(self, ventana, frame_formulario, articulo):
+        """Crea la lista de comentarios del artículo y la entrada para agregar uno nuevo."""
         # El ID del artículo actual.
-         id_articulo = articulo['_id'] 
+        id_articulo = articulo['_id'] 
         
         ctk.CTkLabel(frame_formulario, text="--- Comentarios ---", font=("Arial", 16, "bold")).pack(pady=(20, 5), padx=10, anchor="w")
         
         # 1. Caja de texto para mostrar comentarios existentes
+        etiqueta_total = ctk.CTkLabel(frame_formulario, text="Cargando comentarios...")
+        etiqueta_total.pack(padx=10, anchor="w")
         caja_comentarios = ctk.CTkTextbox(frame_formulario, width=500, height=150, font=("Consolas", 11))
         caja_comentarios.pack(padx=10, pady=5)
         caja_comentarios.configure(state="disabled")
-        
-        # Función para cargar y mostrar los comentarios
-        def recargar_comentarios():
-            comentarios = gestor_comentarios.obtener_comentarios_por_articulo(id_articulo)
+        # "Cargar más" trae la siguiente página (comentarios más antiguos) y la agrega al final.
+        boton_cargar_mas = ctk.CTkButton(frame_formulario, text="Cargar más", state="disabled")
+        boton_cargar_mas.pack(padx=10, pady=(0, 5), anchor="w")
+        estado = {"mostrados": 0, "cursor": None} # Comentarios en la caja y cursor de la página siguiente.
+
+        # Función para mostrar una página de comentarios recibida del ejecutor
+        def mostrar_comentarios(pagina, cursor):
+            if not caja_comentarios.winfo_exists():
+                return # El formulario se cerró antes de que llegaran los comentarios.
             caja_comentarios.configure(state="normal")
-            caja_comentarios.delete("1.0", "end")
-            texto = f"({len(comentarios)} Comentarios)\n"
-            
-            for c in comentarios:
-                autor_email = c.get('author_details', {}).get('email', 'Desconocido')
+            if not cursor:
+                caja_comentarios.delete("1.0", "end") # Primera página: reemplaza lo que hubiera.
+                estado["mostrados"] = 0
+            texto = ""
+            for c in pagina["comentarios"]:
+                autor_email = c.get('author_email') or 'Desconocido'
                 fecha_str = c.get('date', datetime.datetime.now()).strftime("%Y-%m-%d %H:%M")
                 texto += f"[{autor_email} - {fecha_str}]: {c.get('text', '')}\n"
                 texto += "---" + "\n"
-                
-            caja_comentarios.insert("1.0", texto)
+            caja_comentarios.insert("end", texto)
             caja_comentarios.configure(state="disabled")
 
-        recargar_comentarios() # Carga inicial
+            estado["mostrados"] += len(pagina["comentarios"])
+            estado["cursor"] = pagina["next_cursor"]
+            total = max(articulo.get("comment_count", 0), estado["mostrados"]) # 'comment_count' viene del modelo de lectura.
+            etiqueta_total.configure(text=f"({estado['mostrados']} de {total} Comentarios)")
+            boton_cargar_mas.configure(state="normal" if estado["cursor"] else "disabled")
+
+        # Función para cargar una página de comentarios en segundo plano (sin cursor: los más recientes)
+        def cargar_comentarios(cursor=None):
+            boton_cargar_mas.configure(state="disabled")
+            self.ejecutor.enviar(
+                gestor_comentarios.obtener_pagina_comentarios, id_articulo, cursor,
+                al_terminar=lambda pagina: mostrar_comentarios(pagina, cursor),
+                al_error=self._mostrar_error("Error al Cargar", "No se pudieron cargar los comentarios: ", parent=ventana),
+                clave=f"comentarios-{id_articulo}"
+            )
+
+        def recargar_comentarios():
+            articulo["comment_count"] = articulo.get("comment_count", 0) + 1 # Tras agregar uno.
+            cargar_comentarios()
+
+        boton_cargar_mas.configure(command=lambda: cargar_comentarios(estado["cursor"]))
+        # Carga inicial diferida: el formulario se pinta primero y los comentarios llegan después.
+        ventana.after_idle(cargar_comentarios)
 
         # 2. Entrada para nuevo comentario
         ctk.CTkLabel(frame_formulario, text="Agregar Comentario:").pack(padx=10, pady=(10, 0), anchor="w")
@@ -341,89 +495,62 @@ class AppMenuPrincipal:
         # Lógica para guardar el nuevo comentario
         def agregar_comentario_action():
             texto = entrada_comentario.get()
-            id_usuario_actual = articulo.get("user_id") 
 
             if not texto:
                 messagebox.showwarning("Vacío", "El comentario no puede estar vacío.", parent=ventana)
                 return
+            if not self.sesion:
+                messagebox.showwarning("Sin Sesión", "Inicia sesión desde Login.py para comentar.", parent=ventana)
+                return
+            id_usuario_actual = self.sesion.id_usuario # El autor del comentario es el usuario autenticado.
 
-            resultado = gestor_comentarios.crear_comentario(id_articulo, id_usuario_actual, texto)
-            
-            if resultado:
-                messagebox.showinfo("Éxito", "Comentario agregado.", parent=ventana)
-                entrada_comentario.delete(0, 'end') # Limpia el campo
-                recargar_comentarios() # Recarga la vista de comentarios
-            else:
-                messagebox.showerror("Error", "No se pudo agregar el comentario.", parent=ventana)
+            def al_guardar(resultado):
+                if resultado:
+                    messagebox.showinfo("Éxito", "Comentario agregado.", parent=ventana)
+                    entrada_comentario.delete(0, 'end') # Limpia el campo
+                    recargar_comentarios() # Recarga la vista de comentarios
+                else:
+                    messagebox.showerror("Error", "No se pudo agregar el comentario.", parent=ventana)
 
+            self.ejecutor.enviar(
+                gestor_comentarios.crear_comentario, id_articulo, id_usuario_actual, texto,
+                al_terminar=al_guardar,
+                al_error=self._mostrar_error("Error", "No se pudo agregar el comentario: ", parent=ventana)
+            )
 
         ctk.CTkButton(frame_formulario, text="Comentar", command=agregar_comentario_action).pack(side="left", padx=(5, 10))
 
-    def _configurar_checkboxes(self, frame_padre, gestor):
-        """Función auxiliar para crear un conjunto de checkboxes de un gestor (Categorías/Tags)."""
-        lista_mapa = []
-        nombres = gestor.obtener_todos_los_nombres() 
-        
-        contenedor = ctk.CTkScrollableFrame(frame_padre, height=100) # Frame con scroll para los checkboxes.
-        contenedor.pack(padx=10, pady=5, fill="x")
-        
-        for nombre in nombres:
-            variable = ctk.IntVar(value=0) # Variable para rastrear el estado (0=desmarcado, 1=marcado).
-            id_objeto = gestor.obtener_id_por_nombre(nombre)
-            
-            checkbox = ctk.CTkCheckBox(contenedor, text=nombre, variable=variable)
-            checkbox.pack(anchor="w", padx=10)
-            lista_mapa.append((variable, id_objeto)) # Almacena la variable y el ID asociado.
-        
-        return lista_mapa
-    
-    def _marcar_valores_iniciales(self, mapa_vars, ids_actuales):
-        """Auxiliar para marcar los checkboxes que ya están seleccionados en edición."""
-        for variable, id_objeto in mapa_vars:
-            if id_objeto in ids_actuales:
-                variable.set(1)
+    def _crear_selector(self, frame_padre, gestor, ids_actuales):
+        """Función auxiliar para crear el selector múltiple de un gestor (Categorías/Tags) con los ids ya elegidos."""
+        nombres = [gestor.obtener_nombre_por_id(id_objeto) for id_objeto in ids_actuales]
+        selector = Selector(frame_padre, gestor.buscar_por_prefijo, seleccion=nombres, sugerir=gestor.sugerir_nombres)
+        selector.pack(padx=10, pady=5, fill="x")
+        return selector
 
-    def guardar_articulo(self, ventana, id_articulo, titulo, texto, nombre_usuario, mapa_vars_categoria, mapa_vars_tag):
+    def guardar_articulo(self, ventana, id_articulo, titulo, texto, nombre_usuario, nombres_categorias, nombres_tags):
         """Lógica para guardar (crear o editar) un artículo en la base de datos."""
-        if not titulo or not texto or nombre_usuario == "No hay usuarios":
-            messagebox.showwarning("Campos Requeridos", "El Título, Texto y Autor son obligatorios.", parent=ventana)
-            return
-            
+        # Valida los campos y traduce los nombres elegidos a IDs con los mapas de los gestores
+        # (se omiten las categorías y tags eliminados mientras el formulario estaba abierto).
         try:
-            # Obtiene el ObjectId del autor usando el mapa cache del gestor.
-            id_usuario = gestor_usuarios.obtener_id_por_nombre(nombre_usuario)
-            if not id_usuario:
-                messagebox.showerror("Error", "Autor no válido.", parent=ventana)
-                return
+            datos_nuevo_articulo = Servicios.preparar_articulo(titulo, texto, nombre_usuario, nombres_categorias, nombres_tags)
+        except ValueError as e:
+            messagebox.showwarning("Datos Inválidos", str(e), parent=ventana)
+            return
 
-            # Filtra y recolecta los IDs de las categorías y tags marcados.
-            ids_categorias = [ _id for var, _id in mapa_vars_categoria if var.get() == 1 ]
-            ids_tags = [ _id for var, _id in mapa_vars_tag if var.get() == 1 ]
-
-            # Crea el documento base.
-            datos_nuevo_articulo = {
-                "title": titulo,
-                "text": texto,
-                "user_id": id_usuario,
-                "categories": ids_categorias,
-                "tags": ids_tags 
-            }
-            
-            if id_articulo:
-                # Si hay ID, es una ACTUALIZACIÓN
-                datos_nuevo_articulo["last_modified"] = datetime.datetime.now()
-                self.coleccion_articulos.update_one({"_id": id_articulo}, {"$set": datos_nuevo_articulo})
-                messagebox.showinfo("Éxito", "Artículo actualizado exitosamente.", parent=ventana)
-            else:
-                # Si no hay ID, es una CREACIÓN
-                datos_nuevo_articulo["date"] = datetime.datetime.now()
-                self.coleccion_articulos.insert_one(datos_nuevo_articulo)
-                messagebox.showinfo("Éxito", "Artículo creado exitosamente.", parent=ventana)
+        def escribir_articulo():
+            # Escritura en MongoDB (se ejecuta en segundo plano). Sin ID es una CREACIÓN; con ID, una ACTUALIZACIÓN.
+            gestor_articulos.guardar_articulo(id_articulo, datos_nuevo_articulo)
+            return "Artículo actualizado exitosamente." if id_articulo else "Artículo creado exitosamente."
 
+        def al_guardar(mensaje):
+            messagebox.showinfo("Éxito", mensaje, parent=ventana)
             ventana.destroy() # Cierra la ventana modal.
             self.cargar_articulos() # Recarga la lista principal para ver los cambios.
-        except Exception as e:
-            messagebox.showerror("Error de Guardado", f"No se pudo guardar el artículo:\n{e}", parent=ventana)
+
+        self.ejecutor.enviar(
+            escribir_articulo, al_terminar=al_guardar,
+            al_error=self._mostrar_error("Error de Guardado", "No se pudo guardar el artículo:\n", parent=ventana)
+        )
     
     def eliminar_articulo(self):
         """Elimina un artículo por ID."""
@@ -432,18 +559,26 @@ class AppMenuPrincipal:
             messagebox.showwarning("Faltan Datos", "Ingrese el ID del artículo que desea eliminar.")
             return
 
-        if messagebox.askyesno("Confirmar Eliminación", f"¿Está seguro de que desea eliminar el artículo con ID: {id_articulo}?", parent=self.raiz):
+        if messagebox.askyesno("Confirmar Eliminación", f"¿Está seguro de que desea eliminar el artículo con ID: {id_articulo}?\nTambién se eliminarán sus comentarios.", parent=self.raiz):
             try:
-                # Usa ObjectId para la eliminación.
-                resultado = self.coleccion_articulos.delete_one({"_id": ObjectId(id_articulo)})
-                if resultado.deleted_count > 0:
+                id_objeto = ObjectId(id_articulo) # Usa ObjectId para la eliminación.
+            except Exception as e:
+                messagebox.showerror("ID Inválido", f"El ID proporcionado no es válido o hubo un error: {e}")
+                return
+
+            def al_eliminar(eliminados):
+                if eliminados > 0:
                     messagebox.showinfo("Éxito", "Artículo eliminado exitosamente.")
                     self.entrada_id_articulo.delete(0, 'end')
                     self.cargar_articulos() 
                 else:
                     messagebox.showerror("Error", "No se encontró el artículo con ese ID.")
-            except Exception as e:
-                messagebox.showerror("ID Inválido", f"El ID proporcionado no es válido o hubo un error: {e}")
+
+            self.ejecutor.enviar(
+                gestor_articulos.eliminar_articulo, id_objeto,
+                al_terminar=al_eliminar,
+                al_error=self._mostrar_error("Error", "Hubo un error al eliminar el artículo: ")
+            )
 
 
     # --- LÓGICA DE GESTIÓN GENÉRICA (Tags, Categorías, Usuarios) ---
@@ -466,10 +601,17 @@ class AppMenuPrincipal:
 
         ctk.CTkButton(frame_crear, text=f"Crear {titulo[:-1]}", command=lambda: self.crear_item_generico(gestor, entrada_crear.get(), clave_nombre, entrada_crear)).pack(side="left", padx=(5, 10))
 
-        # Textbox para mostrar la lista
-        caja_texto = ctk.CTkTextbox(frame, width=760, height=450, font=("Consolas", 13))
-        caja_texto.pack(pady=10, padx=10, fill="both", expand=True)
-        caja_texto.configure(state="disabled")
+        # Lista virtual (una fila por elemento); el clic copia el ID a la entrada de acciones.
+        def al_seleccionar(item):
+            entrada_id.delete(0, "end")
+            entrada_id.insert(0, str(item["_id"]))
+
+        lista = ListaVirtual(
+            frame, self.ejecutor, lambda item: self._formatear_fila_generica(item, clave_nombre),
+            al_seleccionar=al_seleccionar, clave=f"lista-{gestor.coleccion.name}",
+            al_error=self._mostrar_error("Error al Cargar", f"No se pudo cargar {gestor.coleccion.name}: "), height=450
+        )
+        lista.pack(pady=10, padx=10, fill="both", expand=True)
 
         # Controles (Editar/Eliminar)
         frame_accion = ctk.CTkFrame(frame)
@@ -493,43 +635,39 @@ class AppMenuPrincipal:
             text="Eliminar", 
             command=lambda: self.eliminar_item_generico(gestor, entrada_id.get()),
             fg_color="red"
+        ).pack(side="left", padx=5)
+
+        # Crear, actualizar o eliminar muchos elementos pegando una lista.
+        ctk.CTkButton(
+            frame_accion,
+            text="En Lote...",
+            command=lambda: self.abrir_ventana_lote(gestor.coleccion.name, gestor, clave_nombre),
+            width=90
         ).pack(side="left", padx=(5, 10))
 
         # Almacena referencias necesarias en el frame
-        frame.textbox = caja_texto
+        frame.lista = lista
         frame.clave_nombre = clave_nombre
         frame.entrada_crear = entrada_crear
         frame.entrada_id = entrada_id
         
         return frame
 
-    def cargar_lista_generica(self, gestor, caja_texto, clave_nombre):
-        """Carga y muestra la lista de entidades genéricas (Tags, Categorías, Usuarios)."""
-        gestor.cargar_mapa() # Recarga el mapa cache antes de obtener todo.
-        lista_datos = gestor.obtener_todos() # Llama al CRUD genérico LECTURA.
-        
-        caja_texto.configure(state="normal")
-        caja_texto.delete("1.0", "end")
-        
-        texto_a_mostrar = f"--- Lista de {gestor.coleccion.name.capitalize()} ---\n\n"
-        
-        if not lista_datos:
-            texto_a_mostrar += "No hay elementos."
-        else:
-            for item in lista_datos:
-                valor_clave = item.get(clave_nombre, "N/A")
-                texto_a_mostrar += f"ID: {item['_id']} | {clave_nombre.capitalize()}: {valor_clave}\n"
-                
-                if clave_nombre == "email" and item.get("name"):
-                    texto_a_mostrar += f"  Nombre: {item['name']}\n"
-                
-                if clave_nombre == "email" and item.get("password"):
-                    texto_a_mostrar += f"  Contraseña: *** (oculta)\n" # Ocultar la contraseña por seguridad.
-                
-                texto_a_mostrar += "-"*40 + "\n"
-                
-        caja_texto.insert("1.0", texto_a_mostrar)
-        caja_texto.configure(state="disabled")
+    def cargar_lista_generica(self, gestor, lista, clave_nombre):
+        """Carga la lista de entidades genéricas (Tags, Categorías, Usuarios) en su lista virtual."""
+        # Bloques en orden de _id pedidos al desplazarse; el salto con la barra usa skip sobre el índice _id.
+        lista.mostrar(FuentePaginada(
+            gestor.obtener_bloque,
+            posicionar=gestor.id_en_posicion,
+            contar=gestor.coleccion.estimated_document_count
+        ))
+
+    def _formatear_fila_generica(self, item, clave_nombre):
+        """Una línea de la lista genérica: ID, nombre/email y, para usuarios, su nombre (nunca la contraseña)."""
+        texto = f"ID: {item['_id']} | {clave_nombre.capitalize()}: {item.get(clave_nombre, 'N/A')}"
+        if clave_nombre == "email" and item.get("name"):
+            texto += f" | Nombre: {item['name']}"
+        return texto
 
     def crear_item_generico(self, gestor, valor, clave_nombre, widget_entrada):
         """Crea una nueva entidad genérica (Tag, Categoría, Usuario)."""
@@ -537,19 +675,20 @@ class AppMenuPrincipal:
             messagebox.showwarning("Faltan Datos", f"El campo {clave_nombre.capitalize()} es obligatorio.")
             return
 
-        datos = {clave_nombre: valor}
-        # Lógica especial para Usuarios (asigna nombre y contraseña por defecto).
-        if gestor.coleccion.name == "users":
-            datos = {"email": valor, "name": "Usuario Nuevo", "password": "123"} 
-            
-        id_insertado = gestor.crear_uno(datos) # Llama al CRUD genérico CREACIÓN.
-        
-        if id_insertado:
-            messagebox.showinfo("Éxito", f"{gestor.coleccion.name[:-1].capitalize()} creado exitosamente con ID: {id_insertado}")
-            widget_entrada.delete(0, 'end')
-            self.seleccionar_frame_por_nombre(gestor.coleccion.name) # Recarga la lista.
-        else:
-            messagebox.showerror("Error", f"No se pudo crear el elemento en {gestor.coleccion.name}.")
+        # Los usuarios reciben nombre y contraseña por defecto (ver Servicios.datos_entidad).
+        datos = Servicios.datos_entidad(gestor.coleccion.name, valor)
+
+        def al_crear(id_insertado):
+            if id_insertado:
+                messagebox.showinfo("Éxito", f"{gestor.coleccion.name[:-1].capitalize()} creado exitosamente con ID: {id_insertado}")
+                widget_entrada.delete(0, 'end')
+                self.seleccionar_frame_por_nombre(gestor.coleccion.name) # Recarga la lista.
+            else:
+                messagebox.showerror("Error", f"No se pudo crear el elemento en {gestor.coleccion.name}.")
+
+        # Llama al CRUD genérico CREACIÓN (en segundo plano).
+        self.ejecutor.enviar(gestor.crear_uno, datos, al_terminar=al_crear,
+                             al_error=self._mostrar_error("Error", f"No se pudo crear el elemento en {gestor.coleccion.name}: "))
 
     def actualizar_item_generico(self, gestor, id_item, nuevo_valor, clave_nombre, widget_entrada):
         """Actualiza una entidad genérica por ID."""
@@ -559,11 +698,13 @@ class AppMenuPrincipal:
 
         try:
             id_objeto = ObjectId(id_item)
-            datos_a_actualizar = {clave_nombre: nuevo_valor}
-            
-            # Llama al CRUD genérico ACTUALIZACIÓN.
-            modificado_count = gestor.actualizar_uno(id_objeto, datos_a_actualizar) 
-            
+        except Exception as e:
+            messagebox.showerror("ID Inválido", f"El ID proporcionado no es un ObjectId válido o hubo un error: {e}")
+            return
+
+        datos_a_actualizar = {clave_nombre: nuevo_valor}
+
+        def al_actualizar(modificado_count):
             if modificado_count > 0:
                 messagebox.showinfo("Éxito", f"{gestor.coleccion.name[:-1].capitalize()} actualizado exitosamente.")
                 widget_entrada.delete(0, 'end')
@@ -571,8 +712,9 @@ class AppMenuPrincipal:
             else:
                 messagebox.showwarning("Advertencia", "No se encontró el elemento o no hubo cambios.")
 
-        except Exception as e:
-            messagebox.showerror("ID Inválido", f"El ID proporcionado no es un ObjectId válido o hubo un error: {e}")
+        # Llama al CRUD genérico ACTUALIZACIÓN (en segundo plano).
+        self.ejecutor.enviar(gestor.actualizar_uno, id_objeto, datos_a_actualizar, al_terminar=al_actualizar,
+                             al_error=self._mostrar_error("Error", "Hubo un error al actualizar: "))
 
     def eliminar_item_generico(self, gestor, id_item):
         """Elimina una entidad genérica por ID."""
@@ -582,9 +724,12 @@ class AppMenuPrincipal:
 
         if messagebox.askyesno("Confirmar Eliminación", f"¿Está seguro de eliminar el elemento con ID: {id_item} de {gestor.coleccion.name}?", parent=self.raiz):
             try:
-                # Llama al CRUD genérico ELIMINACIÓN.
-                resultado = gestor.eliminar_uno(ObjectId(id_item))
-                
+                id_objeto = ObjectId(id_item)
+            except Exception as e:
+                messagebox.showerror("ID Inválido", f"El ID proporcionado no es un ObjectId válido o hubo un error: {e}")
+                return
+
+            def al_eliminar(resultado):
                 if resultado > 0:
                     messagebox.showinfo("Éxito", f"Elemento de {gestor.coleccion.name} eliminado exitosamente.")
                     frame = self.frames[gestor.coleccion.name]
@@ -592,8 +737,113 @@ class AppMenuPrincipal:
                     self.seleccionar_frame_por_nombre(gestor.coleccion.name) # Recarga la lista.
                 else:
                     messagebox.showerror("Error", "No se encontró el elemento con ese ID.")
-            except Exception as e:
-                messagebox.showerror("ID Inválido", f"El ID proporcionado no es un ObjectId válido o hubo un error: {e}")
+
+            # Llama al CRUD genérico ELIMINACIÓN (en segundo plano).
+            self.ejecutor.enviar(gestor.eliminar_uno, id_objeto, al_terminar=al_eliminar,
+                                 al_error=self._mostrar_error("Error", "Hubo un error al eliminar: "))
+
+
+    # --- OPERACIONES EN LOTE (pegar una lista de IDs o valores) ---
+
+    @staticmethod
+    def _leer_ids(texto):
+        """Extrae los ObjectIds (24 caracteres hexadecimales) de un texto pegado, en orden y sin repetir."""
+        # Acepta un ID por línea, separados por comas o las líneas copiadas de la lista ("ID: ... | Name: ...").
+        return [ObjectId(valor) for valor in dict.fromkeys(re.findall(r"\b[0-9a-fA-F]{24}\b", texto))]
+
+    def abrir_ventana_lote(self, nombre_coleccion, gestor=None, clave_nombre="name"):
+        """Abre la ventana de operaciones en lote. Sin 'gestor' (artículos) solo se ofrece eliminar."""
+        ventana = ctk.CTkToplevel(self.raiz)
+        ventana.title(f"Operaciones en Lote - {nombre_coleccion.capitalize()}")
+        ventana.geometry("640x560")
+        ventana.grab_set()
+
+        instrucciones = "Eliminar: pegue los IDs (uno por línea; también sirven las líneas copiadas de la lista)."
+        if gestor is not None:
+            instrucciones += (f"\nCrear: un {clave_nombre} por línea."
+                              f"\nActualizar: una línea por elemento con 'ID nuevo_{clave_nombre}'.")
+        ctk.CTkLabel(ventana, text=instrucciones, justify="left").pack(padx=10, pady=(10, 5), anchor="w")
+
+        caja_entrada = ctk.CTkTextbox(ventana, width=600, height=260, font=("Consolas", 12))
+        caja_entrada.pack(padx=10, pady=5, fill="both", expand=True)
+
+        frame_botones = ctk.CTkFrame(ventana, fg_color="transparent")
+        frame_botones.pack(padx=10, pady=5, fill="x")
+
+        caja_resultado = ctk.CTkTextbox(ventana, width=600, height=140, font=("Consolas", 12))
+        caja_resultado.pack(padx=10, pady=(5, 10), fill="both")
+        caja_resultado.configure(state="disabled")
+
+        def mostrar_resultado(texto):
+            caja_resultado.configure(state="normal")
+            caja_resultado.delete("1.0", "end")
+            caja_resultado.insert("1.0", texto)
+            caja_resultado.configure(state="disabled")
+
+        def al_terminar(resultado, accion):
+            # Resumen: cuántos se procesaron y los errores por elemento (los primeros 50).
+            total = resultado.get("eliminados", resultado.get("modificados"))
+            if total is None:
+                total = sum(1 for id_objeto in resultado["ids"] if id_objeto)
+            lineas = [f"{total} elementos {accion}. Errores: {len(resultado['errores'])}"]
+            lineas += [f"  #{error['indice'] + 1} ({error['id']}): {error['error']}" for error in resultado["errores"][:50]]
+            if len(resultado["errores"]) > 50:
+                lineas.append(f"  ... y {len(resultado['errores']) - 50} más.")
+            mostrar_resultado("\n".join(lineas))
+            # Recarga la lista de la pestaña para reflejar los cambios.
+            if gestor is None:
+                self.cargar_articulos()
+            else:
+                self.seleccionar_frame_por_nombre(nombre_coleccion)
+
+        def enviar(funcion, argumento, accion):
+            mostrar_resultado("Procesando...")
+            self.ejecutor.enviar(funcion, argumento, al_terminar=lambda resultado: al_terminar(resultado, accion),
+                                 al_error=self._mostrar_error("Error", "La operación en lote falló: ", parent=ventana))
+
+        def eliminar_todos():
+            ids = self._leer_ids(caja_entrada.get("1.0", "end"))
+            if not ids:
+                messagebox.showwarning("Faltan Datos", "No se encontró ningún ID válido en el texto.", parent=ventana)
+                return
+            if not messagebox.askyesno("Confirmar Eliminación", f"¿Está seguro de eliminar {len(ids)} elementos de {nombre_coleccion}?", parent=ventana):
+                return
+            funcion = gestor_articulos.eliminar_articulos if gestor is None else gestor.eliminar_muchos
+            enviar(funcion, ids, "eliminados")
+
+        ctk.CTkButton(frame_botones, text="Eliminar Todos", command=eliminar_todos, fg_color="red").pack(side="right", padx=5)
+        if gestor is None:
+            return
+
+        def crear_todos():
+            valores = [linea.strip() for linea in caja_entrada.get("1.0", "end").splitlines() if linea.strip()]
+            if not valores:
+                messagebox.showwarning("Faltan Datos", f"Escriba un {clave_nombre} por línea.", parent=ventana)
+                return
+            # Igual que crear_item_generico: los usuarios reciben nombre y contraseña por defecto.
+            lista_datos = [Servicios.datos_entidad(nombre_coleccion, valor) for valor in valores]
+            enviar(gestor.crear_muchos, lista_datos, "creados")
+
+        def actualizar_todos():
+            cambios, invalidas = [], []
+            for numero, linea in enumerate(caja_entrada.get("1.0", "end").splitlines(), start=1):
+                partes = linea.split(maxsplit=1)
+                if not partes:
+                    continue
+                try:
+                    cambios.append((ObjectId(partes[0]), {clave_nombre: partes[1].strip()}))
+                except Exception:
+                    invalidas.append(str(numero)) # ID inválido o falta el nuevo valor.
+            if invalidas:
+                messagebox.showwarning("Líneas Inválidas", f"Revise las líneas: {', '.join(invalidas[:20])}", parent=ventana)
+                return
+            if not cambios:
+                messagebox.showwarning("Faltan Datos", f"Escriba una línea 'ID nuevo_{clave_nombre}' por elemento.", parent=ventana)
+                return
+            enviar(gestor.actualizar_muchos, cambios, "actualizados")
+
+        ctk.CTkButton(frame_botones, text="Actualizar Todos", command=actualizar_todos, fg_color="orange").pack(side="right", padx=5)
+        ctk.CTkButton(frame_botones, text="Crear Todos", command=crear_todos).pack(side="right", padx=5)
 
 
 # --- PUNTO DE ENTRADA ---
@@ -604,4 +854,5 @@ if __name__ == "__main__":
     
     raiz_app = ctk.CTk()
     logica_app = AppMenuPrincipal(raiz_app) 
+    avisar_ventana_lista(raiz_app) # Solo con BLOG_MEDIR_ARRANQUE (benchmark de arranque).
     raiz_app.mainloop() # Inicia el bucle de la GUI.
\ No newline at end of file
@@ -0,0 +1,308 @@
+import atexit
+import contextvars
+import datetime
+import functools
+import json
+import os
+import queue
+import threading
+import time
+
+from bson import json_util
+from pymongo import monitoring
+
+# --- Configuración del Monitoreo ---
+UMBRAL_LENTO_MS = float(os.environ.get("BLOG_UMBRAL_LENTO_MS", 100)) # Comandos más lentos que esto van al log.
+LOG_LENTAS = os.environ.get("BLOG_LOG_LENTAS", "consultas_lentas.log") # Un JSON por línea.
+ARCHIVO_METRICAS = os.environ.get("BLOG_METRICAS_ARCHIVO") # ".prom" = texto Prometheus; otro = JSON.
+INTERVALO_EXPORTACION_S = float(os.environ.get("BLOG_METRICAS_INTERVALO_S", 30))
+
+# Límites superiores (ms) de los buckets de los histogramas de latencia.
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+# Comandos a los que se les puede pedir explain() para el log de consultas lentas.
+COMANDOS_EXPLICABLES = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+SIN_ETIQUETA = "sin_etiqueta" # Comandos emitidos fuera de un método instrumentado.
+# Campos de un comando que llevan datos del usuario (filtros, documentos, cambios): en el log solo quedan sus claves.
+CAMPOS_CON_DATOS = {"filter", "query", "q", "pipeline", "updates", "u", "update", "deletes", "documents", "let"}
+
+# Etiqueta "Gestor.metodo" de la operación en curso, por hilo (la leen los eventos de pymongo).
+_contexto = threading.local()
+# Lo mismo para los gestores asíncronos: muchas tareas comparten el hilo del event loop, así que la etiqueta
+# va en una variable de contexto (cada tarea de asyncio tiene su propia copia).
+_etiqueta_tarea = contextvars.ContextVar("etiqueta_tarea", default=None)
+
+
+def operacion_actual():
+    """Etiqueta de la operación instrumentada que se está ejecutando en esta tarea (o en este hilo)."""
+    return _etiqueta_tarea.get() or getattr(_contexto, "etiqueta", None) or SIN_ETIQUETA
+
+
+def instrumentar(funcion):
+    """
+    Decorador para métodos de los gestores: etiqueta los comandos de MongoDB que emite el método con
+    "Clase.metodo" y mide su duración total. Si un método instrumentado llama a otro, manda el externo.
+    """
+    @functools.wraps(funcion)
+    def envoltura(self, *args, **kwargs):
+        if getattr(_contexto, "etiqueta", None):
+            return funcion(self, *args, **kwargs)
+        _contexto.etiqueta = f"{type(self).__name__}.{funcion.__name__}"
+        inicio = time.perf_counter()
+        try:
+            return funcion(self, *args, **kwargs)
+        finally:
+            monitor_comandos.registrar_metodo(_contexto.etiqueta, (time.perf_counter() - inicio) * 1000)
+            _contexto.etiqueta = None
+    return envoltura
+
+
+def instrumentar_async(funcion):
+    """Como instrumentar, para los métodos 'async def' de los gestores asíncronos (LogicaAsync.py)."""
+    @functools.wraps(funcion)
+    async def envoltura(self, *args, **kwargs):
+        if _etiqueta_tarea.get():
+            return await funcion(self, *args, **kwargs)
+        etiqueta = f"{type(self).__name__}.{funcion.__name__}"
+        marca = _etiqueta_tarea.set(etiqueta)
+        inicio = time.perf_counter()
+        try:
+            return await funcion(self, *args, **kwargs)
+        finally:
+            monitor_comandos.registrar_metodo(etiqueta, (time.perf_counter() - inicio) * 1000)
+            _etiqueta_tarea.reset(marca)
+    return envoltura
+
+
+class Histograma:
+    """Histograma acumulado de latencias en ms (mismo modelo que un histograma de Prometheus)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1) # El último es +Inf.
+        self.cantidad = 0
+        self.suma_ms = 0.0
+        self.maximo_ms = 0.0
+
+    def registrar(self, ms):
+        indice = next((i for i, limite in enumerate(BUCKETS_MS) if ms <= limite), len(BUCKETS_MS))
+        self.buckets[indice] += 1
+        self.cantidad += 1
+        self.suma_ms += ms
+        self.maximo_ms = max(self.maximo_ms, ms)
+
+    def como_dict(self):
+        return {
+            "cantidad": self.cantidad,
+            "promedio_ms": round(self.suma_ms / self.cantidad, 3) if self.cantidad else 0,
+            "maximo_ms": round(self.maximo_ms, 3),
+            "suma_ms": round(self.suma_ms, 3),
+            "buckets": dict(zip([str(limite) for limite in BUCKETS_MS] + ["+Inf"], self.buckets)),
+        }
+
+
+def _buscar_clave(objeto, clave):
+    """Busca recursivamente la primera aparición de 'clave' en un documento de explain()."""
+    if isinstance(objeto, dict):
+        if clave in objeto:
+            return objeto[clave]
+        objeto = list(objeto.values())
+    if isinstance(objeto, list):
+        for valor in objeto:
+            encontrado = _buscar_clave(valor, clave)
+            if encontrado is not None:
+                return encontrado
+    return None
+
+
+def ocultar_valores(valor):
+    """Reemplaza cada valor por "?" conservando la forma (claves y operadores): nunca se escriben datos, ej. contraseñas."""
+    if isinstance(valor, dict):
+        return {clave: ocultar_valores(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [ocultar_valores(v) for v in valor]
+    return "?"
+
+def ocultar_datos(comando):
+    """Copia del comando con los valores de sus filtros, pipelines y documentos ocultos (ver CAMPOS_CON_DATOS)."""
+    return {clave: ocultar_valores(valor) if clave in CAMPOS_CON_DATOS else valor for clave, valor in comando.items()}
+
+
+def resumir_plan(explicacion):
+    """Resume el plan ganador de explain() como "LIMIT > FETCH > IXSCAN(indice)"."""
+    plan = _buscar_clave(_buscar_clave(explicacion, "queryPlanner") or {}, "winningPlan")
+    etapas = []
+    while plan:
+        plan = plan.get("queryPlan", plan) # Planes del motor SBE (MongoDB 7+).
+        etapa = plan.get("stage", "?")
+        if plan.get("indexName"):
+            etapa += f"({plan['indexName']})"
+        etapas.append(etapa)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " > ".join(etapas) or "sin plan"
+
+
+class MonitorComandos(monitoring.CommandListener):
+    """
+    Escucha los comandos que pymongo envía al servidor: arma histogramas de latencia por operación
+    ("Gestor.metodo") y comando, y registra las consultas lentas con el resumen de su plan.
+    """
+
+    def __init__(self, umbral_lento_ms=UMBRAL_LENTO_MS, ruta_log_lentas=LOG_LENTAS):
+        self.umbral_lento_ms = umbral_lento_ms
+        self.ruta_log_lentas = ruta_log_lentas
+        self.cliente = None # MongoClient usado para explain(); lo asigna Conexion.obtener_cliente.
+        self.candado = threading.Lock()
+        self.en_curso = {} # { (request_id, connection_id): (operacion, comando) }
+        self.comandos = {} # { (operacion, comando): Histograma }
+        self.metodos = {} # { operacion: Histograma } con la duración total del método.
+        self.fallidos = {} # { (operacion, comando): cantidad }
+        self.consultas_lentas = 0
+        self.contadores_extra = {} # { nombre: funcion() -> {contador: valor} } (ej: el pool de conexiones).
+        self.cola_lentas = queue.Queue() # Consultas lentas pendientes de explain() y del log.
+        self.hilo_lentas = None
+
+    # --- Eventos de pymongo.monitoring.CommandListener ---
+    def started(self, event):
+        with self.candado:
+            self.en_curso[(event.request_id, event.connection_id)] = (operacion_actual(), event.command)
+
+    def succeeded(self, event):
+        self._terminar(event, fallo=False)
+
+    def failed(self, event):
+        self._terminar(event, fallo=True)
+
+    def _terminar(self, event, fallo):
+        ms = event.duration_micros / 1000
+        with self.candado:
+            operacion, comando = self.en_curso.pop((event.request_id, event.connection_id), (SIN_ETIQUETA, {}))
+            clave = (operacion, event.command_name)
+            self.comandos.setdefault(clave, Histograma()).registrar(ms)
+            if fallo:
+                self.fallidos[clave] = self.fallidos.get(clave, 0) + 1
+            # Los getMore con maxTimeMS esperan a propósito (change streams de GestorEntidad._sincronizar).
+            espera = event.command_name == "getMore" and "maxTimeMS" in comando
+            lenta = ms >= self.umbral_lento_ms and operacion != "Monitoreo.explain" and not espera
+            if lenta:
+                self.consultas_lentas += 1
+        if lenta:
+            # explain() se pide en otro hilo: los eventos corren en el hilo que hizo la consulta.
+            self.cola_lentas.put((datetime.datetime.now(), operacion, event.command_name, event.database_name, comando, ms))
+            self._asegurar_hilo_lentas()
+
+    def registrar_metodo(self, operacion, ms):
+        """Registra la duración total de un método instrumentado (consultas + trabajo en Python)."""
+        with self.candado:
+            self.metodos.setdefault(operacion, Histograma()).registrar(ms)
+
+    def agregar_contadores(self, nombre, funcion):
+        """Incluye en las exportaciones los contadores que retorna funcion() (ej: las métricas del pool)."""
+        self.contadores_extra[nombre] = funcion
+
+    # --- Log de Consultas Lentas ---
+    def _asegurar_hilo_lentas(self):
+        with self.candado:
+            if self.hilo_lentas is None:
+                self.hilo_lentas = threading.Thread(target=self._procesar_lentas, daemon=True, name="consultas-lentas")
+                self.hilo_lentas.start()
+
+    def _procesar_lentas(self):
+        """Hilo que agrega el resumen de explain() a cada consulta lenta y la escribe en el log."""
+        _contexto.etiqueta = "Monitoreo.explain" # Sus propios comandos no cuentan como lentos.
+        while True:
+            fecha, operacion, nombre_comando, base, comando, ms = self.cola_lentas.get()
+            # Quita los campos de sesión/cluster que agrega el driver ($db, lsid, $clusterTime...).
+            comando = {k: v for k, v in comando.items() if not k.startswith("$") and k != "lsid"}
+            plan = None
+            if self.cliente is not None and nombre_comando in COMANDOS_EXPLICABLES:
+                try:
+                    plan = resumir_plan(self.cliente[base].command("explain", comando, verbosity="queryPlanner"))
+                except Exception as e:
+                    plan = f"explain falló: {e}"
+            registro = {
+                "fecha": fecha.isoformat(), "operacion": operacion, "comando": nombre_comando,
+                "coleccion": comando.get(nombre_comando), "ms": round(ms, 1), "plan": plan,
+                "consulta": json_util.dumps(ocultar_datos(comando))[:2000], # Solo la forma: sin valores del usuario.
+            }
+            try:
+                with open(self.ruta_log_lentas, "a", encoding="utf-8") as archivo:
+                    archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"No se pudo escribir el log de consultas lentas: {e}")
+
+    # --- Exportación ---
+    def instantanea(self):
+        """Retorna todas las métricas como un diccionario serializable a JSON."""
+        with self.candado:
+            datos = {
+                "fecha": datetime.datetime.now().isoformat(),
+                "umbral_lento_ms": self.umbral_lento_ms,
+                "consultas_lentas": self.consultas_lentas,
+                "metodos": {operacion: h.como_dict() for operacion, h in sorted(self.metodos.items())},
+                "comandos": [
+                    dict(operacion=operacion, comando=comando, fallidos=self.fallidos.get((operacion, comando), 0), **h.como_dict())
+                    for (operacion, comando), h in sorted(self.comandos.items())
+                ],
+            }
+        for nombre, funcion in self.contadores_extra.items():
+            datos[nombre] = funcion()
+        return datos
+
+    def texto_prometheus(self):
+        """Retorna las métricas en el formato de texto de Prometheus."""
+        datos = self.instantanea()
+        lineas = []
+
+        def histograma(metrica, etiquetas, h):
+            acumulado = 0
+            for limite, cantidad in h["buckets"].items():
+                acumulado += cantidad
+                lineas.append(f'{metrica}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f"{metrica}_sum{{{etiquetas}}} {h['suma_ms']}")
+            lineas.append(f"{metrica}_count{{{etiquetas}}} {h['cantidad']}")
+
+        lineas.append("# TYPE blog_metodo_ms histogram")
+        for operacion, h in datos["metodos"].items():
+            histograma("blog_metodo_ms", f'operacion="{operacion}"', h)
+        lineas.append("# TYPE blog_comando_ms histogram")
+        for h in datos["comandos"]:
+            histograma("blog_comando_ms", f'operacion="{h["operacion"]}",comando="{h["comando"]}"', h)
+        lineas.append("# TYPE blog_comandos_fallidos_total counter")
+        for h in datos["comandos"]:
+            lineas.append(f'blog_comandos_fallidos_total{{operacion="{h["operacion"]}",comando="{h["comando"]}"}} {h["fallidos"]}')
+        lineas.append("# TYPE blog_consultas_lentas_total counter")
+        lineas.append(f"blog_consultas_lentas_total {datos['consultas_lentas']}")
+        for nombre in self.contadores_extra:
+            for contador, valor in datos[nombre].items():
+                lineas.append(f"blog_{nombre}_{contador} {valor}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta):
+        """Escribe las métricas en 'ruta' (texto Prometheus si termina en .prom; si no, JSON)."""
+        contenido = self.texto_prometheus() if ruta.endswith(".prom") else json.dumps(self.instantanea(), indent=2, ensure_ascii=False)
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta) # Quien lea el archivo nunca ve uno a medio escribir.
+
+
+# --- Instancia Global ---
+monitor_comandos = MonitorComandos()
+_exportacion_iniciada = False
+
+def iniciar_exportacion(ruta=ARCHIVO_METRICAS, intervalo=INTERVALO_EXPORTACION_S):
+    """Exporta las métricas cada 'intervalo' segundos y al salir (solo si hay ruta configurada)."""
+    global _exportacion_iniciada
+    if not ruta or _exportacion_iniciada:
+        return
+    _exportacion_iniciada = True
+
+    def exportar_periodicamente():
+        while True:
+            time.sleep(intervalo)
+            try:
+                monitor_comandos.exportar(ruta)
+            except OSError as e:
+                print(f"No se pudieron exportar las métricas a {ruta}: {e}")
+
+    threading.Thread(target=exportar_periodicamente, daemon=True, name="exportar-metricas").start()
+    atexit.register(monitor_comandos.exportar, ruta)
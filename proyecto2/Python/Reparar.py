@@ -0,0 +1,18 @@
+import argparse
+import time
+
+# Importaciones de nuestros módulos
+from Logica import obtener_gestor
+
+# --- Reparación del Modelo de Lectura ---
+# Recalcula 'author_email', 'category_names', 'tag_names' y 'comment_count' de los artículos y corrige
+# los que no coinciden (datos anteriores al modelo de lectura o escrituras hechas fuera de la aplicación).
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repara la proyección desnormalizada de los artículos.")
+    parser.add_argument("--lote", type=int, default=1000, help="Artículos revisados por cada bulk_write.")
+    argumentos = parser.parse_args()
+
+    inicio = time.perf_counter()
+    corregidos = obtener_gestor("gestor_articulos").reparar_proyeccion(tamano_lote=argumentos.lote)
+    print(f"{corregidos} artículos corregidos en {time.perf_counter() - inicio:.1f} s.")
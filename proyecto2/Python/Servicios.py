@@ -0,0 +1,221 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import OperationFailure
+
+# Importaciones de nuestros módulos
+from Logica import obtener_gestor, TAMANO_PAGINA, TAMANO_PAGINA_COMENTARIOS
+
+# --- Servicios del Blog ---
+# Operaciones de artículos, comentarios y entidades simples independientes de la interfaz: las usan el Menú
+# (customtkinter) y ServidorAPI.py (HTTP/JSON). Los errores se informan con excepciones estándar:
+# ValueError para datos inválidos y LookupError para lo que no existe (la API los traduce a 400 y 404).
+
+MAX_TAMANO_PAGINA = 100 # Mayor página que puede pedir un cliente.
+CAMPOS_PRIVADOS = ("password",) # Nunca salen de los servicios.
+CODIGOS_BUSQUEDA_INVALIDA = (2, 51091) # BadValue y "Regular expression is invalid" del servidor.
+
+# Colecciones de las pestañas genéricas: { coleccion: (gestor, clave_nombre) }.
+ENTIDADES = {
+    "users": ("gestor_usuarios", "email"),
+    "categories": ("gestor_categorias", "name"),
+    "tags": ("gestor_etiquetas", "name"),
+}
+
+
+def leer_id(texto):
+    """Convierte el texto en ObjectId. Lanza ValueError si no es un ObjectId válido."""
+    try:
+        return texto if isinstance(texto, ObjectId) else ObjectId(texto)
+    except (InvalidId, TypeError) as e:
+        raise ValueError(f"El ID '{texto}' no es un ObjectId válido.") from e
+
+
+def leer_tamano(tamano, defecto):
+    """Tamaño de página pedido por un cliente, entre 1 y MAX_TAMANO_PAGINA."""
+    if tamano in (None, ""):
+        return defecto
+    try:
+        tamano = int(tamano)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Tamaño de página inválido: '{tamano}'.") from e
+    if not 1 <= tamano <= MAX_TAMANO_PAGINA:
+        raise ValueError(f"El tamaño de página debe estar entre 1 y {MAX_TAMANO_PAGINA}.")
+    return tamano
+
+
+def sin_privados(documento):
+    """Copia del documento sin los campos privados (ej: la contraseña de un usuario)."""
+    return {campo: valor for campo, valor in documento.items() if campo not in CAMPOS_PRIVADOS}
+
+
+# --- Artículos ---
+
+def buscar(termino_busqueda, consulta, *args, **opciones):
+    """
+    Ejecuta la consulta del gestor de artículos con el término limpio. Si el servidor rechaza la búsqueda
+    (ej: una expresión que no acepta) lanza ValueError: es un error del cliente, no del servidor.
+    """
+    try:
+        return consulta(termino_busqueda.strip(), *args, **opciones)
+    except OperationFailure as e:
+        if e.code not in CODIGOS_BUSQUEDA_INVALIDA:
+            raise
+        raise ValueError(f"Búsqueda inválida: '{termino_busqueda}'.") from e
+
+def listar_articulos(termino_busqueda="", cursor=None, tamano=TAMANO_PAGINA, hacia_atras=False, modo=None):
+    """
+    Página de artículos {"articulos", "next_cursor", "prev_cursor"} (ver GestorArticulo.obtener_pagina).
+    modo="parcial" es la búsqueda mientras se escribe (coincidencias dentro de palabras a medio escribir).
+    """
+    try:
+        return buscar(termino_busqueda, obtener_gestor("gestor_articulos").obtener_pagina, cursor or None, tamano,
+                      hacia_atras, modo=modo)
+    except (InvalidId, IndexError) as e:
+        raise ValueError(f"Cursor inválido: '{cursor}'.") from e # Los cursores mal formados son errores del cliente.
+
+def cursor_de_articulos(termino_busqueda, desplazamiento, modo=None):
+    """Cursor de listar_articulos (mismo modo) que empieza en la posición 'desplazamiento' (salto de la lista virtual)."""
+    return buscar(termino_busqueda, obtener_gestor("gestor_articulos").cursor_en_posicion, desplazamiento, modo=modo)
+
+def contar_articulos(termino_busqueda=""):
+    """Total de artículos del listado, o None si hay búsqueda."""
+    return buscar(termino_busqueda, obtener_gestor("gestor_articulos").contar)
+
+def recorrer_articulos(termino_busqueda=""):
+    """Todos los artículos que coinciden con la búsqueda, leídos de a lotes del cursor (para listas largas)."""
+    return buscar(termino_busqueda, obtener_gestor("gestor_articulos").buscar_articulos)
+
+def obtener_articulo(id_articulo):
+    """Documento del artículo. Lanza LookupError si no existe."""
+    articulo = obtener_gestor("gestor_articulos").obtener_por_id(leer_id(id_articulo))
+    if articulo is None:
+        raise LookupError(f"Artículo con ID '{id_articulo}' no existe.")
+    return articulo
+
+def preparar_articulo(titulo, texto, nombre_usuario, nombres_categorias=(), nombres_tags=()):
+    """
+    Valida los campos del formulario y traduce los nombres a _id con los mapas de los gestores.
+    Las categorías y tags que ya no existen se omiten. Lanza ValueError si falta algo o el autor no existe.
+    """
+    if not titulo or not texto or not nombre_usuario:
+        raise ValueError("El Título, Texto y Autor son obligatorios.")
+    id_usuario = obtener_gestor("gestor_usuarios").obtener_id_por_nombre(nombre_usuario)
+    if not id_usuario:
+        raise ValueError("Autor no válido.")
+    categorias, etiquetas = obtener_gestor("gestor_categorias"), obtener_gestor("gestor_etiquetas")
+    return {
+        "title": titulo,
+        "text": texto,
+        "user_id": id_usuario,
+        "categories": [i for i in map(categorias.obtener_id_por_nombre, nombres_categorias) if i is not None],
+        "tags": [i for i in map(etiquetas.obtener_id_por_nombre, nombres_tags) if i is not None],
+    }
+
+def guardar_articulo(id_articulo, datos):
+    """Crea (id_articulo=None) o actualiza un artículo con los datos de preparar_articulo. Retorna su _id."""
+    if id_articulo is not None:
+        obtener_articulo(id_articulo) # LookupError si no existe (update_one no lo crearía).
+        id_articulo = leer_id(id_articulo)
+    return obtener_gestor("gestor_articulos").guardar_articulo(id_articulo, datos)
+
+def eliminar_articulo(id_articulo):
+    """Elimina el artículo y sus comentarios. Lanza LookupError si no existe."""
+    if not obtener_gestor("gestor_articulos").eliminar_articulo(leer_id(id_articulo)):
+        raise LookupError(f"Artículo con ID '{id_articulo}' no existe.")
+
+
+# --- Comentarios ---
+
+def listar_comentarios(id_articulo, cursor=None, tamano=TAMANO_PAGINA_COMENTARIOS):
+    """Página de comentarios {"comentarios", "next_cursor"} de un artículo, los más recientes primero."""
+    try:
+        return obtener_gestor("gestor_comentarios").obtener_pagina_comentarios(leer_id(id_articulo), cursor or None, tamano)
+    except (InvalidId, IndexError) as e:
+        raise ValueError(f"Cursor inválido: '{cursor}'.") from e
+
+def recorrer_comentarios(id_articulo):
+    """Todos los comentarios de un artículo con su autor, de a lotes (hilos largos)."""
+    return obtener_gestor("gestor_comentarios").iterar_comentarios(leer_id(id_articulo))
+
+def crear_comentario(id_articulo, id_usuario, texto):
+    """Agrega un comentario del usuario al artículo. Retorna su _id."""
+    if not texto or not texto.strip():
+        raise ValueError("El comentario no puede estar vacío.")
+    articulo = obtener_articulo(id_articulo)
+    id_comentario = obtener_gestor("gestor_comentarios").crear_comentario(articulo["_id"], leer_id(id_usuario), texto)
+    if id_comentario is None:
+        raise ValueError("No se pudo agregar el comentario.")
+    return id_comentario
+
+
+# --- Entidades Simples (Usuarios, Categorías, Tags) ---
+
+def gestor_de(coleccion):
+    """Retorna (gestor, clave_nombre) de una colección de ENTIDADES. Lanza LookupError si no es una de ellas."""
+    if coleccion not in ENTIDADES:
+        raise LookupError(f"Colección desconocida: '{coleccion}'.")
+    nombre_gestor, clave_nombre = ENTIDADES[coleccion]
+    return obtener_gestor(nombre_gestor), clave_nombre
+
+def listar_entidades(coleccion, despues_de=None, cantidad=TAMANO_PAGINA):
+    """Bloque {"documentos", "siguiente"} en orden de _id a partir de 'despues_de' (paginación por llaves)."""
+    gestor, _ = gestor_de(coleccion)
+    documentos, siguiente = gestor.obtener_bloque(leer_id(despues_de) if despues_de else None, cantidad)
+    return {"documentos": [sin_privados(documento) for documento in documentos], "siguiente": siguiente}
+
+def buscar_nombres(coleccion, prefijo, limite=20):
+    """Nombres que empiezan con 'prefijo' o, si no hay ninguno, los más parecidos (ej: con errores de tipeo)."""
+    gestor, _ = gestor_de(coleccion)
+    return gestor.buscar_por_prefijo(prefijo, limite) or gestor.sugerir_nombres(prefijo, min(limite, 5))
+
+def validar_valor(clave_nombre, valor):
+    """Lanza ValueError si el nombre (o email) de una entidad no es un texto con contenido."""
+    if valor is not None and not isinstance(valor, str):
+        raise ValueError(f"El campo {clave_nombre.capitalize()} debe ser un texto.")
+    if not valor or not valor.strip():
+        raise ValueError(f"El campo {clave_nombre.capitalize()} es obligatorio.")
+
+def datos_entidad(coleccion, valor):
+    """Documento nuevo de una entidad a partir de su nombre (o email); los usuarios llevan nombre y contraseña por defecto."""
+    validar_valor(ENTIDADES.get(coleccion, (None, "name"))[1], valor)
+    if coleccion == "users":
+        return {"email": valor, "name": "Usuario Nuevo", "password": "123"}
+    return {gestor_de(coleccion)[1]: valor}
+
+def crear_entidad(coleccion, valor):
+    """Crea la entidad. Retorna su _id (ValueError si no se pudo, ej: el nombre ya existe)."""
+    gestor, _ = gestor_de(coleccion)
+    id_insertado = gestor.crear_uno(datos_entidad(coleccion, valor))
+    if id_insertado is None:
+        raise ValueError(f"No se pudo crear el elemento en {coleccion}.")
+    return id_insertado
+
+def actualizar_entidad(coleccion, id_objeto, valor):
+    """Renombra la entidad. Lanza LookupError si no existe y ValueError si otra ya usa ese nombre."""
+    gestor, clave_nombre = gestor_de(coleccion)
+    validar_valor(clave_nombre, valor)
+    id_objeto = leer_id(id_objeto)
+    nombre_actual = gestor.obtener_nombres_por_ids([id_objeto]).get(id_objeto)
+    if nombre_actual is None:
+        raise LookupError(f"No se encontró el elemento con ID '{id_objeto}' en {coleccion}.")
+    if nombre_actual == valor:
+        return
+    if gestor.obtener_id_por_nombre(valor) not in (None, id_objeto):
+        raise ValueError(f"Ya existe un elemento con {clave_nombre} '{valor}' en {coleccion}.")
+    # actualizar_uno retorna 0 si el índice único rechazó el nombre (ej: lo tomó otro proceso recién).
+    if not gestor.actualizar_uno(id_objeto, {clave_nombre: valor}):
+        raise ValueError(f"No se pudo renombrar el elemento en {coleccion} (¿el {clave_nombre} ya existe?).")
+
+def eliminar_entidad(coleccion, id_objeto):
+    """Elimina la entidad (y en cascada sus referencias). Lanza LookupError si no existe."""
+    gestor, _ = gestor_de(coleccion)
+    if not gestor.eliminar_uno(leer_id(id_objeto)):
+        raise LookupError(f"No se encontró el elemento con ID '{id_objeto}' en {coleccion}.")
+
+
+# --- Usuarios ---
+
+def autenticar(email, password):
+    """Documento del usuario (sin la contraseña) si el email y la contraseña coinciden; si no, None."""
+    usuario = obtener_gestor("gestor_usuarios").autenticar(email, password)
+    return sin_privados(usuario) if usuario else None
@@ -0,0 +1,317 @@
+import argparse
+import base64
+import datetime
+import hashlib
+import json
+import os
+import re
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bson.objectid import ObjectId
+
+# Importaciones de nuestros módulos
+import Servicios
+from Logica import obtener_gestor, TAMANO_PAGINA, TAMANO_PAGINA_COMENTARIOS, MODO_PARCIAL
+from Monitoreo import monitor_comandos
+
+# --- API HTTP/JSON del Blog ---
+# Expone Servicios.py sin interfaz gráfica. Un hilo por conexión (keep-alive), todos sobre el MongoClient
+# compartido del proceso: el pool (BLOG_POOL_MAXIMO) limita cuántas consultas van a la base a la vez.
+# Los GET llevan ETag (If-None-Match -> 304) y las listas largas se envían como NDJSON por partes (chunked).
+HOST = os.environ.get("BLOG_API_HOST", "127.0.0.1")
+PUERTO = int(os.environ.get("BLOG_API_PUERTO", 8080))
+MAX_CUERPO_BYTES = int(os.environ.get("BLOG_API_MAX_CUERPO", 1024 * 1024)) # Cuerpo máximo de un POST/PUT.
+COLA_CONEXIONES = int(os.environ.get("BLOG_API_COLA", 256)) # Conexiones pendientes de aceptar (listen backlog).
+LOG_PETICIONES = os.environ.get("BLOG_API_LOG", "0") == "1" # Una línea por petición en stderr.
+TAMANO_PARTE = 64 * 1024 # Bytes de NDJSON acumulados antes de enviar una parte del streaming.
+
+COLECCIONES = "|".join(Servicios.ENTIDADES) # users|categories|tags
+ID = r"(?P<id_objeto>[0-9a-fA-F]{24})"
+
+
+def a_json(valor):
+    """Tipos de BSON que json no conoce: ObjectId como texto y fechas en ISO 8601."""
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+def codificar(datos):
+    """Serializa la respuesta en JSON compacto (UTF-8)."""
+    return json.dumps(datos, default=a_json, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    """Resuelve cada petición con la tabla RUTAS y traduce las excepciones de Servicios a códigos HTTP."""
+
+    protocol_version = "HTTP/1.1" # Keep-alive: un cliente reutiliza su conexión entre peticiones.
+    server_version = "BlogAPI/1.0"
+
+    # --- Rutas: (método, patrón, función, requiere_usuario) ---
+    RUTAS = [
+        ("GET", r"/api/salud", "salud", False),
+        ("GET", r"/api/metricas", "metricas", False),
+        ("POST", r"/api/login", "login", False),
+        ("GET", r"/api/articulos", "listar_articulos", False),
+        ("POST", r"/api/articulos", "crear_articulo", True),
+        ("GET", r"/api/articulos/todos", "recorrer_articulos", False),
+        ("GET", rf"/api/articulos/{ID}", "obtener_articulo", False),
+        ("PUT", rf"/api/articulos/{ID}", "actualizar_articulo", True),
+        ("DELETE", rf"/api/articulos/{ID}", "eliminar_articulo", True),
+        ("GET", rf"/api/articulos/{ID}/comentarios", "listar_comentarios", False),
+        ("POST", rf"/api/articulos/{ID}/comentarios", "crear_comentario", True),
+        ("GET", rf"/api/articulos/{ID}/comentarios/todos", "recorrer_comentarios", False),
+        ("GET", rf"/api/(?P<coleccion>{COLECCIONES})", "listar_entidades", False),
+        ("POST", rf"/api/(?P<coleccion>{COLECCIONES})", "crear_entidad", True),
+        ("GET", rf"/api/(?P<coleccion>{COLECCIONES})/nombres", "buscar_nombres", False),
+        ("PUT", rf"/api/(?P<coleccion>{COLECCIONES})/{ID}", "actualizar_entidad", True),
+        ("DELETE", rf"/api/(?P<coleccion>{COLECCIONES})/{ID}", "eliminar_entidad", True),
+    ]
+    RUTAS = [(metodo, re.compile(patron + r"/?"), accion, privada) for metodo, patron, accion, privada in RUTAS]
+
+    def do_GET(self): self.despachar("GET")
+    def do_POST(self): self.despachar("POST")
+    def do_PUT(self): self.despachar("PUT")
+    def do_DELETE(self): self.despachar("DELETE")
+
+    def log_message(self, formato, *args):
+        if LOG_PETICIONES:
+            super().log_message(formato, *args)
+
+    # --- Despacho ---
+
+    def despachar(self, metodo):
+        """Busca la ruta, autentica si hace falta y envía el resultado de la acción."""
+        url = urlsplit(self.path)
+        self.parametros = {clave: valores[0] for clave, valores in parse_qs(url.query).items()}
+        metodos_permitidos = []
+        for metodo_ruta, patron, accion, privada in self.RUTAS:
+            coincidencia = patron.fullmatch(url.path)
+            if coincidencia is None:
+                continue
+            if metodo_ruta != metodo:
+                metodos_permitidos.append(metodo_ruta)
+                continue
+            try:
+                cuerpo = self.leer_cuerpo() # Siempre se consume, para que la conexión quede lista para la siguiente.
+                self.usuario = self.autenticar_peticion() if privada else None
+                if privada and self.usuario is None:
+                    return self.enviar_error(401, "Se requiere un usuario válido (HTTP Basic).",
+                                             {"WWW-Authenticate": 'Basic realm="blog"'})
+                resultado = getattr(self, accion)(cuerpo=cuerpo, **coincidencia.groupdict())
+                if resultado is not None: # Las acciones de streaming ya enviaron su respuesta.
+                    estado, datos = resultado
+                    self.enviar_json(estado, datos)
+            except ValueError as e: # Incluye el JSON mal formado del cuerpo.
+                self.enviar_error(400, str(e))
+            except LookupError as e:
+                self.enviar_error(404, str(e).strip("'\""))
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True # El cliente se fue a mitad de la respuesta.
+            except Exception as e:
+                traceback.print_exc()
+                self.enviar_error(500, f"Error interno: {e}")
+            return
+        if metodos_permitidos:
+            return self.enviar_error(405, f"Método {metodo} no permitido.", {"Allow": ", ".join(metodos_permitidos)})
+        self.enviar_error(404, f"Ruta desconocida: {url.path}")
+
+    def leer_cuerpo(self):
+        """Cuerpo JSON de la petición ({} si no hay). Lanza ValueError si es demasiado grande o no es JSON."""
+        largo = int(self.headers.get("Content-Length") or 0)
+        if largo > MAX_CUERPO_BYTES:
+            self.close_connection = True # No se lee: la conexión no puede reutilizarse.
+            raise ValueError(f"El cuerpo supera el máximo de {MAX_CUERPO_BYTES} bytes.")
+        if not largo:
+            return {}
+        cuerpo = json.loads(self.rfile.read(largo))
+        if not isinstance(cuerpo, dict):
+            raise ValueError("El cuerpo debe ser un objeto JSON.")
+        return cuerpo
+
+    def autenticar_peticion(self):
+        """Usuario de la cabecera 'Authorization: Basic email:password', o None si falta o no coincide."""
+        tipo, _, credenciales = self.headers.get("Authorization", "").partition(" ")
+        if tipo.lower() != "basic":
+            return None
+        try:
+            email, _, password = base64.b64decode(credenciales).decode("utf-8").partition(":")
+        except ValueError: # base64 o UTF-8 inválidos.
+            return None
+        return Servicios.autenticar(email, password)
+
+    # --- Respuestas ---
+
+    def enviar_json(self, estado, datos, cabeceras=None):
+        """Envía 'datos' como JSON. Los GET exitosos llevan ETag y responden 304 si el cliente ya lo tiene."""
+        cuerpo = codificar(datos)
+        cabeceras = dict(cabeceras or {})
+        if self.command == "GET" and estado == 200:
+            etag = '"' + hashlib.blake2b(cuerpo, digest_size=16).hexdigest() + '"'
+            cabeceras.update({"ETag": etag, "Cache-Control": "no-cache"}) # Cacheable, pero revalidando siempre.
+            if self.etag_coincide(etag):
+                self.send_response(304)
+                for clave, valor in cabeceras.items():
+                    self.send_header(clave, valor)
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for clave, valor in cabeceras.items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def etag_coincide(self, etag):
+        """True si la cabecera If-None-Match incluye el ETag (o es '*')."""
+        pedidos = [valor.strip().removeprefix("W/") for valor in self.headers.get("If-None-Match", "").split(",")]
+        return "*" in pedidos or etag in pedidos
+
+    def enviar_error(self, estado, mensaje, cabeceras=None):
+        self.enviar_json(estado, {"error": mensaje}, cabeceras)
+
+    def enviar_streaming(self, documentos):
+        """
+        Envía los documentos como NDJSON (uno por línea) con Transfer-Encoding: chunked, a medida que
+        llegan del cursor: la respuesta empieza enseguida y ni el servidor ni el cliente la tienen entera en memoria.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        parte = bytearray()
+        try:
+            for documento in documentos:
+                parte += codificar(documento) + b"\n"
+                if len(parte) >= TAMANO_PARTE:
+                    self.enviar_parte(parte)
+                    parte.clear()
+        except (BrokenPipeError, ConnectionResetError):
+            raise # El cliente cerró la conexión (lo atiende despachar).
+        except Exception:
+            # Los encabezados ya salieron con 200: se corta la conexión sin la parte final para que el cliente
+            # lo note como una respuesta incompleta.
+            traceback.print_exc()
+            self.close_connection = True
+            return
+        if parte:
+            self.enviar_parte(parte)
+        self.wfile.write(b"0\r\n\r\n") # Parte vacía: fin de la respuesta.
+
+    def enviar_parte(self, datos):
+        self.wfile.write(f"{len(datos):x}\r\n".encode("ascii") + datos + b"\r\n")
+
+    # --- Acciones: retornan (estado, datos) o envían la respuesta ellas mismas (streaming) ---
+
+    def salud(self, cuerpo):
+        return 200, {"estado": "ok", "hora": datetime.datetime.now()}
+
+    def metricas(self, cuerpo):
+        """Latencias por operación y contadores del pool, en texto Prometheus (ver Monitoreo.py)."""
+        texto = monitor_comandos.texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(texto)))
+        self.end_headers()
+        self.wfile.write(texto)
+
+    def login(self, cuerpo):
+        usuario = Servicios.autenticar(cuerpo.get("email", ""), cuerpo.get("password", ""))
+        return (200, usuario) if usuario else (401, {"error": "Email o contraseña incorrectos."})
+
+    def listar_articulos(self, cuerpo):
+        """?q=<búsqueda>&cursor=<next_cursor|prev_cursor>&tamano=N&atras=1&parcial=1 (búsqueda mientras se escribe)"""
+        p = self.parametros
+        pagina = Servicios.listar_articulos(p.get("q", ""), p.get("cursor"), Servicios.leer_tamano(p.get("tamano"), TAMANO_PAGINA),
+                                            p.get("atras") == "1", MODO_PARCIAL if p.get("parcial") == "1" else None)
+        return 200, pagina
+
+    def recorrer_articulos(self, cuerpo):
+        self.enviar_streaming(Servicios.recorrer_articulos(self.parametros.get("q", "")))
+
+    def obtener_articulo(self, cuerpo, id_objeto):
+        return 200, Servicios.obtener_articulo(id_objeto)
+
+    def _datos_articulo(self, cuerpo):
+        """Campos del formulario a partir del cuerpo; el autor por defecto es el usuario autenticado."""
+        return Servicios.preparar_articulo(cuerpo.get("title"), cuerpo.get("text"), cuerpo.get("author", self.usuario["email"]),
+                                           cuerpo.get("categories", []), cuerpo.get("tags", []))
+
+    def crear_articulo(self, cuerpo):
+        return 201, {"_id": Servicios.guardar_articulo(None, self._datos_articulo(cuerpo))}
+
+    def actualizar_articulo(self, cuerpo, id_objeto):
+        return 200, {"_id": Servicios.guardar_articulo(id_objeto, self._datos_articulo(cuerpo))}
+
+    def eliminar_articulo(self, cuerpo, id_objeto):
+        Servicios.eliminar_articulo(id_objeto)
+        return 200, {"eliminado": id_objeto}
+
+    def listar_comentarios(self, cuerpo, id_objeto):
+        tamano = Servicios.leer_tamano(self.parametros.get("tamano"), TAMANO_PAGINA_COMENTARIOS)
+        return 200, Servicios.listar_comentarios(id_objeto, self.parametros.get("cursor"), tamano)
+
+    def recorrer_comentarios(self, cuerpo, id_objeto):
+        self.enviar_streaming(Servicios.recorrer_comentarios(id_objeto))
+
+    def crear_comentario(self, cuerpo, id_objeto):
+        return 201, {"_id": Servicios.crear_comentario(id_objeto, self.usuario["_id"], cuerpo.get("text"))}
+
+    def listar_entidades(self, cuerpo, coleccion):
+        """?despues_de=<siguiente>&tamano=N (paginación por _id, igual que las listas del Menú)."""
+        tamano = Servicios.leer_tamano(self.parametros.get("tamano"), TAMANO_PAGINA)
+        return 200, Servicios.listar_entidades(coleccion, self.parametros.get("despues_de"), tamano)
+
+    def buscar_nombres(self, cuerpo, coleccion):
+        """?prefijo=<texto>&tamano=N"""
+        tamano = Servicios.leer_tamano(self.parametros.get("tamano"), TAMANO_PAGINA)
+        return 200, {"nombres": Servicios.buscar_nombres(coleccion, self.parametros.get("prefijo", ""), tamano)}
+
+    def crear_entidad(self, cuerpo, coleccion):
+        return 201, {"_id": Servicios.crear_entidad(coleccion, cuerpo.get("valor"))}
+
+    def actualizar_entidad(self, cuerpo, coleccion, id_objeto):
+        Servicios.actualizar_entidad(coleccion, id_objeto, cuerpo.get("valor"))
+        return 200, {"_id": id_objeto}
+
+    def eliminar_entidad(self, cuerpo, coleccion, id_objeto):
+        Servicios.eliminar_entidad(coleccion, id_objeto)
+        return 200, {"eliminado": id_objeto}
+
+
+class ServidorAPI(ThreadingHTTPServer):
+    daemon_threads = True # Las conexiones abiertas no impiden cerrar el proceso.
+    request_queue_size = COLA_CONEXIONES
+
+
+def crear_servidor(host=HOST, puerto=PUERTO):
+    """Prepara los mapas de usuarios, categorías y tags (como el Menú) y retorna el servidor sin iniciarlo."""
+    for nombre in ("gestor_usuarios", "gestor_categorias", "gestor_etiquetas"):
+        gestor = obtener_gestor(nombre)
+        if not gestor.mapa_cargado:
+            gestor.iniciar_mapa()
+        gestor.iniciar_sincronizacion()
+    return ServidorAPI((host, puerto), ManejadorAPI)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP/JSON del blog sobre los gestores de Logica.py.")
+    parser.add_argument("--host", default=HOST, help="Interfaz donde escuchar (BLOG_API_HOST).")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto donde escuchar (BLOG_API_PUERTO).")
+    parser.add_argument("--barrido", action="store_true", help="Barre también las referencias huérfanas en segundo plano.")
+    argumentos = parser.parse_args()
+
+    servidor = crear_servidor(argumentos.host, argumentos.puerto)
+    if argumentos.barrido:
+        obtener_gestor("gestor_integridad").iniciar_barrido()
+    print(f"API escuchando en http://{argumentos.host}:{servidor.server_address[1]}/api", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
@@ -0,0 +1,44 @@
+import datetime
+import time
+
+class Sesion:
+    """Usuario autenticado en esta ejecución de la aplicación (el Login se la pasa al Menú en el mismo proceso)."""
+
+    def __init__(self, usuario):
+        self.usuario = usuario # Documento de 'users' retornado por GestorUsuario.autenticar.
+        self.inicio = datetime.datetime.now() # Hora del login.
+        self.marca_login = time.perf_counter() # Para medir la latencia login -> menú.
+
+    @property
+    def id_usuario(self):
+        """ObjectId del usuario (autor de los comentarios que escriba)."""
+        return self.usuario["_id"]
+
+    @property
+    def email(self):
+        return self.usuario.get("email", "")
+
+    @property
+    def nombre(self):
+        """Nombre para mostrar; si el usuario no tiene, se usa el email."""
+        return self.usuario.get("name") or self.email
+
+
+# --- Sesión Actual ---
+# Solo hay un usuario autenticado por proceso.
+_sesion_actual = None
+
+def iniciar_sesion(usuario):
+    """Crea la sesión del usuario autenticado y la deja como la sesión actual."""
+    global _sesion_actual
+    _sesion_actual = Sesion(usuario)
+    return _sesion_actual
+
+def obtener_sesion():
+    """Retorna la sesión actual, o None si nadie inició sesión (ej: Menu.py ejecutado directamente)."""
+    return _sesion_actual
+
+def cerrar_sesion():
+    """Olvida la sesión actual."""
+    global _sesion_actual
+    _sesion_actual = None
@@ -0,0 +1,104 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class EjecutorTareas:
+    """
+    Ejecuta las llamadas a los gestores (pymongo) en un pool de hilos para no bloquear el bucle de Tk.
+    Los resultados se devuelven al hilo de la interfaz mediante una cola revisada con 'raiz.after'.
+    """
+
+    def __init__(self, raiz, max_hilos=4, intervalo_ms=30, al_cambiar_estado=None):
+        self.raiz = raiz # Ventana cuyo bucle de eventos recibe los resultados.
+        self.intervalo_ms = intervalo_ms # Cada cuánto se revisa la cola de resultados.
+        self.al_cambiar_estado = al_cambiar_estado # Callback(pendientes) para mostrar el estado de carga.
+        self.pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="gestor")
+        self.cola_resultados = queue.Queue() # Futuros terminados, listos para entregarse a la GUI.
+        self.generaciones = {} # { clave: número de la última solicitud } para descartar resultados viejos.
+        self.futuros = {} # { clave: último futuro enviado } para cancelar los que aún no empezaron.
+        self.pendientes = 0 # Cantidad de tareas enviadas que aún no se entregan.
+        self.cerrado = False
+        self._revisar_cola()
+
+    def enviar(self, funcion, *args, al_terminar=None, al_error=None, clave=None, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en segundo plano y retorna su futuro.
+        'al_terminar(resultado)' y 'al_error(excepcion)' se llaman en el hilo de la GUI.
+        Si se indica 'clave', una nueva solicitud con la misma clave vuelve obsoleta a la anterior:
+        se cancela si aún no empezó y su resultado se descarta si ya estaba en curso.
+        """
+        generacion = None
+        if clave is not None:
+            generacion = self.generaciones.get(clave, 0) + 1
+            self.generaciones[clave] = generacion
+            anterior = self.futuros.get(clave)
+            if anterior is not None:
+                anterior.cancel() # Solo tiene efecto si todavía no empezó a ejecutarse.
+
+        futuro = self.pool.submit(funcion, *args, **kwargs)
+        if clave is not None:
+            self.futuros[clave] = futuro
+        self._cambiar_pendientes(1)
+        # El callback corre en el hilo del pool: solo encola, nunca toca widgets.
+        futuro.add_done_callback(lambda f: self.cola_resultados.put((f, clave, generacion, al_terminar, al_error)))
+        return futuro
+
+    def esta_vigente(self, clave, generacion):
+        """Indica si la solicitud 'generacion' sigue siendo la más reciente para esa clave."""
+        return clave is None or self.generaciones.get(clave) == generacion
+
+    def _revisar_cola(self):
+        """Entrega en el hilo de la GUI los resultados terminados y se reprograma con 'after'."""
+        if self.cerrado:
+            return
+        while True:
+            try:
+                futuro, clave, generacion, al_terminar, al_error = self.cola_resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._cambiar_pendientes(-1)
+            if clave is not None and self.futuros.get(clave) is futuro:
+                del self.futuros[clave]
+            # Descarta las tareas canceladas y las que quedaron obsoletas por una solicitud más nueva.
+            if futuro.cancelled() or not self.esta_vigente(clave, generacion):
+                continue
+            error = futuro.exception()
+            if error is not None:
+                if al_error:
+                    al_error(error)
+                else:
+                    print(f"Error en tarea de segundo plano: {error}")
+            elif al_terminar:
+                al_terminar(futuro.result())
+        try:
+            self.raiz.after(self.intervalo_ms, self._revisar_cola)
+        except Exception:
+            # La ventana ya fue destruida.
+            self.cerrar()
+
+    def _cambiar_pendientes(self, delta):
+        """Actualiza el contador de tareas pendientes y notifica el estado de carga."""
+        self.pendientes += delta
+        if self.al_cambiar_estado:
+            self.al_cambiar_estado(self.pendientes)
+
+    def cerrar(self):
+        """Detiene la revisión de la cola y cancela las tareas que no han empezado."""
+        self.cerrado = True
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def avisar_ventana_lista(raiz):
+    """
+    Si la variable de entorno BLOG_MEDIR_ARRANQUE está definida (la usa Benchmark.py), imprime
+    'VENTANA_LISTA' en cuanto la ventana termina su primer pintado y luego la cierra.
+    """
+    if not os.environ.get("BLOG_MEDIR_ARRANQUE"):
+        return
+
+    def avisar():
+        raiz.update_idletasks() # Termina de dibujar los widgets pendientes.
+        print("VENTANA_LISTA", flush=True)
+        raiz.after(0, raiz.destroy)
+
+    raiz.after_idle(avisar)
@@ -0,0 +1,324 @@
+import threading
+from collections import OrderedDict
+
+import customtkinter as ctk
+
+# --- Configuración de las Listas Virtuales ---
+TAMANO_BLOQUE = 100 # Filas pedidas a la base por cada consulta.
+MAX_BLOQUES = 50 # Bloques que se conservan en memoria (LRU): con 1M de filas solo viven 5.000.
+FILAS_POR_PASO = 3 # Filas que avanza cada giro de la rueda del mouse.
+COLOR_SELECCION = ("#BFDBFE", "#1E3A8A") # (tema claro, tema oscuro)
+
+# --- Configuración de los Selectores ---
+MAX_SUGERENCIAS = 8 # Coincidencias que se muestran mientras se escribe.
+FICHAS_POR_FILA = 3 # Elegidos por fila debajo del campo de búsqueda.
+
+
+class FuentePaginada:
+    """
+    Fuente de datos de una ListaVirtual respaldada por un cursor paginado en la base de datos.
+    - obtener_pagina(cursor, cantidad) -> (filas, cursor_siguiente o None)
+    - posicionar(desplazamiento) -> cursor de la fila 'desplazamiento' (opcional: permite saltar sin recorrer)
+    - contar() -> total de filas o None si no se conoce (opcional)
+    cargar_bloque se ejecuta en segundo plano; fila() y cantidad() solo leen memoria (hilo de la GUI).
+    """
+
+    def __init__(self, obtener_pagina, posicionar=None, contar=None, tamano_bloque=TAMANO_BLOQUE, max_bloques=MAX_BLOQUES):
+        self.obtener_pagina = obtener_pagina
+        self.posicionar = posicionar
+        self.contar = contar
+        self.tamano_bloque = tamano_bloque
+        self.max_bloques = max_bloques
+        self.candado = threading.Lock()
+        self.bloques = OrderedDict() # { numero_bloque: [filas] }, el más usado al final.
+        self.cursores = {0: None} # { numero_bloque: cursor con el que empieza } (se conservan aunque se expulse el bloque).
+        self.total = None # Se conoce al contar o al llegar al último bloque.
+        self.contado = contar is None
+
+    def fila(self, indice):
+        """Retorna la fila 'indice' si su bloque está en memoria; si no, None."""
+        with self.candado:
+            bloque = self.bloques.get(indice // self.tamano_bloque)
+        if bloque is None:
+            return None
+        posicion = indice % self.tamano_bloque
+        return bloque[posicion] if posicion < len(bloque) else None
+
+    def cantidad(self):
+        """Filas para dimensionar la barra: el total si se conoce; si no, hasta el último bloque conocido."""
+        with self.candado:
+            if self.total is not None:
+                return self.total
+            return (max(self.cursores) + 1) * self.tamano_bloque
+
+    def cargar_bloque(self, numero):
+        """Trae el bloque 'numero' de la base (en segundo plano). Retorna el número del bloque."""
+        if not self.contado:
+            total = self.contar()
+            with self.candado:
+                self.total, self.contado = total, True
+        with self.candado:
+            if numero in self.bloques or (self.total is not None and numero * self.tamano_bloque >= self.total > 0):
+                return numero
+            conocidos = [n for n in self.cursores if n <= numero]
+        desde = max(conocidos)
+        if numero - desde > 1 and self.posicionar is not None:
+            # Salto (ej: arrastrar la barra hasta la mitad): se ubica el cursor sin leer los bloques intermedios.
+            cursor = self.posicionar(numero * self.tamano_bloque)
+            if cursor is None:
+                with self.candado:
+                    self.total = min(self.total or numero * self.tamano_bloque, numero * self.tamano_bloque)
+                return numero
+            with self.candado:
+                self.cursores[numero] = cursor
+            desde = numero
+        # Sin salto: se avanza bloque por bloque desde el último cursor conocido (paginación por llaves).
+        for actual in range(desde, numero + 1):
+            if not self._leer(actual):
+                break
+        return numero
+
+    def _leer(self, numero):
+        """Consulta un bloque a partir de su cursor. Retorna False si ya no hay más filas después de él."""
+        with self.candado:
+            cursor = self.cursores[numero]
+        filas, siguiente = self.obtener_pagina(cursor, self.tamano_bloque)
+        with self.candado:
+            self.bloques[numero] = filas
+            self.bloques.move_to_end(numero)
+            while len(self.bloques) > self.max_bloques:
+                self.bloques.popitem(last=False)
+            if siguiente is None:
+                self.total = numero * self.tamano_bloque + len(filas)
+                return False
+            self.cursores[numero + 1] = siguiente
+            return True
+
+
+class ListaVirtual(ctk.CTkFrame):
+    """
+    Lista de una fila por elemento que solo crea widgets para las filas visibles y pide los datos a una
+    FuentePaginada a medida que se desplaza. Un clic selecciona la fila y llama al_seleccionar(fila).
+    """
+
+    def __init__(self, master, ejecutor, formatear, al_seleccionar=None, al_error=None, alto_fila=26,
+                 mensaje_vacio="No hay elementos.", clave="lista", **kwargs):
+        super().__init__(master, **kwargs)
+        self.ejecutor = ejecutor # EjecutorTareas de la ventana: las consultas nunca bloquean la GUI.
+        self.formatear = formatear # formatear(fila) -> texto de una línea.
+        self.al_seleccionar = al_seleccionar
+        self.al_error = al_error
+        self.alto_fila = alto_fila
+        self.mensaje_vacio = mensaje_vacio
+        self.clave = clave # Prefijo de las claves del ejecutor (descarta pedidos que ya no se ven).
+        self.fuente = None
+        self.primera = 0 # Índice de la primera fila visible.
+        self.seleccionada = None
+        self.etiquetas = [] # Widgets reutilizados: uno por fila visible.
+        self.pedidos = {} # { numero_bloque: futuro en curso }
+
+        self.contenedor = ctk.CTkFrame(self, fg_color="transparent")
+        self.contenedor.pack(side="left", fill="both", expand=True)
+        self.barra = ctk.CTkScrollbar(self, command=self._al_mover_barra)
+        self.barra.pack(side="right", fill="y")
+        self.contenedor.bind("<Configure>", self._al_redimensionar)
+        self._enlazar_rueda(self.contenedor)
+
+    def mostrar(self, fuente):
+        """Reemplaza la fuente de datos (ej: una nueva búsqueda) y vuelve al inicio."""
+        self.fuente = fuente
+        self.primera = 0
+        self.seleccionada = None
+        self.pedidos = {}
+        self._pintar()
+
+    def desplazar(self, filas):
+        """Mueve la vista 'filas' hacia abajo (o hacia arriba si es negativo)."""
+        self.primera += filas
+        self._pintar()
+
+    # --- Eventos ---
+
+    def _enlazar_rueda(self, widget):
+        widget.bind("<MouseWheel>", self._al_girar_rueda) # Windows y macOS.
+        widget.bind("<Button-4>", self._al_girar_rueda) # Linux (arriba).
+        widget.bind("<Button-5>", self._al_girar_rueda) # Linux (abajo).
+
+    def _al_girar_rueda(self, evento):
+        hacia_arriba = evento.num == 4 or getattr(evento, "delta", 0) > 0
+        self.desplazar(-FILAS_POR_PASO if hacia_arriba else FILAS_POR_PASO)
+
+    def _al_mover_barra(self, accion, valor, unidad=None):
+        if accion == "moveto":
+            self.primera = int(float(valor) * self._cantidad())
+        else:
+            paso = int(valor)
+            self.primera += paso * len(self.etiquetas) if unidad == "pages" else paso
+        self._pintar()
+
+    def _al_redimensionar(self, evento):
+        """Crea o destruye etiquetas para que haya exactamente una por fila visible."""
+        visibles = max(1, int(evento.height // self._apply_widget_scaling(self.alto_fila)))
+        while len(self.etiquetas) < visibles:
+            posicion = len(self.etiquetas)
+            etiqueta = ctk.CTkLabel(self.contenedor, text="", anchor="w", height=self.alto_fila,
+                                    font=("Consolas", 13), corner_radius=4)
+            etiqueta.pack(fill="x", padx=4)
+            etiqueta.bind("<Button-1>", lambda _, posicion=posicion: self._seleccionar(posicion))
+            self._enlazar_rueda(etiqueta)
+            self.etiquetas.append(etiqueta)
+        while len(self.etiquetas) > visibles:
+            self.etiquetas.pop().destroy()
+        self._pintar()
+
+    def _seleccionar(self, posicion):
+        fila = self.fuente.fila(self.primera + posicion) if self.fuente else None
+        if fila is None:
+            return # Fila vacía o todavía cargando.
+        self.seleccionada = self.primera + posicion
+        self._pintar()
+        if self.al_seleccionar:
+            self.al_seleccionar(fila)
+
+    # --- Pintado ---
+
+    def _cantidad(self):
+        return self.fuente.cantidad() if self.fuente else 0
+
+    def _pintar(self):
+        """Actualiza el texto de las etiquetas visibles y pide los bloques que falten."""
+        total = self._cantidad()
+        self.primera = max(0, min(self.primera, total - len(self.etiquetas)))
+        faltantes = []
+        for posicion, etiqueta in enumerate(self.etiquetas):
+            indice = self.primera + posicion
+            if indice >= total:
+                texto = self.mensaje_vacio if total == 0 and posicion == 0 and self.fuente else ""
+            else:
+                fila = self.fuente.fila(indice)
+                if fila is None:
+                    texto = "Cargando..."
+                    numero = indice // self.fuente.tamano_bloque
+                    if numero not in faltantes:
+                        faltantes.append(numero)
+                else:
+                    texto = self.formatear(fila)
+            etiqueta.configure(text=texto, fg_color=COLOR_SELECCION if indice == self.seleccionada else "transparent")
+        if total:
+            self.barra.set(self.primera / total, min(1.0, (self.primera + len(self.etiquetas)) / total))
+        else:
+            self.barra.set(0, 1)
+        for ranura, numero in enumerate(faltantes):
+            self._pedir(numero, ranura)
+
+    def _pedir(self, numero, ranura):
+        """Pide un bloque en segundo plano. La clave por ranura descarta los pedidos que ya salieron de la vista."""
+        futuro = self.pedidos.get(numero)
+        if futuro is not None and not futuro.done():
+            return
+        fuente = self.fuente
+        self.pedidos[numero] = self.ejecutor.enviar(
+            fuente.cargar_bloque, numero,
+            al_terminar=lambda _: self._pintar() if self.fuente is fuente else None,
+            al_error=lambda error: self._informar_error(fuente, error),
+            clave=f"{self.clave}-{ranura}"
+        )
+
+    def _informar_error(self, fuente, error):
+        """Los errores de una fuente ya reemplazada (ej: su consulta se canceló por una búsqueda nueva) se ignoran."""
+        if self.fuente is not fuente:
+            return
+        if self.al_error:
+            self.al_error(error)
+        else:
+            print(f"Error cargando la lista: {error}")
+
+
+class Selector(ctk.CTkFrame):
+    """
+    Campo con búsqueda por prefijo para elegir uno o varios nombres de una lista que puede ser enorme
+    (ej: decenas de miles de tags). Solo existen widgets para las sugerencias visibles y para los elegidos.
+    - buscar(prefijo, limite) -> [nombres] en memoria (ej: GestorEntidad.buscar_por_prefijo)
+    - sugerir(texto, cantidad) -> [nombres] parecidos, usado si el prefijo no encuentra nada (opcional)
+    - multiple=False: elegir un nombre reemplaza al anterior (ej: el autor de un artículo).
+    """
+
+    def __init__(self, master, buscar, seleccion=(), multiple=True, max_sugerencias=MAX_SUGERENCIAS,
+                 marcador="Escriba para buscar...", sugerir=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.buscar = buscar
+        self.sugerir = sugerir
+        self.multiple = multiple
+        self.max_sugerencias = max_sugerencias
+        self.seleccion = [nombre for nombre in seleccion if nombre is not None] # Nombres elegidos, en orden.
+        self.sugerencias = [] # Nombres que muestran los botones de sugerencia.
+
+        self.entrada = ctk.CTkEntry(self, placeholder_text=marcador)
+        self.entrada.pack(fill="x", padx=4, pady=(4, 2))
+        self.entrada.bind("<KeyRelease>", self._al_escribir)
+        self.entrada.bind("<Return>", lambda _: self._elegir(0))
+        self.frame_elegidos = ctk.CTkFrame(self, fg_color="transparent")
+        self.frame_elegidos.pack(fill="x", padx=4)
+        self.frame_sugerencias = ctk.CTkFrame(self, fg_color="transparent")
+        self.frame_sugerencias.pack(fill="x", padx=4, pady=(0, 4))
+
+        # Botones de sugerencia reutilizados: se crean una sola vez y solo cambia su texto.
+        self.botones_sugerencia = []
+        for posicion in range(max_sugerencias):
+            boton = ctk.CTkButton(self.frame_sugerencias, text="", anchor="w", height=24, fg_color="transparent",
+                                  text_color=("gray10", "gray90"), hover_color=COLOR_SELECCION,
+                                  command=lambda posicion=posicion: self._elegir(posicion))
+            self.botones_sugerencia.append(boton)
+        self._pintar_elegidos()
+        self._filtrar()
+
+    def obtener_seleccion(self):
+        """Retorna la lista de nombres elegidos."""
+        return list(self.seleccion)
+
+    # --- Eventos ---
+
+    def _al_escribir(self, evento):
+        if evento.keysym not in ("Return", "Up", "Down", "Left", "Right"):
+            self._filtrar()
+
+    def _elegir(self, posicion):
+        if posicion >= len(self.sugerencias):
+            return
+        nombre = self.sugerencias[posicion]
+        self.seleccion = self.seleccion + [nombre] if self.multiple else [nombre]
+        self.entrada.delete(0, "end")
+        self._pintar_elegidos()
+        self._filtrar()
+
+    def _quitar(self, nombre):
+        self.seleccion.remove(nombre)
+        self._pintar_elegidos()
+        self._filtrar()
+
+    # --- Pintado ---
+
+    def _filtrar(self):
+        """Muestra las primeras sugerencias que empiezan con el texto escrito (sin las ya elegidas)."""
+        elegidos = set(self.seleccion)
+        # Se piden de más para que quitar las ya elegidas no deje huecos.
+        texto = self.entrada.get().strip()
+        candidatos = self.buscar(texto, self.max_sugerencias + len(elegidos))
+        if not candidatos and texto and self.sugerir is not None:
+            candidatos = self.sugerir(texto, self.max_sugerencias + len(elegidos)) # Posible error de tipeo.
+        self.sugerencias = [nombre for nombre in candidatos if nombre not in elegidos][:self.max_sugerencias]
+        for posicion, boton in enumerate(self.botones_sugerencia):
+            if posicion < len(self.sugerencias):
+                boton.configure(text=str(self.sugerencias[posicion]))
+                boton.pack(fill="x")
+            else:
+                boton.pack_forget()
+
+    def _pintar_elegidos(self):
+        """Recrea las fichas de los elegidos (son pocas: las que el usuario marcó)."""
+        for ficha in self.frame_elegidos.winfo_children():
+            ficha.destroy()
+        for posicion, nombre in enumerate(self.seleccion):
+            ficha = ctk.CTkButton(self.frame_elegidos, text=f"{nombre}  ✕", height=24, corner_radius=12,
+                                  command=lambda nombre=nombre: self._quitar(nombre))
+            ficha.grid(row=posicion // FICHAS_POR_FILA, column=posicion % FICHAS_POR_FILA, padx=2, pady=2, sticky="w")
@@ -0,0 +1,64 @@
+import datetime
+import os
+import sys
+import types
+
+import mongomock
+import pytest
+
+# Los módulos del blog están en la carpeta padre. Sin instantánea local: los mapas se leen de la base de prueba.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BLOG_INSTANTANEA", "0")
+
+import Integridad  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Base de mongomock vacía para cada prueba (no es un replica set: las cascadas van sin transacción)."""
+    monkeypatch.setattr(Integridad.GestorIntegridad, "soporta_transacciones", lambda self: False)
+    # pymongo >= 4.11 pasa 'sort' a los UpdateOne de bulk_write; mongomock todavía no lo acepta.
+    agregar_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, "add_update",
+                        lambda self, *args, sort=None, **kwargs: agregar_update(self, *args, **kwargs))
+    return mongomock.MongoClient()["blog_pruebas"]
+
+
+@pytest.fixture
+def blog(db):
+    """
+    Blog chico en la base de prueba (3 usuarios, 2 categorías, 2 tags y 30 artículos, uno por minuto) y sus
+    gestores con los mapas cargados. El gestor de artículos busca con $regex y tiene su propia caché.
+    """
+    from Cache import CacheResultados
+    from Logica import GestorUsuario, GestorCategoria, GestorEtiqueta, GestorComentario, GestorArticulo
+
+    ids_usuarios = db["users"].insert_many([{"email": f"{nombre}@blog.com", "name": nombre, "password": "123"}
+                                            for nombre in ("ana", "polly", "juan")]).inserted_ids
+    ids_categorias = db["categories"].insert_many([{"name": "Postres"}, {"name": "Sopas"}]).inserted_ids
+    ids_tags = db["tags"].insert_many([{"name": "Pollo"}, {"name": "Rápido"}]).inserted_ids
+    titulos = ["pollo asado", "polenta", "pollera de pan", "sopa de pollo", "arroz (rápido)", "Pollito al horno"]
+    base = datetime.datetime(2024, 1, 1)
+    db["articles"].insert_many([{
+        "title": titulos[i % len(titulos)] + f" {i}",
+        "text": "receta de la semana" if i % 2 else "paso a paso",
+        "user_id": ids_usuarios[i % 3],
+        "categories": [ids_categorias[i % 2]],
+        "tags": [ids_tags[i % 2]] if i % 3 else [],
+        "date": base + datetime.timedelta(minutes=i),
+        "comment_count": 0,
+        # Modelo de lectura, como lo deja GestorArticulo.guardar_articulo.
+        "author_email": f"{('ana', 'polly', 'juan')[i % 3]}@blog.com",
+        "category_names": [("Postres", "Sopas")[i % 2]],
+        "tag_names": [("Pollo", "Rápido")[i % 2]] if i % 3 else [],
+    } for i in range(30)])
+
+    usuarios, categorias, etiquetas = GestorUsuario(db=db), GestorCategoria(db=db), GestorEtiqueta(db=db)
+    for gestor in (usuarios, categorias, etiquetas):
+        gestor.cargar_mapa()
+    comentarios = GestorComentario(db=db, usuarios=usuarios)
+    articulos = GestorArticulo(db=db, usuarios=usuarios, categorias=categorias, etiquetas=etiquetas,
+                               comentarios=comentarios, cache=CacheResultados())
+    articulos.motor_busqueda.modo = "regex"
+    return types.SimpleNamespace(db=db, usuarios=usuarios, categorias=categorias, etiquetas=etiquetas,
+                                 comentarios=comentarios, articulos=articulos)
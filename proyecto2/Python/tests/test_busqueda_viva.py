@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from Cache import CacheResultados
+from Logica import GestorArticulo, MODO_PARCIAL, limitar_consultas
+from Tareas import EjecutorTareas
+
+
+def escribir(articulos, texto, modo, tamano=100):
+    """Una página por tecla, como la búsqueda mientras se escribe del Menú. Retorna los _id de cada página."""
+    return [[a["_id"] for a in articulos.obtener_pagina(texto[:largo].strip(), None, tamano, modo=modo)["articulos"]]
+            for largo in range(1, len(texto) + 1)]
+
+
+@pytest.fixture
+def sin_cache(blog):
+    """Gestor de artículos sobre el mismo blog que siempre consulta la base (referencia)."""
+    articulos = GestorArticulo(db=blog.db, usuarios=blog.usuarios, categorias=blog.categorias, etiquetas=blog.etiquetas,
+                               comentarios=blog.comentarios, cache=CacheResultados(max_entradas=0))
+    articulos.motor_busqueda.modo = "regex"
+    return articulos
+
+
+@pytest.mark.parametrize("modo", [None, MODO_PARCIAL])
+@pytest.mark.parametrize("texto", ["Pollito", "pollera de", "polly", "zz", "arroz (r"])
+def test_refinar_en_memoria_da_lo_mismo_que_consultar(blog, sin_cache, monkeypatch, texto, modo):
+    consultas = []
+    agregar = blog.articulos._agregar
+    monkeypatch.setattr(blog.articulos, "_agregar", lambda pipeline: (consultas.append(pipeline), agregar(pipeline))[1])
+    assert escribir(blog.articulos, texto, modo) == escribir(sin_cache, texto, modo)
+    assert len(consultas) < len(texto) # Después del primer resultado completo, las teclas se filtran en memoria.
+
+
+def test_el_modo_parcial_encuentra_palabras_a_medio_escribir(blog):
+    blog.articulos.motor_busqueda.modo = "invertido" # Por palabras, como con el índice de texto.
+    assert blog.articulos.obtener_pagina("pollit", None, 100)["articulos"] == []
+    parcial = blog.articulos.obtener_pagina("pollit", None, 100, modo=MODO_PARCIAL)["articulos"]
+    assert {a["title"] for a in parcial} == {f"Pollito al horno {i}" for i in range(5, 30, 6)}
+    # Los saltos de la lista virtual usan cursores por llaves en el modo parcial.
+    assert "|" in blog.articulos.cursor_en_posicion("pollit", 2, modo=MODO_PARCIAL)
+    assert blog.articulos.cursor_en_posicion("pollit", 2) == "r|2"
+
+
+def test_limitar_consultas_marca_las_consultas_del_hilo(blog, monkeypatch):
+    opciones = []
+    aggregate = type(blog.articulos.coleccion_articulos).aggregate
+    monkeypatch.setattr(type(blog.articulos.coleccion_articulos), "aggregate",
+                        lambda coleccion, pipeline, **kwargs: (opciones.append(kwargs), aggregate(coleccion, pipeline))[1])
+    with limitar_consultas("busqueda-1", 250):
+        blog.articulos.obtener_pagina("sopa", None, 10)
+    blog.articulos.obtener_pagina("pan", None, 10)
+    assert opciones == [{"comment": "busqueda-1", "maxTimeMS": 250}, {"comment": None}]
+
+
+class RaizFalsa:
+    """Lo que EjecutorTareas usa de la ventana de Tk: 'after' (acá, la revisión de la cola se llama a mano)."""
+
+    def after(self, ms, funcion):
+        self.revisar = funcion
+
+
+def test_una_solicitud_nueva_descarta_la_anterior():
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTareas(raiz, max_hilos=1)
+    liberar = threading.Event()
+    entregados = []
+    ejecutor.enviar(liberar.wait, clave="busqueda", al_terminar=lambda r: entregados.append("ocupada"))
+    en_cola = ejecutor.enviar(lambda: "vieja", clave="busqueda", al_terminar=entregados.append)
+    ultima = ejecutor.enviar(lambda: "nueva", clave="busqueda", al_terminar=entregados.append)
+    assert en_cola.cancelled() # No había empezado: se cancela sin ejecutarse.
+    liberar.set()
+    ultima.result(timeout=5)
+    raiz.revisar()
+    assert entregados == ["nueva"] # La que ya estaba en curso terminó, pero su resultado se descarta.
+    assert ejecutor.pendientes == 0
+    ejecutor.cerrar()
@@ -0,0 +1,71 @@
+from Cache import CacheResultados
+
+
+def test_invalidar_quita_solo_las_entradas_con_la_etiqueta():
+    cache = CacheResultados()
+    cache.guardar("a", 1, {("articulo", 1), "inicio"}, 10, cache.generacion)
+    cache.guardar("b", 2, {("articulo", 2)}, 10, cache.generacion)
+    assert cache.invalidar([("articulo", 1)]) == 1
+    assert cache.obtener("a") is None
+    assert cache.obtener("b") == 2
+    assert cache.estadisticas()["bytes"] == 10
+
+
+def test_no_guarda_resultados_consultados_antes_de_una_invalidacion():
+    cache = CacheResultados()
+    generacion = cache.generacion
+    cache.invalidar(["busqueda"]) # Una escritura mientras la consulta estaba en curso.
+    cache.guardar("a", 1, {"busqueda"}, 10, generacion)
+    assert cache.obtener("a") is None
+
+
+def test_expulsa_las_menos_usadas_al_superar_los_topes():
+    cache = CacheResultados(max_entradas=2, max_bytes=25)
+    for clave in "abc":
+        cache.guardar(clave, clave, set(), 10, cache.generacion)
+    assert cache.obtener("a") is None # LRU: la primera salió al guardar la tercera.
+    cache.obtener("b")
+    cache.guardar("d", "d", set(), 10, cache.generacion)
+    assert cache.obtener("c") is None and cache.obtener("b") == "b"
+    cache.guardar("grande", "x", set(), 30, cache.generacion) # Más grande que todo el tope: no se guarda.
+    assert cache.obtener("grande") is None
+
+
+def test_ttl_vencido():
+    cache = CacheResultados(ttl_s=0)
+    cache.guardar("a", 1, set(), 10, cache.generacion)
+    assert cache.obtener("a") is None
+    assert cache.estadisticas()["vencidas"] == 1
+
+
+def test_editar_un_articulo_invalida_sus_paginas_y_las_busquedas(blog):
+    articulos = blog.articulos
+    primera = articulos.obtener_pagina("", None, 10)
+    ultima = articulos.obtener_pagina("", primera["next_cursor"], 10)
+    busqueda = articulos.obtener_pagina("pollo", None, 10)
+    antiguo = min(ultima["articulos"], key=lambda articulo: articulo["date"])
+
+    articulos.guardar_articulo(antiguo["_id"], {"title": "pan casero"})
+    assert articulos.cache.obtener(("", None, 10, False, None)) is not None # La primera página no lo contiene.
+    assert articulos.cache.obtener(("", primera["next_cursor"], 10, False, None)) is None
+    assert articulos.cache.obtener(("pollo", None, 10, False, None)) is None
+    assert articulos.obtener_pagina("pollo", None, 10)["articulos"] == busqueda["articulos"] # Mismos datos, recién leídos.
+
+
+def test_crear_un_articulo_invalida_el_inicio_del_listado(blog):
+    articulos = blog.articulos
+    articulos.obtener_pagina("", None, 10)
+    id_nuevo = articulos.guardar_articulo(None, {"title": "nuevo", "text": "", "user_id": None,
+                                                 "categories": [], "tags": []})
+    assert articulos.obtener_pagina("", None, 10)["articulos"][0]["_id"] == id_nuevo
+
+
+def test_renombrar_una_etiqueta_invalida_las_paginas_que_la_muestran(blog):
+    articulos = blog.articulos
+    clave = ("", None, 30, False, None)
+    articulos.obtener_pagina("", None, 30)
+    cursor = articulos.codificar_cursor(blog.db["articles"].find_one({"title": "pollera de pan 2"}))
+    articulos.obtener_pagina("", cursor, 1) # Consulta los artículos 1 y 0, que no llevan el tag.
+    blog.etiquetas.actualizar_uno(blog.etiquetas.obtener_id_por_nombre("Pollo"), {"name": "Aves"})
+    assert articulos.cache.obtener(clave) is None
+    assert articulos.cache.obtener(("", cursor, 1, False, None)) is not None
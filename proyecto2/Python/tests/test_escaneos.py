@@ -0,0 +1,27 @@
+import mongomock
+
+from Logica import GestorEtiqueta
+
+
+def test_escrituras_no_vuelven_a_leer_la_coleccion(db, monkeypatch):
+    """Lo mismo que Benchmark.benchmark_escaneos_por_escritura: crear, renombrar y eliminar mantienen el mapa sin find."""
+    db["tags"].insert_many([{"name": f"tag {i}"} for i in range(50)])
+    etiquetas = GestorEtiqueta(db=db)
+    etiquetas.cargar_mapa()
+
+    lecturas = []
+    find = mongomock.collection.Collection.find
+    def contar_find(coleccion, filtro=None, *args, **kwargs):
+        if "_id" not in (filtro or {}): # Igual que ContadorEscaneos: una lectura por _id no es un escaneo.
+            lecturas.append(coleccion.name)
+        return find(coleccion, filtro, *args, **kwargs)
+    monkeypatch.setattr(mongomock.collection.Collection, "find", contar_find)
+
+    for i in range(20):
+        id_etiqueta = etiquetas.crear_uno({"name": f"etiqueta temporal {i}"})
+        etiquetas.actualizar_uno(id_etiqueta, {"name": f"etiqueta renombrada {i}"})
+        etiquetas.eliminar_uno(id_etiqueta)
+
+    assert lecturas.count("tags") == 0
+    assert etiquetas.obtener_id_por_nombre("tag 7") is not None
+    assert etiquetas.obtener_id_por_nombre("etiqueta renombrada 3") is None
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("customtkinter") # Widgets.py es parte de la interfaz.
+from Widgets import FuentePaginada  # noqa: E402
+
+
+def fuente_de_articulos(articulos, termino="", consultas=None, **opciones):
+    """FuentePaginada sobre GestorArticulo, igual que la lista de artículos del Menú."""
+    def obtener_pagina(cursor, cantidad):
+        if consultas is not None:
+            consultas.append(cursor)
+        pagina = articulos.obtener_pagina(termino, cursor, cantidad)
+        return pagina["articulos"], pagina["next_cursor"]
+    return FuentePaginada(obtener_pagina, posicionar=lambda desplazamiento: articulos.cursor_en_posicion(termino, desplazamiento),
+                          contar=lambda: articulos.contar(termino), **opciones)
+
+
+def test_recorre_todas_las_filas_en_orden(blog):
+    fuente = fuente_de_articulos(blog.articulos, tamano_bloque=7)
+    for numero in range(5):
+        fuente.cargar_bloque(numero)
+    titulos = [fuente.fila(i)["title"] for i in range(fuente.cantidad())]
+    esperados = [a["title"] for a in blog.db["articles"].find().sort([("date", -1), ("_id", -1)])]
+    assert fuente.cantidad() == 30 and titulos == esperados
+    assert fuente.fila(30) is None
+
+
+def test_salta_sin_leer_los_bloques_intermedios(blog):
+    consultas = []
+    fuente = fuente_de_articulos(blog.articulos, consultas=consultas, tamano_bloque=5)
+    fuente.cargar_bloque(4)
+    assert len(consultas) == 1 and consultas[0] is not None # Un solo bloque, desde el cursor de cursor_en_posicion.
+    assert fuente.fila(20)["title"] == "sopa de pollo 9" and fuente.fila(0) is None
+
+
+def test_sin_total_crece_hasta_el_ultimo_bloque(blog):
+    fuente = fuente_de_articulos(blog.articulos, termino="pollo", tamano_bloque=4)
+    assert fuente.cantidad() == 4 # Con búsqueda no se cuenta: se conoce al llegar al final.
+    numero = 0
+    while fuente.cantidad() > numero * 4:
+        fuente.cargar_bloque(numero)
+        numero += 1
+    assert fuente.cantidad() == len(blog.articulos.obtener_pagina("pollo", None, 100)["articulos"])
+    assert [fuente.fila(i)["_id"] for i in range(fuente.cantidad())] == [
+        a["_id"] for a in blog.articulos.obtener_pagina("pollo", None, 100)["articulos"]]
+
+
+def test_expulsa_los_bloques_menos_usados(blog):
+    fuente = fuente_de_articulos(blog.articulos, tamano_bloque=5, max_bloques=2)
+    for numero in range(3):
+        fuente.cargar_bloque(numero)
+    assert fuente.fila(0) is None and fuente.fila(14) is not None
+    fuente.cargar_bloque(0) # Vuelve a leerlo con el cursor que conservó.
+    assert fuente.fila(0)["title"] == "Pollito al horno 29" and fuente.fila(5) is None
@@ -0,0 +1,38 @@
+from collections import Counter
+
+import mongomock
+
+from Generador import generar
+from Logica import GestorArticulo, GestorCategoria, GestorComentario, GestorEtiqueta, GestorUsuario
+
+
+def contenido(db):
+    """Artículos y comentarios sin los _id (que cambian en cada generación), con sus referencias por nombre."""
+    nombres = {d["_id"]: d.get("email", d.get("name")) for c in ("users", "categories", "tags") for d in db[c].find()}
+    articulos = [(a["title"], a["text"], a["date"], nombres[a["user_id"]], [nombres[i] for i in a["categories"]],
+                  a["comment_count"]) for a in db["articles"].find().sort("date", 1)]
+    comentarios = sorted((c["text"], c["date"], nombres[c["user_id"]]) for c in db["comments"].find())
+    return articulos, comentarios
+
+
+def test_misma_semilla_mismo_contenido(db):
+    otra = mongomock.MongoClient()["blog_pruebas_2"]
+    generar(db, usuarios=20, articulos=200, comentarios=500, categorias=10, tags=30, semilla=1)
+    generar(otra, usuarios=20, articulos=200, comentarios=500, categorias=10, tags=30, semilla=1)
+    assert contenido(db) == contenido(otra)
+    generar(otra, usuarios=20, articulos=200, comentarios=500, categorias=10, tags=30, semilla=2)
+    assert contenido(db) != contenido(otra)
+
+
+def test_conteos_proyeccion_y_popularidad(db):
+    generar(db, usuarios=20, articulos=300, comentarios=1000, categorias=10, tags=30, semilla=3)
+    comentarios = Counter(c["article_id"] for c in db["comments"].find())
+    assert all(a["comment_count"] == comentarios[a["_id"]] for a in db["articles"].find())
+    # El modelo de lectura generado es el mismo que calcularía GestorArticulo.
+    usuarios, categorias, etiquetas = GestorUsuario(db=db), GestorCategoria(db=db), GestorEtiqueta(db=db)
+    articulos = GestorArticulo(db=db, usuarios=usuarios, categorias=categorias, etiquetas=etiquetas,
+                               comentarios=GestorComentario(db=db, usuarios=usuarios))
+    assert articulos.reparar_proyeccion() == 0
+    # Zipf: la categoría más usada aparece varias veces más que la menos usada.
+    usos = Counter(i for a in db["articles"].find() for i in a["categories"]).most_common()
+    assert usos[0][1] > 3 * usos[-1][1]
@@ -0,0 +1,60 @@
+from IndiceNombres import IndiceNombres, normalizar
+
+
+def test_normalizar_quita_mayusculas_y_acentos():
+    assert normalizar("Café Ñandú") == "cafe nandu"
+    assert normalizar("ana@blog.com") == "ana@blog.com"
+
+
+def test_prefijo_sin_acentos_en_orden_y_por_paginas():
+    indice = IndiceNombres(["Pastel", "pastelito", "Pasta", "Papa", "Pastél de papa", "queso"])
+    assert indice.buscar_prefijo("PASTE") == ["Pastel", "Pastél de papa", "pastelito"]
+    assert indice.contar_prefijo("pa") == 5
+    assert indice.buscar_prefijo("pa", limite=2) == ["Papa", "Pasta"]
+    # La página siguiente continúa después del último nombre aunque la lista cambie entre medio.
+    indice.quitar("Pasta")
+    assert indice.buscar_prefijo("pa", limite=2, despues_de="Pasta") == ["Pastel", "Pastél de papa"]
+    assert list(indice.iterar("q")) == ["queso"]
+
+
+def test_agregar_y_quitar_mantienen_el_orden():
+    indice = IndiceNombres()
+    for nombre in ["sopa", "Café", "cafe", "arroz"]:
+        assert indice.agregar(nombre)
+    assert not indice.agregar("sopa")
+    assert indice.nombres == ["arroz", "Café", "cafe", "sopa"]
+    assert indice.quitar("Café") and not indice.quitar("Café")
+    assert indice.buscar_prefijo("caf") == ["cafe"]
+
+
+def test_cargar_ordenados_verifica_el_orden():
+    indice = IndiceNombres()
+    indice.cargar_ordenados(["b", "a"])
+    assert indice.nombres == ["a", "b"]
+
+
+def test_sugerencias_para_errores_de_tipeo():
+    indice = IndiceNombres(["pastel de papa", "pasta", "pollo asado", "postre", "sopa"] + [f"tag {i}" for i in range(500)])
+    assert indice.sugerir("pastle")[0] == "pastel de papa"
+    assert indice.sugerir("polo asado")[0] == "pollo asado"
+    assert indice.sugerir("zzzz") == []
+
+
+def test_el_gestor_mantiene_el_indice_con_las_escrituras(blog):
+    categorias = blog.categorias
+    id_nueva = categorias.crear_uno({"name": "Pastelería"})
+    assert categorias.buscar_por_prefijo("paste") == ["Pastelería"]
+    categorias.actualizar_uno(id_nueva, {"name": "Panadería"})
+    assert categorias.buscar_por_prefijo("paste") == [] and categorias.buscar_por_prefijo("pan") == ["Panadería"]
+    assert categorias.sugerir_nombres("Panaderia") == ["Panadería"]
+    categorias.eliminar_uno(id_nueva)
+    assert categorias.contar_por_prefijo("") == 2
+
+
+def test_los_comentarios_no_entran_en_el_indice(blog):
+    comentarios, articulo = blog.comentarios, blog.db.articles.find_one()
+    id_comentario = comentarios.crear_comentario(articulo["_id"], articulo["user_id"], "Muy rica la receta")
+    comentarios.cargar_mapa()
+    assert comentarios.obtener_todos_los_nombres() == [] and not comentarios.mapa_id_a_nombre
+    assert comentarios.total_documentos == 1
+    assert comentarios.eliminar_uno(id_comentario)
@@ -0,0 +1,10 @@
+import Logica
+from Indices import consultas_representativas
+
+
+def test_consultas_representativas_usan_la_base_pedida(blog, monkeypatch):
+    monkeypatch.setattr(Logica, "_gestores", {})
+    consultas = consultas_representativas(blog.db)
+    pipeline = consultas["GestorArticulo.obtener_pagina (sin filtro)"]["pipeline"]
+    assert len(list(blog.db.articles.aggregate(pipeline))) == Logica.TAMANO_PAGINA + 1
+    assert Logica._gestores == {} # No se creó ningún gestor global (de la base por defecto).
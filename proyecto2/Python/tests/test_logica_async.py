@@ -0,0 +1,135 @@
+import asyncio
+import datetime
+
+from LogicaAsync import crear_gestores_async, cargar_mapas, en_paralelo
+
+
+class CursorAsync:
+    """Cursor de mongomock con la forma del AsyncCursor de PyMongo (sort/limit encadenables, to_list, async for)."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, cantidad):
+        self.cursor = self.cursor.limit(cantidad)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.cursor)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *error):
+        return False
+
+
+class ColeccionAsync:
+    """Colección de mongomock con la forma de AsyncCollection: mismas consultas, como corrutinas."""
+
+    def __init__(self, coleccion, database):
+        self.coleccion, self.database, self.name = coleccion, database, coleccion.name
+
+    def find(self, *args, batch_size=None, **kwargs):
+        return CursorAsync(self.coleccion.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline, **opciones):
+        return CursorAsync(iter(list(self.coleccion.aggregate(pipeline))))
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self.coleccion, nombre)
+        async def corrutina(*args, **kwargs):
+            return metodo(*args, **kwargs)
+        return corrutina
+
+
+class BaseAsync:
+    def __init__(self, db):
+        self.db = db
+
+    def __getitem__(self, nombre):
+        return ColeccionAsync(self.db[nombre], self)
+
+
+def gestores_async(blog):
+    gestores = crear_gestores_async(BaseAsync(blog.db))
+    asyncio.run(cargar_mapas(gestores["gestor_usuarios"], gestores["gestor_categorias"], gestores["gestor_etiquetas"]))
+    return gestores
+
+
+def test_paginas_iguales_a_las_del_gestor_sincrono(blog):
+    articulos = gestores_async(blog)["gestor_articulos"]
+    for termino in ["", "pollo", "polly", "("]:
+        cursor_async = cursor_sync = None
+        while True:
+            pagina_async = asyncio.run(articulos.obtener_pagina(termino, cursor_async, 7))
+            pagina_sync = blog.articulos.obtener_pagina(termino, cursor_sync, 7, modo="parcial" if termino == "(" else None)
+            assert [a["_id"] for a in pagina_async["articulos"]] == [a["_id"] for a in pagina_sync["articulos"]]
+            assert pagina_async["next_cursor"] == pagina_sync["next_cursor"]
+            if pagina_async["next_cursor"] is None:
+                break
+            cursor_async, cursor_sync = pagina_async["next_cursor"], pagina_sync["next_cursor"]
+
+
+def test_comentarios_por_paginas_y_por_lotes(blog):
+    gestores = gestores_async(blog)
+    comentarios = gestores["gestor_comentarios"]
+    articulo = blog.db["articles"].find_one({})
+    ana = gestores["gestor_usuarios"].obtener_id_por_nombre("ana@blog.com")
+
+    async def escribir():
+        for i in range(25):
+            await comentarios.crear_comentario(articulo["_id"], ana, f"comentario {i}")
+    asyncio.run(escribir())
+    assert blog.db["articles"].find_one({"_id": articulo["_id"]})["comment_count"] == 25
+
+    async def leer_paginas():
+        paginas, cursor = [], None
+        while True:
+            pagina = await comentarios.obtener_pagina_comentarios(articulo["_id"], cursor, 10)
+            paginas.append(pagina["comentarios"])
+            cursor = pagina["next_cursor"]
+            if cursor is None:
+                return paginas
+    paginas = asyncio.run(leer_paginas())
+    assert [len(pagina) for pagina in paginas] == [10, 10, 5]
+    assert all(c["author_email"] == "ana@blog.com" for pagina in paginas for c in pagina)
+
+    async def leer_lotes():
+        return [c async for c in comentarios.iterar_comentarios(articulo["_id"], tamano_lote=4)]
+    assert [c["_id"] for c in asyncio.run(leer_lotes())] == [c["_id"] for pagina in paginas for c in pagina]
+
+
+def test_en_paralelo_respeta_el_orden_y_el_limite():
+    en_vuelo, maximo = 0, 0
+
+    async def tarea(numero):
+        nonlocal en_vuelo, maximo
+        en_vuelo += 1
+        maximo = max(maximo, en_vuelo)
+        await asyncio.sleep(0.001 * (10 - numero % 10)) # Las primeras terminan últimas.
+        en_vuelo -= 1
+        return numero
+
+    assert asyncio.run(en_paralelo([tarea(i) for i in range(30)], limite=4)) == list(range(30))
+    assert maximo == 4
+
+
+def test_crear_uno_registra_en_el_mapa(blog):
+    etiquetas = gestores_async(blog)["gestor_etiquetas"]
+    id_nueva = asyncio.run(etiquetas.crear_uno({"name": "Vegano", "last_modified": datetime.datetime(2024, 1, 1)}))
+    assert etiquetas.obtener_id_por_nombre("Vegano") == id_nueva
+    assert blog.db["tags"].count_documents({}) == 3
@@ -0,0 +1,30 @@
+from bson.objectid import ObjectId
+
+
+def test_crear_muchos_reporta_los_repetidos_y_registra_el_resto(blog):
+    etiquetas = blog.etiquetas
+    etiquetas.coleccion.create_index("name", unique=True)
+    resultado = etiquetas.crear_muchos([{"name": "Vegano"}, {"name": "Pollo"}, {"name": "Sin gluten"}])
+    assert resultado["ids"][0] is not None and resultado["ids"][1] is None and resultado["ids"][2] is not None
+    assert [error["indice"] for error in resultado["errores"]] == [1]
+    assert etiquetas.obtener_id_por_nombre("Sin gluten") == resultado["ids"][2]
+    assert etiquetas.total_documentos == 4
+
+
+def test_actualizar_muchos_renombra_y_reporta_los_inexistentes(blog):
+    categorias = blog.categorias
+    id_postres = categorias.obtener_id_por_nombre("Postres")
+    resultado = categorias.actualizar_muchos([(id_postres, {"name": "Dulces"}), (ObjectId(), {"name": "X"})])
+    assert resultado["modificados"] == 1
+    assert [error["error"] for error in resultado["errores"]] == ["No existe"]
+    assert categorias.obtener_id_por_nombre("Dulces") == id_postres
+    assert categorias.obtener_id_por_nombre("Postres") is None
+
+
+def test_eliminar_muchos_limpia_las_referencias_de_los_articulos(blog):
+    etiquetas = blog.etiquetas
+    ids = [etiquetas.obtener_id_por_nombre("Pollo"), etiquetas.obtener_id_por_nombre("Rápido")]
+    resultado = etiquetas.eliminar_muchos(ids + ids[:1] + [ObjectId()]) # Repetidos y uno que no existe.
+    assert resultado["eliminados"] == 2 and len(resultado["errores"]) == 1
+    assert etiquetas.obtener_todos_los_nombres() == []
+    assert blog.db["articles"].count_documents({"tags": {"$in": ids}}) == 0
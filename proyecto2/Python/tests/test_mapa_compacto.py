@@ -0,0 +1,57 @@
+import random
+
+import pytest
+from bson.objectid import ObjectId
+
+from Logica import GestorEtiqueta
+from MapaCompacto import MapaCompacto
+
+
+def test_las_vistas_se_comportan_como_dos_diccionarios():
+    """Escrituras al azar (incluidas las que fuerzan a compactar) contra un par de dict de referencia."""
+    aleatorio = random.Random(7)
+    mapa = MapaCompacto()
+    por_nombre, por_id = {}, {}
+    ids = [ObjectId() for _ in range(3000)]
+    for paso in range(20000):
+        nombre, id_objeto = f"nombre {aleatorio.randrange(3000)} ñ", ids[aleatorio.randrange(3000)]
+        if aleatorio.random() < 0.6:
+            # Como _registrar: cada nombre y cada _id quedan en una sola entrada.
+            if id_objeto in por_id:
+                del por_nombre[por_id.pop(id_objeto)]
+            if nombre in por_nombre:
+                del por_id[por_nombre.pop(nombre)]
+            por_nombre[nombre], por_id[id_objeto] = id_objeto, nombre
+            mapa.por_nombre[nombre] = id_objeto
+        elif id_objeto in por_id:
+            del por_nombre[por_id.pop(id_objeto)]
+            assert mapa.por_id.pop(id_objeto) is not None
+    assert len(mapa.por_nombre) == len(por_nombre)
+    assert dict(mapa.por_nombre.items()) == por_nombre
+    assert dict(mapa.por_id.items()) == por_id
+    assert mapa.por_nombre.get("no existe") is None and ObjectId() not in mapa.por_id
+
+
+def test_cargar_con_nombres_repetidos_conserva_el_ultimo():
+    primero, segundo = ObjectId(), ObjectId()
+    mapa = MapaCompacto(["a", "b", "a"], [primero, ObjectId(), segundo])
+    assert mapa.por_nombre["a"] == segundo and primero not in mapa.por_id
+    assert len(mapa) == 2
+
+
+def test_solo_admite_object_id():
+    with pytest.raises(TypeError):
+        MapaCompacto().agregar("a", "no es un ObjectId")
+
+
+def test_el_gestor_usa_el_mapa_compacto(blog):
+    etiquetas = GestorEtiqueta(db=blog.db)
+    etiquetas.compacto = True
+    etiquetas.cargar_mapa()
+    assert isinstance(etiquetas.mapa_nombre_a_id, type(MapaCompacto().por_nombre))
+    id_nueva = etiquetas.crear_uno({"name": "Vegano"})
+    etiquetas.actualizar_uno(id_nueva, {"name": "Vegetariano"})
+    assert etiquetas.obtener_id_por_nombre("Vegetariano") == id_nueva
+    assert etiquetas.obtener_nombre_por_id(id_nueva) == "Vegetariano"
+    assert etiquetas.obtener_id_por_nombre("Vegano") is None
+    assert sorted(etiquetas.obtener_todos_los_nombres()) == ["Pollo", "Rápido", "Vegetariano"]
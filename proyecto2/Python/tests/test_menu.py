@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+pytest.importorskip("customtkinter") # Menu.py y Login.py son la interfaz.
+import Login  # noqa: E402
+import Logica  # noqa: E402
+import Menu  # noqa: E402
+import Sesion  # noqa: E402
+
+
+class WidgetFalso:
+    """Cualquier widget de customtkinter sin pantalla: acepta todo, guarda lo configurado y sus entradas están vacías."""
+
+    def __init__(self, *args, **opciones):
+        self.opciones = opciones
+
+    def configure(self, **opciones):
+        self.opciones.update(opciones)
+
+    def get(self):
+        return ""
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: WidgetFalso()
+
+
+class CtkFalso:
+    """Módulo customtkinter falso: cada clase es un WidgetFalso."""
+
+    def __getattr__(self, nombre):
+        return WidgetFalso
+
+
+class RaizFalsa(WidgetFalso):
+    """Ventana sin bucle de Tk: 'revisar' entrega los resultados del EjecutorTareas (lo que haría 'after')."""
+
+    def after(self, ms, funcion):
+        self.revisar = funcion
+
+    def winfo_children(self):
+        return []
+
+
+def esperar_tareas(raiz, ejecutor):
+    limite = time.monotonic() + 10
+    while ejecutor.pendientes and time.monotonic() < limite:
+        time.sleep(0.01)
+        raiz.revisar()
+    assert ejecutor.pendientes == 0
+
+
+@pytest.fixture
+def interfaz(blog, monkeypatch):
+    """Menu.py y Login.py con widgets falsos sobre los gestores del blog de prueba. Retorna los mensajes mostrados."""
+    mensajes = []
+    for modulo in (Menu, Login):
+        monkeypatch.setattr(modulo, "ctk", CtkFalso())
+        monkeypatch.setattr(modulo, "verificar_conexion", lambda: True)
+        for funcion in ("showerror", "showwarning", "showinfo"):
+            monkeypatch.setattr(modulo.messagebox, funcion, lambda titulo, mensaje, **opciones: mensajes.append((titulo, mensaje)))
+    monkeypatch.setattr(Menu, "ListaVirtual", WidgetFalso)
+    monkeypatch.setattr(Menu, "Selector", WidgetFalso)
+    monkeypatch.setattr(Menu, "asegurar_indices", lambda: {})
+    gestores = {"gestor_usuarios": blog.usuarios, "gestor_categorias": blog.categorias, "gestor_etiquetas": blog.etiquetas,
+                "gestor_comentarios": blog.comentarios, "gestor_articulos": blog.articulos}
+    monkeypatch.setattr(Logica, "_gestores", gestores)
+    for nombre, gestor in gestores.items():
+        monkeypatch.setattr(Menu, nombre, gestor)
+    monkeypatch.setattr(Logica.GestorEntidad, "iniciar_sincronizacion", lambda self, intervalo=5.0: None)
+    yield mensajes
+    Sesion.cerrar_sesion()
+
+
+def test_el_menu_se_construye_y_muestra_el_estado_de_carga(interfaz):
+    raiz = RaizFalsa()
+    app = Menu.AppMenuPrincipal(raiz)
+    assert app.etiqueta_estado.opciones["text"] == "Cargando..." # Ping, mapas, índices y la primera página.
+    esperar_tareas(raiz, app.ejecutor)
+    assert app.etiqueta_estado.opciones["text"] == "" and interfaz == []
+    assert set(app.frames) == {"articles", "categories", "tags", "users"}
+    app.ejecutor.cerrar()
+
+
+def test_el_login_abre_el_menu_con_la_sesion(blog, interfaz):
+    raiz = RaizFalsa()
+    login = Login.AppLogin(raiz)
+    esperar_tareas(raiz, login.ejecutor)
+    usuario = blog.usuarios.autenticar("polly@blog.com", "123")
+    assert usuario is not None
+
+    app = login.lanzar_aplicacion_principal(usuario)
+    assert isinstance(app, Menu.AppMenuPrincipal) and interfaz == []
+    assert app.sesion is Sesion.obtener_sesion() and app.sesion.email == "polly@blog.com"
+    esperar_tareas(raiz, app.ejecutor)
+    app.ejecutor.cerrar()
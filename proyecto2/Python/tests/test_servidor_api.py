@@ -0,0 +1,125 @@
+import base64
+import http.client
+import json
+import threading
+
+import pytest
+from pymongo.errors import OperationFailure
+
+import Conexion
+import Logica
+import ServidorAPI
+
+
+@pytest.fixture
+def api(blog, monkeypatch):
+    """ServidorAPI en un puerto libre sobre los gestores del blog de prueba. Retorna pedir(metodo, ruta, ...)."""
+    monkeypatch.setattr(Conexion, "_cliente", blog.db.client)
+    monkeypatch.setattr(Conexion, "DB_NAME", blog.db.name)
+    monkeypatch.setattr(Logica, "_gestores", {
+        "gestor_usuarios": blog.usuarios, "gestor_categorias": blog.categorias, "gestor_etiquetas": blog.etiquetas,
+        "gestor_comentarios": blog.comentarios, "gestor_articulos": blog.articulos,
+    })
+    monkeypatch.setattr(Logica.GestorEntidad, "iniciar_sincronizacion", lambda self, intervalo=5.0: None)
+    servidor = ServidorAPI.crear_servidor("127.0.0.1", 0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    conexion = http.client.HTTPConnection("127.0.0.1", servidor.server_address[1], timeout=10)
+
+    def pedir(metodo, ruta, cuerpo=None, cabeceras=None, usuario=None):
+        cabeceras = dict(cabeceras or {})
+        if usuario:
+            cabeceras["Authorization"] = "Basic " + base64.b64encode(usuario.encode()).decode()
+        conexion.request(metodo, ruta, body=json.dumps(cuerpo) if cuerpo is not None else None, headers=cabeceras)
+        respuesta = conexion.getresponse()
+        return respuesta.status, dict(respuesta.getheaders()), respuesta.read()
+
+    yield pedir
+    conexion.close()
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_paginas_de_articulos_con_etag(api):
+    estado, cabeceras, cuerpo = api("GET", "/api/articulos?tamano=20")
+    pagina = json.loads(cuerpo)
+    assert estado == 200 and len(pagina["articulos"]) == 20 and pagina["prev_cursor"] is None
+    assert pagina["articulos"][0]["title"] == "Pollito al horno 29"
+
+    estado, _, cuerpo = api("GET", "/api/articulos?tamano=20", cabeceras={"If-None-Match": cabeceras["ETag"]})
+    assert estado == 304 and cuerpo == b""
+
+    estado, _, cuerpo = api("GET", "/api/articulos?tamano=20&cursor=" + pagina["next_cursor"].replace("|", "%7C"))
+    siguiente = json.loads(cuerpo)
+    assert estado == 200 and len(siguiente["articulos"]) == 10 and siguiente["next_cursor"] is None
+
+
+def test_busqueda_parcial_y_errores_del_cliente(api):
+    _, _, cuerpo = api("GET", "/api/articulos?q=pollit&parcial=1")
+    assert {a["title"] for a in json.loads(cuerpo)["articulos"]} == {f"Pollito al horno {i}" for i in range(5, 30, 6)}
+    assert api("GET", "/api/articulos?q=(")[0] == 200 # Regex inválida: se busca el texto literal.
+    assert api("GET", "/api/articulos?cursor=basura")[0] == 400
+    assert api("GET", "/api/articulos?tamano=500")[0] == 400
+    assert api("GET", f"/api/articulos/{'0' * 24}")[0] == 404
+    assert api("GET", "/api/nada")[0] == 404
+    estado, cabeceras, _ = api("DELETE", "/api/salud")
+    assert estado == 405 and cabeceras["Allow"] == "GET"
+
+
+def test_escrituras_requieren_usuario(api):
+    nuevo = {"title": "Nueva", "text": "x", "categories": ["Sopas", "NoExiste"]}
+    assert api("POST", "/api/articulos", nuevo)[0] == 401
+    assert api("POST", "/api/articulos", nuevo, usuario="ana@blog.com:mal")[0] == 401
+
+    estado, _, cuerpo = api("POST", "/api/articulos", nuevo, usuario="ana@blog.com:123")
+    assert estado == 201
+    id_nuevo = json.loads(cuerpo)["_id"]
+    articulo = json.loads(api("GET", f"/api/articulos/{id_nuevo}")[2])
+    assert articulo["author_email"] == "ana@blog.com" and articulo["category_names"] == ["Sopas"]
+
+    assert api("POST", f"/api/articulos/{id_nuevo}/comentarios", {"text": "rico"}, usuario="juan@blog.com:123")[0] == 201
+    assert json.loads(api("GET", f"/api/articulos/{id_nuevo}")[2])["comment_count"] == 1
+    assert api("POST", "/api/articulos", {"title": "Sin texto"}, usuario="ana@blog.com:123")[0] == 400
+    assert api("DELETE", f"/api/articulos/{id_nuevo}", usuario="ana@blog.com:123")[0] == 200
+    assert api("DELETE", f"/api/articulos/{id_nuevo}", usuario="ana@blog.com:123")[0] == 404
+
+
+def test_streaming_ndjson(api, blog):
+    estado, cabeceras, cuerpo = api("GET", "/api/articulos/todos?q=pollo")
+    lineas = [json.loads(linea) for linea in cuerpo.splitlines()]
+    assert estado == 200 and cabeceras["Transfer-Encoding"] == "chunked"
+    assert len(lineas) == len(blog.articulos.obtener_pagina("pollo", None, 100)["articulos"])
+
+
+def test_entidades_sin_contrasenas(api):
+    usuarios = json.loads(api("GET", "/api/users?tamano=2")[2])
+    assert len(usuarios["documentos"]) == 2 and all("password" not in u for u in usuarios["documentos"])
+    resto = json.loads(api("GET", f"/api/users?despues_de={usuarios['siguiente']}")[2])
+    assert len(resto["documentos"]) == 1
+
+    estado, _, cuerpo = api("POST", "/api/tags", {"valor": "Té"}, usuario="ana@blog.com:123")
+    id_tag = json.loads(cuerpo)["_id"]
+    assert estado == 201 and json.loads(api("GET", "/api/tags/nombres?prefijo=te")[2])["nombres"] == ["Té"]
+    assert api("PUT", f"/api/tags/{id_tag}", {"valor": "Té verde"}, usuario="ana@blog.com:123")[0] == 200
+    assert api("DELETE", f"/api/tags/{id_tag}", usuario="ana@blog.com:123")[0] == 200
+    assert json.loads(api("POST", "/api/login", {"email": "ana@blog.com", "password": "123"})[2])["email"] == "ana@blog.com"
+    assert api("POST", "/api/login", {"email": "ana@blog.com", "password": "x"})[0] == 401
+
+
+def test_busqueda_rechazada_por_el_servidor_es_400(api, blog, monkeypatch):
+    def rechazar(pipeline):
+        raise OperationFailure("Regular expression is invalid", code=51091)
+    monkeypatch.setattr(blog.articulos, "_agregar", rechazar)
+    estado, _, cuerpo = api("GET", "/api/articulos?q=pollo")
+    assert estado == 400 and "pollo" in json.loads(cuerpo)["error"]
+
+
+def test_renombrar_y_cuerpos_invalidos_son_errores_del_cliente(api, blog):
+    id_sopas = str(blog.categorias.obtener_id_por_nombre("Sopas"))
+    estado, _, cuerpo = api("PUT", f"/api/categories/{id_sopas}", {"valor": "Postres"}, usuario="ana@blog.com:123")
+    assert estado == 400 and "Ya existe" in json.loads(cuerpo)["error"] # Nombre de otra categoría.
+    assert api("PUT", f"/api/categories/{id_sopas}", {"valor": "Sopas"}, usuario="ana@blog.com:123")[0] == 200
+    assert api("PUT", f"/api/categories/{'0' * 24}", {"valor": "Nueva"}, usuario="ana@blog.com:123")[0] == 404
+    assert api("PUT", f"/api/categories/{id_sopas}", {"valor": 5}, usuario="ana@blog.com:123")[0] == 400
+    assert api("POST", "/api/tags", {"valor": 5}, usuario="ana@blog.com:123")[0] == 400
+    assert api("POST", "/api/tags", ["Té"], usuario="ana@blog.com:123")[0] == 400
+    assert blog.categorias.obtener_nombre_por_id(blog.categorias.obtener_id_por_nombre("Sopas")) == "Sopas"
@@ -0,0 +1,26 @@
+import Logica
+from Logica import GestorCategoria
+
+
+def test_borrados_de_otro_proceso_sin_releer_la_coleccion(db, monkeypatch):
+    monkeypatch.setattr(Logica, "TAMANO_RANGO_CONCILIACION", 8)
+    ids = db.categories.insert_many([{"name": f"Categoría {i}"} for i in range(200)]).inserted_ids
+    categorias = GestorCategoria(db=db)
+    categorias.cargar_mapa()
+    # Otro proceso (ej: mongosh) borra algunas y renombra otra sin 'last_modified'.
+    db.categories.delete_many({"_id": {"$in": [ids[3], ids[97], ids[199]]}})
+    db.categories.update_one({"_id": ids[150]}, {"$set": {"name": "Renombrada"}})
+    db.categories.delete_one({"_id": ids[151]})
+
+    leidos = []
+    find = type(db.categories).find
+    monkeypatch.setattr(type(db.categories), "find",
+                        lambda coleccion, filtro=None, *args, **kwargs: (leidos.append(filtro), find(coleccion, filtro, *args, **kwargs))[1])
+    assert categorias.sondear_cambios() == 5
+    assert categorias.total_documentos == 196 == len(categorias.mapa_id_a_nombre)
+    assert categorias.obtener_id_por_nombre("Categoría 97") is None
+    assert categorias.obtener_nombre_por_id(ids[150]) == "Renombrada"
+    assert categorias.obtener_todos_los_nombres().count("Categoría 150") == 0
+    # Solo se releen rangos de _id pequeños, nunca la colección completa.
+    assert leidos[1:] and all("_id" in filtro for filtro in leidos[1:])
+    assert categorias.sondear_cambios() == 0